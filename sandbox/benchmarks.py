@@ -0,0 +1,697 @@
+#!/usr/bin/env python
+"""
+Benchmarks of the codec, ORM, lookup and Django REST Framework hot paths, and of pickling, blocklists, parallel
+encoding, fixtures, exports and startup. Every benchmark is timed next to a baseline that does the same work with a
+plain AutoField or IntegerField, or without the feature being measured, so results can be read as the cost of using
+sqids.
+
+    sandbox/benchmarks.py run [--output results.json] [--repeat 5] [-k PATTERN] [--export-rows 3000000]
+    sandbox/benchmarks.py compare base.json head.json [--threshold 0.10] [--absolute]
+
+`run` seeds an in-memory SQLite database, whatever the sandbox settings say, prints each result and optionally saves
+them as JSON along with the commit and versions they were measured with. `compare` lines up two saved runs, e.g. from
+two commits, and exits with status 1 if any benchmark regressed by more than the threshold. By default it compares the
+ratios to the baselines, which carry over between machines better than absolute times.
+"""
+import argparse
+import asyncio
+import atexit
+import fnmatch
+import json
+import os
+import pickle
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+import timeit
+import tracemalloc
+from itertools import islice
+
+import django
+
+NUM_BOOKS = 100_000
+NUM_AUTHORS = 1000
+NUM_IN_VALUES = 10_000
+NUM_SERIALIZED = 1000
+NUM_CODEC_VALUES = 1000
+NUM_PARALLEL_IDS = 1_000_000
+NUM_STARTUP_MODELS = 20
+FIELDS_PER_STARTUP_MODEL = 25
+EXPORT_CHUNK_SIZE = 5000
+# Rows in the Book table for the export benchmarks, set with --export-rows
+EXPORT_ROWS = 3_000_000
+
+BENCHMARKS = []
+
+
+def benchmark(name, peak_memory=False):
+    """
+    Registers a benchmark. The function does any setup and returns (run, baseline, number of operations per run). With
+    `peak_memory`, the peak memory allocated during one more run is recorded as well.
+    """
+    def decorator(function):
+        BENCHMARKS.append((name, function, peak_memory))
+        return function
+    return decorator
+
+
+def seed():
+    from library.models import Author, Book, Editor
+
+    authors = Author.objects.bulk_create(Author(name="Author {}".format(i)) for i in range(NUM_AUTHORS))
+    editors = Editor.objects.bulk_create(Editor(name="Editor {}".format(i)) for i in range(10))
+    Book.objects.bulk_create(
+        (Book(name="Book {}".format(i), author=authors[i % len(authors)], reference_id=i, key=i, alt=i, some_number=i)
+         for i in range(1, NUM_BOOKS + 1)),
+        batch_size=10_000,
+    )
+    through = Book.editors.through
+    through.objects.bulk_create(
+        through(book_id=book_id, editor_id=editor.id.id)
+        for book_id in Book.objects.order_by('pk').values_list('pk', flat=True)[:NUM_SERIALIZED]
+        for editor in editors[:2]
+    )
+
+
+def _codec_benchmarks(field, max_id):
+    rng = random.Random(0)
+    ids = [rng.randrange(max_id) for _ in range(NUM_CODEC_VALUES)]
+    codec = field._sqids
+    sqids = [codec.encode([id]) for id in ids]
+    strings = [str(id) for id in ids]
+
+    def encode():
+        for id in ids:
+            codec.encode([id])
+
+    def encode_baseline():
+        for id in ids:
+            str(id)
+
+    def decode():
+        for sqid in sqids:
+            codec.decode(sqid)
+
+    def decode_baseline():
+        for string in strings:
+            int(string)
+
+    return (encode, encode_baseline, len(ids)), (decode, decode_baseline, len(ids))
+
+
+@benchmark("encode_small")
+def encode_small():
+    from library.models import Book
+
+    return _codec_benchmarks(Book._meta.get_field('reference_id'), 2 ** 31 - 1)[0]
+
+
+@benchmark("decode_small")
+def decode_small():
+    from library.models import Book
+
+    return _codec_benchmarks(Book._meta.get_field('reference_id'), 2 ** 31 - 1)[1]
+
+
+@benchmark("encode_big")
+def encode_big():
+    from library.models import Author
+
+    return _codec_benchmarks(Author._meta.get_field('id'), 2 ** 63 - 1)[0]
+
+
+@benchmark("decode_big")
+def decode_big():
+    from library.models import Author
+
+    return _codec_benchmarks(Author._meta.get_field('id'), 2 ** 63 - 1)[1]
+
+
+def _construction(shared):
+    # Shared passes the field's codec to every Sqid, unshared builds a new sqids.Sqids for each one as code that
+    # doesn't reuse codecs would
+    from library.models import Book
+    from sqids import Sqids
+    from sqids_field.codec import salt_alphabet
+    from sqids_field.sqid import Sqid
+
+    field = Book._meta.get_field('reference_id')
+    options = {'alphabet': salt_alphabet(field.alphabet, field.salt), 'min_length': field.min_length}
+    if field.blocklist is not None:
+        options['blocklist'] = list(field.blocklist)
+    ids = range(NUM_CODEC_VALUES)
+
+    def run_shared():
+        codec = field._sqids
+        for id in ids:
+            Sqid(id, salt=field.salt, min_length=field.min_length, alphabet=field.alphabet, sqids=codec)
+
+    def run_unshared():
+        for id in ids:
+            Sqid(id, salt=field.salt, min_length=field.min_length, alphabet=field.alphabet, sqids=Sqids(**options))
+
+    def baseline():
+        for id in ids:
+            int(id)
+
+    return run_shared if shared else run_unshared, baseline, len(ids)
+
+
+@benchmark("sqid_construction_shared_codec")
+def sqid_construction_shared_codec():
+    return _construction(shared=True)
+
+
+@benchmark("sqid_construction_unshared_codec")
+def sqid_construction_unshared_codec():
+    return _construction(shared=False)
+
+
+@benchmark("from_db_value_100k")
+def from_db_value_100k():
+    from library.models import Book
+
+    def run():
+        list(Book.objects.values_list('reference_id', flat=True))
+
+    def baseline():
+        list(Book.objects.values_list('some_number', flat=True))
+
+    return run, baseline, NUM_BOOKS
+
+
+@benchmark("in_lookup_10k")
+def in_lookup_10k():
+    # Only compiles the query, which is where every value is decoded, so the database doesn't dominate the timing
+    from library.models import Book
+
+    field = Book._meta.get_field('reference_id')
+    ids = list(range(1, NUM_IN_VALUES + 1))
+    sqids = field.encode_many(ids)
+
+    def run():
+        Book.objects.filter(reference_id__in=sqids).query.get_compiler('default').as_sql()
+
+    def baseline():
+        Book.objects.filter(some_number__in=ids).query.get_compiler('default').as_sql()
+
+    return run, baseline, NUM_IN_VALUES
+
+
+@benchmark("descriptor_assignment")
+def descriptor_assignment():
+    from library.models import Book
+
+    book = Book()
+    ids = range(NUM_CODEC_VALUES)
+
+    def run():
+        for id in ids:
+            book.reference_id = id
+
+    def baseline():
+        for id in ids:
+            book.some_number = id
+
+    return run, baseline, len(ids)
+
+
+@benchmark("book_serializer_list")
+def book_serializer_list():
+    from django.test import RequestFactory
+    from rest_framework import serializers
+    from library.models import Book
+    from library.serializers import BookSerializer
+
+    class PlainBookSerializer(serializers.ModelSerializer):
+        # The same number of integer columns, read from plain fields
+        reference_id = serializers.IntegerField(source='some_number')
+        key = serializers.IntegerField(source='some_number')
+        author_char = serializers.IntegerField(source='author_id')
+        author_int = serializers.IntegerField(source='author_id')
+
+        class Meta:
+            model = Book
+            fields = ('id', 'name', 'reference_id', 'key', 'some_number', 'author_char', 'author_int')
+
+    books = list(Book.objects.select_related('author').prefetch_related('editors').order_by('pk')[:NUM_SERIALIZED])
+    context = {'request': RequestFactory().get('/books/')}
+
+    def run():
+        BookSerializer(books, many=True, context=context).data
+
+    def baseline():
+        PlainBookSerializer(books, many=True, context=context).data
+
+    return run, baseline, len(books)
+
+
+def _sqids_and_ids():
+    from library.models import Book
+
+    field = Book._meta.get_field('reference_id')
+    sqids = [field.get_sqid(id) for id in range(NUM_CODEC_VALUES)]
+    return sqids, [int(sqid) for sqid in sqids]
+
+
+@benchmark("sqid_pickle_dumps")
+def sqid_pickle_dumps():
+    # Sqids pickle to the fingerprint of their codec and their id
+    sqids, ids = _sqids_and_ids()
+
+    def run():
+        pickle.dumps(sqids)
+
+    def baseline():
+        pickle.dumps(ids)
+
+    return run, baseline, len(sqids)
+
+
+@benchmark("sqid_pickle_loads")
+def sqid_pickle_loads():
+    # Loading looks the shared codec up again by its fingerprint
+    sqids, ids = _sqids_and_ids()
+    data = pickle.dumps(sqids)
+    int_data = pickle.dumps(ids)
+
+    def run():
+        pickle.loads(data)
+
+    def baseline():
+        pickle.loads(int_data)
+
+    return run, baseline, len(sqids)
+
+
+@benchmark("sqid_from_bytes")
+def sqid_from_bytes():
+    from sqids_field.sqid import Sqid
+
+    sqids, ids = _sqids_and_ids()
+    data = [sqid.to_bytes() for sqid in sqids]
+    int_data = [id.to_bytes(8, 'big') for id in ids]
+
+    def run():
+        for item in data:
+            Sqid.from_bytes(item)
+
+    def baseline():
+        for item in int_data:
+            int.from_bytes(item, 'big')
+
+    return run, baseline, len(data)
+
+
+def _blocklist(blocklist, table):
+    # Random ids up to 2**31, as the blocklist is only checked for sqids of 3 characters or more. The baseline codec
+    # has no blocklist.
+    from sqids_field.codec import get_codec, get_table_codec
+    from sqids_field.conf import settings
+
+    rng = random.Random(0)
+    ids = [rng.randrange(2 ** 31) for _ in range(NUM_CODEC_VALUES)]
+    get = get_table_codec if table else get_codec
+    encode = get("", 0, settings.SQID_FIELD_ALPHABET, blocklist).encode
+    encode_unblocked = get("", 0, settings.SQID_FIELD_ALPHABET, ()).encode
+    if table:
+        def run():
+            for id in ids:
+                encode(id)
+
+        def baseline():
+            for id in ids:
+                encode_unblocked(id)
+    else:
+        def run():
+            for id in ids:
+                encode([id])
+
+        def baseline():
+            for id in ids:
+                encode_unblocked([id])
+
+    return run, baseline, len(ids)
+
+
+@benchmark("encode_default_blocklist")
+def encode_default_blocklist():
+    return _blocklist(None, table=False)
+
+
+@benchmark("encode_custom_blocklist")
+def encode_custom_blocklist():
+    return _blocklist(("admin", "root", "test"), table=False)
+
+
+@benchmark("table_encode_default_blocklist")
+def table_encode_default_blocklist():
+    return _blocklist(None, table=True)
+
+
+@benchmark("table_encode_custom_blocklist")
+def table_encode_custom_blocklist():
+    return _blocklist(("admin", "root", "test"), table=True)
+
+
+@benchmark("parallel_encode_many_1m")
+def parallel_encode_many_1m():
+    # The baseline is encode_many() in this process, so a ratio below 1 is the speedup of the pool. The pool is shut
+    # down when the interpreter exits.
+    from library.models import Book
+    from sqids_field import parallel
+
+    field = Book._meta.get_field('reference_id')
+    ids = range(NUM_PARALLEL_IDS)
+    executor = parallel.get_executor([field])
+
+    def run():
+        parallel.encode_many(ids, field, executor=executor)
+
+    def baseline():
+        field.encode_many(ids)
+
+    return run, baseline, len(ids)
+
+
+@benchmark("dumpdata_json")
+def dumpdata_json():
+    # What dumpdata does for each row, without the query. The baseline writes the same fields as integers with
+    # SQID_FIELD_SERIALIZE_INT.
+    from django.core import serializers
+    from django.test.utils import override_settings
+    from library.models import Book
+
+    books = list(Book.objects.order_by('pk')[:NUM_SERIALIZED])
+
+    def run():
+        serializers.serialize('json', books)
+
+    def baseline():
+        with override_settings(SQID_FIELD_SERIALIZE_INT=True):
+            serializers.serialize('json', books)
+
+    return run, baseline, len(books)
+
+
+@benchmark("loaddata_json")
+def loaddata_json():
+    # What loaddata does for each object, saving over the existing rows in a transaction that is rolled back
+    from django.core import serializers
+    from django.db import transaction
+    from django.test.utils import override_settings
+    from library.models import Book
+
+    books = list(Book.objects.order_by('pk')[:NUM_SERIALIZED])
+    data = serializers.serialize('json', books)
+    with override_settings(SQID_FIELD_SERIALIZE_INT=True):
+        int_data = serializers.serialize('json', books)
+
+    def load(data):
+        with transaction.atomic():
+            for obj in serializers.deserialize('json', data):
+                obj.save()
+            transaction.set_rollback(True)
+
+    def run():
+        load(data)
+
+    def baseline():
+        with override_settings(SQID_FIELD_SERIALIZE_INT=True):
+            load(int_data)
+
+    return run, baseline, len(books)
+
+
+STARTUP_SETTINGS = textwrap.dedent('''
+    SECRET_KEY = "startup benchmark"
+    INSTALLED_APPS = ["django.contrib.contenttypes", "django.contrib.auth", "startupapp"]
+    DATABASES = {"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}}
+    DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
+    SQID_FIELD_SALT = "startup benchmark"
+''')
+
+# `migrate --plan` renders the historical models of every migration, and so instantiates all of the fields again
+STARTUP = ("import django; django.setup(); from io import StringIO; from django.core.management import call_command; "
+           "call_command('migrate', plan=True, stdout=StringIO())")
+
+
+def _run_startup(directory, code):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE="startup_settings",
+               PYTHONPATH=os.pathsep.join([directory] + sys.path))
+    subprocess.run([sys.executable, "-c", code], cwd=directory, env=env, check=True, capture_output=True)
+
+
+def _startup_project(field):
+    """Writes a project whose models have `field`, formatted with a salt and min_length, and its migrations."""
+    directory = tempfile.mkdtemp()
+    atexit.register(shutil.rmtree, directory, True)
+    app = os.path.join(directory, "startupapp")
+    os.makedirs(os.path.join(app, "migrations"))
+    open(os.path.join(app, "__init__.py"), "w").close()
+    open(os.path.join(app, "migrations", "__init__.py"), "w").close()
+    with open(os.path.join(directory, "startup_settings.py"), "w") as f:
+        f.write(STARTUP_SETTINGS)
+    lines = ["from django.db import models", "from sqids_field.field import SqidField", ""]
+    for m in range(NUM_STARTUP_MODELS):
+        lines.append("class Model{}(models.Model):".format(m))
+        for i in range(FIELDS_PER_STARTUP_MODEL):
+            # A mix of salts and min_lengths, so that there are many distinct codec configurations
+            lines.append("    field{} = {}".format(i, field.format(
+                salt=(m * FIELDS_PER_STARTUP_MODEL + i) % 50, min_length=5 + i % 10)))
+        lines.append("")
+    with open(os.path.join(app, "models.py"), "w") as f:
+        f.write("\n".join(lines))
+    _run_startup(directory, "import django; django.setup(); from django.core.management import call_command; "
+                            "call_command('makemigrations', 'startupapp', verbosity=0)")
+    return directory
+
+
+@benchmark("startup_500_fields")
+def startup_500_fields():
+    # django.setup() and `migrate --plan` in a new process, for a project with 500 SqidFields. The baseline project has
+    # IntegerFields instead.
+    project = _startup_project("SqidField(salt='salt {salt}', min_length={min_length}, null=True)")
+    baseline_project = _startup_project("models.IntegerField(null=True)")
+
+    def run():
+        _run_startup(project, STARTUP)
+
+    def baseline():
+        _run_startup(baseline_project, STARTUP)
+
+    return run, baseline, NUM_STARTUP_MODELS * FIELDS_PER_STARTUP_MODEL
+
+
+def _seed_export_books():
+    # Grows the Book table to EXPORT_ROWS rows a chunk at a time, inserting the integer columns directly, as encoding
+    # millions of sqids through the ORM only to store their integers would take longer than the benchmarks themselves
+    from django.db import connection, transaction
+    from library.models import Author, Book
+
+    count = Book.objects.count()
+    quote = connection.ops.quote_name
+    names = ('name', 'author', 'reference_id', 'key', 'alt', 'some_number')
+    columns = [Book._meta.get_field(name).column for name in names]
+    sql = "INSERT INTO {} ({}) VALUES ({})".format(
+        quote(Book._meta.db_table), ", ".join(map(quote, columns)), ", ".join(["%s"] * len(columns)))
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SELECT {} FROM {}".format(quote(Author._meta.pk.column), quote(Author._meta.db_table)))
+        authors = [row[0] for row in cursor.fetchall()]
+        for first in range(count + 1, EXPORT_ROWS + 1, 100_000):
+            cursor.executemany(sql, [("Book {}".format(i), authors[i % len(authors)], i, i, i, i)
+                                     for i in range(first, min(first + 100_000, EXPORT_ROWS + 1))])
+
+
+def _export(format, asynchronous):
+    # Exports every book to a temporary file, or consumes the async streaming response as an ASGI server would, with
+    # the table grown to EXPORT_ROWS rows to show that memory use doesn't grow with it. These run last, so the other
+    # benchmarks see the table as seed() left it. The baseline writes the same rows and columns to the file without
+    # encoding the sqid columns.
+    from django.core.management import call_command
+    from library.models import Book
+    from sqids_field.export import RowWriter, async_export_response, export_fields, export_queryset
+
+    _seed_export_books()
+    output = tempfile.NamedTemporaryFile(suffix="." + format)
+    fields = export_fields(Book)
+    writer = RowWriter(fields, format)
+    writer.sqid_fields = [None] * len(fields)
+
+    async def consume():
+        response = async_export_response(Book.objects.all(), format=format, chunk_size=EXPORT_CHUNK_SIZE)
+        async for part in response.streaming_content:
+            pass
+
+    def run():
+        if asynchronous:
+            asyncio.run(consume())
+        else:
+            call_command("sqids_export", "library.Book", format=format, output=output.name,
+                         chunk_size=EXPORT_CHUNK_SIZE, verbosity=0)
+
+    def baseline():
+        rows = export_queryset(Book.objects.all(), fields).iterator(EXPORT_CHUNK_SIZE)
+        with open(output.name, 'w', newline='', encoding='utf-8') as out:
+            out.write(writer.header())
+            while True:
+                chunk = list(islice(rows, EXPORT_CHUNK_SIZE))
+                if not chunk:
+                    break
+                out.write(writer.write(chunk))
+
+    return run, baseline, max(EXPORT_ROWS, NUM_BOOKS)
+
+
+@benchmark("export_csv", peak_memory=True)
+def export_csv():
+    return _export('csv', asynchronous=False)
+
+
+@benchmark("export_ndjson", peak_memory=True)
+def export_ndjson():
+    return _export('ndjson', asynchronous=False)
+
+
+@benchmark("export_async_csv", peak_memory=True)
+def export_async_csv():
+    return _export('csv', asynchronous=True)
+
+
+def measure(function, repeat):
+    """Returns the best time of one call of `function` over `repeat` rounds of enough calls to take 0.2s or more."""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def measure_peak(function):
+    """Returns the peak memory allocated, in bytes, while calling `function` once."""
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def metadata():
+    import sqids
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'time': time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        'python': sys.version.split()[0],
+        'django': django.get_version(),
+        'sqids': getattr(sqids, '__version__', None),
+        'export_rows': EXPORT_ROWS,
+    }
+
+
+def run(args):
+    global EXPORT_ROWS
+    EXPORT_ROWS = args.export_rows
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'sandbox.settings'
+    from django.conf import settings
+    settings.DATABASES = {'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}}
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+    seed()
+
+    results = {}
+    for name, function, peak_memory in BENCHMARKS:
+        if args.k and not fnmatch.fnmatch(name, args.k):
+            continue
+        try:
+            function_run, baseline, ops = function()
+        except ImportError as e:
+            print("{:<36} skipped: {}".format(name, e))
+            continue
+        seconds = measure(function_run, args.repeat)
+        baseline_seconds = measure(baseline, args.repeat)
+        results[name] = {
+            'seconds': seconds,
+            'baseline_seconds': baseline_seconds,
+            'ratio': seconds / baseline_seconds,
+            'ops': ops,
+        }
+        peak = ""
+        if peak_memory:
+            results[name]['peak_bytes'] = measure_peak(function_run)
+            peak = "  peak {:.1f} MB".format(results[name]['peak_bytes'] / 1e6)
+        print("{:<36} {:10.0f} ns/op  baseline {:8.0f} ns/op  x{:.1f}{}".format(
+            name, seconds / ops * 1e9, baseline_seconds / ops * 1e9, seconds / baseline_seconds, peak))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'meta': metadata(), 'results': results}, f, indent=2)
+        print("Saved to", args.output)
+
+
+def compare(args):
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+    key = 'seconds' if args.absolute else 'ratio'
+    print("{} ({}) -> {} ({}), comparing {}".format(
+        args.base, base['meta'].get('commit'), args.head, head['meta'].get('commit'), key))
+    regressions = []
+    for name, result in head['results'].items():
+        if name not in base['results']:
+            print("{:<36} new".format(name))
+            continue
+        change = result[key] / base['results'][name][key] - 1
+        flag = ""
+        if change > args.threshold:
+            flag = "REGRESSION"
+            regressions.append(name)
+        elif change < -args.threshold:
+            flag = "improved"
+        print("{:<36} {:+7.1%} {}".format(name, change, flag))
+    for name in base['results']:
+        if name not in head['results']:
+            print("{:<36} missing".format(name))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    print("Python:", sys.version)
+    print("Django:", django.get_version(django.VERSION))
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    run_parser = subparsers.add_parser('run', help="Run the benchmarks")
+    run_parser.add_argument('--output', '-o', help="Save the results to this JSON file")
+    run_parser.add_argument('--repeat', type=int, default=5, help="Rounds per benchmark, the best one is kept")
+    run_parser.add_argument('-k', help="Only run benchmarks whose name matches this glob pattern")
+    run_parser.add_argument('--export-rows', type=int, default=EXPORT_ROWS,
+                            help="Rows to grow the Book table to for the export benchmarks")
+    compare_parser = subparsers.add_parser('compare', help="Compare two saved runs")
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('head')
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help="Relative slowdown that counts as a regression")
+    compare_parser.add_argument('--absolute', action='store_true',
+                                help="Compare absolute times instead of ratios to the baselines")
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        run(args)
+    else:
+        sys.exit(compare(args))
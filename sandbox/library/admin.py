@@ -1,10 +1,11 @@
 from django.contrib import admin
 
 from library.models import Author, Editor, Book
+from sqids_field.admin import SqidAdminMixin, SqidSearchAdminMixin
 
 
 @admin.register(Author)
-class AuthorAdmin(admin.ModelAdmin):
+class AuthorAdmin(SqidSearchAdminMixin, admin.ModelAdmin):
     list_display = ('id', 'int_id', 'name')
     search_fields = ('id', 'name')
     ordering = ('name',)
@@ -14,14 +15,14 @@ class AuthorAdmin(admin.ModelAdmin):
 
 
 @admin.register(Editor)
-class EditorAdmin(admin.ModelAdmin):
+class EditorAdmin(SqidSearchAdminMixin, admin.ModelAdmin):
     list_display = ('id', 'name')
     search_fields = ('id', 'name')
     ordering = ('name',)
 
 
 @admin.register(Book)
-class BookAdmin(admin.ModelAdmin):
+class BookAdmin(SqidAdminMixin, SqidSearchAdminMixin, admin.ModelAdmin):
     list_display = ('name', 'id', 'reference_id', 'int_reference_id', 'key', 'alt', 'author')
     list_filter = ('author',)
     search_fields = ('name', 'reference_id')
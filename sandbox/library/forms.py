@@ -1,9 +1,12 @@
 from django import forms
 
-from library.models import Book
+from library.models import Book, Editor
+from sqids_field.forms import SqidModelMultipleChoiceField
 
 
 class BookForm(forms.ModelForm):
+    editors = SqidModelMultipleChoiceField(queryset=Editor.objects.all(), required=False)
+
     class Meta:
         model = Book
         fields = ('name', 'author', 'reference_id', 'key', 'alt', 'some_number', 'editors')
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:22
+
+import sqids_field.materialized
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("library", "0009_alter_book_key"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="author",
+            name="id_str",
+            field=sqids_field.materialized.SqidStringField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                max_length=15,
+                null=True,
+                source="id",
+            ),
+        ),
+    ]
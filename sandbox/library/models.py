@@ -1,6 +1,7 @@
 from django.db import models
 
 from hashid_field import HashidAutoField, HashidField, BigHashidAutoField, BigHashidField
+from sqids_field import SqidStringField, SqidStringQuerySet
 
 from django.urls import reverse
 
@@ -9,15 +10,15 @@ class Author(models.Model):
     id = BigHashidAutoField(primary_key=True, prefix="a_", alphabet="0123456789abcdef")
     name = models.CharField(max_length=40)
     uid = models.UUIDField(null=True, blank=True)
-    id_str = models.CharField(max_length=15, blank=True)
+    # `id` is assigned by the database, so creating an Author takes an extra UPDATE to fill this in after the INSERT.
+    # Author.objects.bulk_create() fills it in with one bulk_update() instead, on databases that return the new ids.
+    id_str = SqidStringField(source='id', max_length=15)
+
+    objects = SqidStringQuerySet.as_manager()
 
     def __str__(self):
         return self.name
 
-    def save(self, *args, **kwargs):
-        self.id_str = str(self.id)
-        super().save(*args, **kwargs)
-
 
 class Editor(models.Model):
     id = HashidAutoField(primary_key=True, salt="A different salt", min_length=20)
@@ -40,3 +40,12 @@ class AuthorViewSet(viewsets.ModelViewSet):
 class BookViewSet(viewsets.ModelViewSet):
     queryset = Book.objects.order_by('id')
     serializer_class = BookSerializer
+
+    def get_queryset(self):
+        # Filter on sqids as the API shows them, e.g. ?reference_id=ref_xxx or ?author=a_xxx
+        queryset = super().get_queryset()
+        for name in ('reference_id', 'author'):
+            value = self.request.query_params.get(name)
+            if value:
+                queryset = queryset.filter(**{name: value})
+        return queryset
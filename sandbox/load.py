@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+"""
+Load test of the sandbox library API, driven in-process through the Django test client against a seeded SQLite
+database.
+
+    sandbox/load.py [--books 200000] [--requests 1000] [--database library.sqlite3] [--json results.json]
+
+Each endpoint is requested --requests times and reported with its p50/p95/p99 latency and requests per second. A
+second pass of the same requests runs under cProfile to report the share of the time that was spent in sqids_field and
+sqids code, as opposed to Django, Django REST Framework and the database. --database keeps the seeded database in a
+file to be reused by later runs, instead of seeding a temporary one every time.
+"""
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import django
+
+NUM_AUTHORS = 1000
+NUM_EDITORS = 20
+# Book list requests go to one of the first pages, deep OFFSETs would only measure SQLite
+NUM_LIST_PAGES = 100
+
+
+def seed(books):
+    from library.models import Author, Book, Editor
+
+    authors = Author.objects.bulk_create(Author(name="Author {}".format(i)) for i in range(NUM_AUTHORS))
+    Editor.objects.bulk_create(Editor(name="Editor {}".format(i)) for i in range(NUM_EDITORS))
+    Book.objects.bulk_create(
+        (Book(name="Book {}".format(i), author=authors[i % len(authors)], reference_id=i, key=i, alt=i, some_number=i)
+         for i in range(1, books + 1)),
+        batch_size=10_000,
+    )
+
+
+def endpoints(rng):
+    """Returns a dict of endpoint names to functions that make one request with the given test client."""
+    from library.models import Author, Book
+
+    book_ids = list(Book.objects.values_list('pk', flat=True))
+    author_ids = [str(id) for id in Author.objects.values_list('pk', flat=True)]
+    reference_ids = [str(id) for id in rng.sample(list(Book.objects.values_list('reference_id', flat=True)),
+                                                  min(len(book_ids), 10_000))]
+    reference_field = Book._meta.get_field('reference_id')
+    created = iter(range(10 ** 9, 2 * 10 ** 9))
+
+    def book_list(client):
+        return client.get("/api/books/", {'page': rng.randint(1, NUM_LIST_PAGES)})
+
+    def book_detail(client):
+        return client.get("/api/books/{}/".format(rng.choice(book_ids)))
+
+    def author_detail(client):
+        return client.get("/api/authors/{}/".format(rng.choice(author_ids)))
+
+    def book_filter(client):
+        return client.get("/api/books/", {'reference_id': rng.choice(reference_ids)})
+
+    def book_create(client):
+        id = next(created)
+        data = {'name': "Load {}".format(id), 'reference_id': str(reference_field.get_sqid(id)), 'key': id}
+        return client.post("/api/books/", data, content_type="application/json")
+
+    return {
+        'book_list': book_list,
+        'book_detail': book_detail,
+        'author_detail': author_detail,
+        'book_filter': book_filter,
+        'book_create': book_create,
+    }
+
+
+def percentiles(latencies):
+    cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+    return {'p50': cuts[49], 'p95': cuts[94], 'p99': cuts[98]}
+
+
+def sqid_share(profile):
+    """Returns the share of the profiled time that was spent in functions of sqids_field and sqids themselves."""
+    import sqids
+    import sqids_field
+
+    packages = tuple(os.path.dirname(module.__file__) + os.sep for module in (sqids_field, sqids))
+    total = 0.0
+    sqid_time = 0.0
+    for (filename, _, _), (_, _, tottime, _, _) in pstats.Stats(profile).stats.items():
+        total += tottime
+        if filename.startswith(packages):
+            sqid_time += tottime
+    return sqid_time / total if total else 0.0
+
+
+def run_endpoint(client, request, count):
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(count):
+        request_start = time.perf_counter()
+        response = request(client)
+        latencies.append(time.perf_counter() - request_start)
+        if response.status_code >= 400:
+            raise RuntimeError("{} {}: {}".format(response.status_code, response.request['PATH_INFO'],
+                                                  response.content[:200]))
+    elapsed = time.perf_counter() - start
+
+    profile = cProfile.Profile()
+    profile.enable()
+    for _ in range(count):
+        request(client)
+    profile.disable()
+
+    return dict(percentiles(latencies), rps=count / elapsed, sqid_share=sqid_share(profile))
+
+
+def main(args):
+    from django.conf import settings
+
+    database = args.database or os.path.join(tempfile.mkdtemp(), "library.sqlite3")
+    settings.DATABASES = {'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': database}}
+    # Otherwise every query is kept in connection.queries
+    settings.DEBUG = False
+    django.setup()
+
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+    from library.models import Book
+
+    setup_test_environment()
+    call_command('migrate', verbosity=0)
+    if not Book.objects.exists():
+        start = time.perf_counter()
+        seed(args.books)
+        print("Seeded {} books in {:.1f}s".format(args.books, time.perf_counter() - start))
+    user = User.objects.filter(is_superuser=True).first() or User.objects.create_superuser("load", "", "load")
+    client = Client()
+    client.force_login(user)
+
+    rng = random.Random(args.seed)
+    results = {}
+    print("{:<16} {:>9} {:>9} {:>9} {:>9} {:>7}".format("endpoint", "p50 ms", "p95 ms", "p99 ms", "req/s", "sqids"))
+    for name, request in endpoints(rng).items():
+        for _ in range(args.warmup):
+            request(client)
+        result = results[name] = run_endpoint(client, request, args.requests)
+        print("{:<16} {:9.2f} {:9.2f} {:9.2f} {:9.0f} {:7.1%}".format(
+            name, result['p50'] * 1e3, result['p95'] * 1e3, result['p99'] * 1e3, result['rps'], result['sqid_share']))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'books': Book.objects.count(), 'requests': args.requests, 'results': results}, f, indent=2)
+        print("Saved to", args.json)
+
+
+if __name__ == "__main__":
+    print("Python:", sys.version)
+    print("Django:", django.get_version(django.VERSION))
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'sandbox.settings'
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--books', type=int, default=200_000, help="Books to seed an empty database with")
+    parser.add_argument('--requests', type=int, default=1000, help="Requests per endpoint")
+    parser.add_argument('--warmup', type=int, default=20, help="Requests per endpoint before measuring")
+    parser.add_argument('--database', help="SQLite database file to use, and seed if it's empty")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="Save the results to this JSON file")
+    main(parser.parse_args())
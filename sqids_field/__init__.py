@@ -1,5 +1,4 @@
-from .field import HashidField, BigHashidField, HashidAutoField, BigHashidAutoField
-from .sqids import Hashid
+import importlib
 
 __title__ = 'Django Sqids Field'
 __version__ = "1.0.0"
@@ -9,3 +8,31 @@ __copyright__ = 'Copyright 2017-2023 Nathan Shafer, Gerben Morsink'
 
 # Version synonym
 VERSION = __version__
+
+# Public names and the modules they live in. They are imported on first access, so that importing sqids_field, or
+# the Django-free sqids_field.core, doesn't import Django or require configured settings.
+_lazy_attributes = {
+    'SqidField': 'sqids_field.field',
+    'BigSqidField': 'sqids_field.field',
+    'SqidAutoField': 'sqids_field.field',
+    'BigSqidAutoField': 'sqids_field.field',
+    'Sqid': 'sqids_field.sqid',
+    'SqidStringField': 'sqids_field.materialized',
+    'SqidStringQuerySet': 'sqids_field.materialized',
+    'warmup': 'sqids_field.prefork',
+}
+
+__all__ = list(_lazy_attributes)
+
+
+def __getattr__(name):
+    module = _lazy_attributes.get(name)
+    if module is None:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,71 @@
+"""
+Transcodes newline separated integers to sqids, or sqids to integers, for a Sqid*Field:
+
+    DJANGO_SETTINGS_MODULE=mysite.settings python -m sqids_field encode --field library.Book.reference_id < ids.txt
+    python -m sqids_field decode --field library.Book.reference_id --settings mysite.settings --input sqids.txt
+"""
+import argparse
+import mmap
+import os
+import sys
+
+
+def get_field(label):
+    from django.apps import apps
+
+    try:
+        app_label, model_name, field_name = label.split(".")
+    except ValueError:
+        raise ValueError("--field must be given as app_label.Model.field") from None
+    return apps.get_model(app_label, model_name)._meta.get_field(field_name)
+
+
+def transcode(command, field, blocks, out):
+    from .buffer import decode_buffer, encode_buffer, format_ints, parse_ints
+
+    for block in blocks:
+        if command == 'encode':
+            out.write(encode_buffer(parse_ints(block), field))
+        else:
+            out.write(format_ints(decode_buffer(block, field)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m sqids_field", description=__doc__.strip().split("\n")[0])
+    parser.add_argument('command', choices=('encode', 'decode'))
+    parser.add_argument('--field', required=True, help="Sqid*Field to use, as app_label.Model.field")
+    parser.add_argument('--input', '-i',
+                        help="File to read instead of stdin, which is memory-mapped and transcoded in chunks of lines")
+    parser.add_argument('--block-size', type=int, default=1 << 24, help="Bytes of stdin read per block")
+    parser.add_argument('--settings', help="Django settings module, instead of DJANGO_SETTINGS_MODULE")
+    args = parser.parse_args(argv)
+
+    if args.settings:
+        os.environ['DJANGO_SETTINGS_MODULE'] = args.settings
+    import django
+
+    django.setup()
+    from .buffer import iter_blocks, iter_line_chunks
+
+    try:
+        field = get_field(args.field)
+    except (LookupError, ValueError) as e:
+        parser.error(str(e))
+
+    out = sys.stdout.buffer
+    try:
+        if args.input:
+            with open(args.input, 'rb') as f:
+                if os.fstat(f.fileno()).st_size:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        transcode(args.command, field, iter_line_chunks(mapped), out)
+        else:
+            transcode(args.command, field, iter_blocks(sys.stdin.buffer, args.block_size), out)
+    except ValueError as e:
+        sys.stderr.write("{}\n".format(e))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
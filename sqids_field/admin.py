@@ -0,0 +1,116 @@
+from django.contrib.admin.utils import lookup_spawns_duplicates
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from django.db.models.constants import LOOKUP_SEP
+from django.utils.text import smart_split, unescape_string_literal
+
+from .field import SqidFieldMixin
+from .forms import SqidModelChoiceField, SqidModelMultipleChoiceField
+from .lookups import get_id_for_sqid_field
+
+
+def _is_sqid_relation(db_field):
+    return isinstance(db_field.target_field, SqidFieldMixin)
+
+
+class SqidAdminMixin:
+    """
+    ModelAdmin mixin that uses the Sqid-aware choice fields for ForeignKeys and ManyToManyFields to models keyed by a
+    Sqid*Field. Works with the default select widgets, raw_id_fields and autocomplete_fields.
+    """
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if _is_sqid_relation(db_field):
+            kwargs.setdefault('form_class', SqidModelChoiceField)
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def formfield_for_manytomany(self, db_field, request, **kwargs):
+        if _is_sqid_relation(db_field):
+            kwargs.setdefault('form_class', SqidModelMultipleChoiceField)
+        return super().formfield_for_manytomany(db_field, request, **kwargs)
+
+
+def _get_sqid_search_field(model, search_field):
+    """Returns the Sqid*Field a search_fields entry refers to, or None if it isn't one."""
+    opts = model._meta
+    field = None
+    for path_part in search_field.lstrip('^=@').split(LOOKUP_SEP):
+        if path_part == 'pk':
+            path_part = opts.pk.name
+        try:
+            field = opts.get_field(path_part)
+        except FieldDoesNotExist:
+            # A lookup, such as `id__exact`, or an invalid path which the default search will report
+            return None
+        if hasattr(field, 'get_path_info'):
+            opts = field.get_path_info()[-1].to_opts
+    if field is not None and field.is_relation and not field.many_to_many:
+        field = field.target_field
+    if isinstance(field, SqidFieldMixin):
+        return field
+    return None
+
+
+class SqidSearchAdminMixin:
+    """
+    ModelAdmin mixin that routes search terms that are sqids for a Sqid*Field in search_fields to an exact lookup on
+    that field only, instead of OR-ing it with every text search, and leaves the Sqid*Fields out of the search for
+    terms that don't decode. sqids decodes many plain words too, so a term only counts as a sqid if it is exactly what
+    its id encodes to. Other terms that decode are searched as both. Applies to the changelist and to autocomplete.
+    """
+    def get_search_fields(self, request):
+        search_fields = super().get_search_fields(request)
+        if getattr(request, '_sqid_search_text_only', False):
+            return [f for f in search_fields if _get_sqid_search_field(self.model, str(f)) is None]
+        return search_fields
+
+    def get_search_results(self, request, queryset, search_term):
+        sqid_search_fields = []
+        for search_field in self.get_search_fields(request):
+            field = _get_sqid_search_field(self.model, str(search_field))
+            if field is not None:
+                sqid_search_fields.append((str(search_field).lstrip('^=@'), field))
+        if not sqid_search_fields or not search_term:
+            return super().get_search_results(request, queryset, search_term)
+
+        may_have_duplicates = False
+        text_terms = []
+        for bit in smart_split(search_term):
+            if bit.startswith(('"', "'")) and bit[0] == bit[-1]:
+                bit = unescape_string_literal(bit)
+            sqid_query = Q()
+            exact = False
+            for lookup_path, field in sqid_search_fields:
+                try:
+                    sqid = field.get_sqid(get_id_for_sqid_field(field, bit))
+                except ValueError:
+                    continue
+                sqid_query |= Q(**{lookup_path: sqid})
+                may_have_duplicates |= lookup_spawns_duplicates(self.opts, lookup_path)
+                exact |= str(sqid) == bit
+            if exact:
+                queryset = queryset.filter(sqid_query)
+            else:
+                text_terms.append((bit, sqid_query))
+
+        has_text_fields = len(sqid_search_fields) < len(self.get_search_fields(request))
+        for bit, sqid_query in text_terms:
+            if not has_text_fields:
+                if not sqid_query:
+                    # Nothing left to search this term with, and it can't match any of the Sqid*Fields
+                    return queryset.none(), may_have_duplicates
+                queryset = queryset.filter(sqid_query)
+                continue
+            text_queryset, duplicates = self._search_text(request, queryset, bit)
+            may_have_duplicates |= duplicates
+            queryset = text_queryset | queryset.filter(sqid_query) if sqid_query else text_queryset
+        return queryset, may_have_duplicates
+
+    def _search_text(self, request, queryset, bit):
+        # Searches a single term with the text search_fields only
+        if any(c.isspace() for c in bit):
+            bit = '"{}"'.format(bit.replace('\\', '\\\\').replace('"', '\\"'))
+        request._sqid_search_text_only = True
+        try:
+            return super().get_search_results(request, queryset, bit)
+        finally:
+            request._sqid_search_text_only = False
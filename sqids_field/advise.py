@@ -0,0 +1,93 @@
+"""
+Measuring how a candidate alphabet, min_length and blocklist behave over an expected id range: encode and decode
+throughput, the distribution of sqid lengths, how often sqids are all digits and how often the blocklist forces a
+re-encode. Used by ``manage.py sqids_advise``.
+"""
+import random
+import time
+from collections import Counter
+
+from .codec import codec_fingerprint, get_codec, get_config, get_table_codec
+
+DEFAULT_SAMPLES = 1_000_000
+DEFAULT_CHUNK_SIZE = 100_000
+# Number of ids that throughput is timed with, in this process
+THROUGHPUT_SAMPLES = 20_000
+
+
+def _sample_ids(seed, count, max_id):
+    rng = random.Random(seed)
+    return [rng.randrange(max_id + 1) for _ in range(count)]
+
+
+def _sample_chunk(fingerprint, seed, count, max_id):
+    """Returns the sqid length histogram, and the number of all-digit and re-encoded sqids, for a chunk of samples."""
+    codec = get_table_codec(*get_config(fingerprint))
+    blocklist = codec.blocklist
+    lengths = Counter()
+    numeric = 0
+    reencoded = 0
+    for id in _sample_ids(seed, count, max_id):
+        sqid = codec.encode(id)
+        lengths[len(sqid)] += 1
+        if sqid.isdigit():
+            numeric += 1
+        if blocklist:
+            first = codec.encode_offset(id, codec.offset(id))
+            if len(first) >= 3 and blocklist.matches(first):
+                reencoded += 1
+    return lengths, numeric, reencoded
+
+
+def _throughput(function, values):
+    start = time.perf_counter()
+    for value in values:
+        function(value)
+    elapsed = time.perf_counter() - start
+    return len(values) / elapsed if elapsed else float('inf')
+
+
+def advise(field, max_id, samples=DEFAULT_SAMPLES, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, seed=0):
+    """
+    Samples `samples` ids uniformly from 0 to `max_id` for the configuration of `field`, a Sqid*Field that doesn't
+    have to be attached to a model, in chunks on a process pool. Returns a dict of the measurements.
+    """
+    from .parallel import get_executor
+
+    config = (field.salt, field.min_length, field.alphabet, field.blocklist)
+    fingerprint = codec_fingerprint(*config)
+    chunks = [(seed + i, min(chunk_size, samples - start)) for i, start in enumerate(range(0, samples, chunk_size))]
+    lengths = Counter()
+    numeric = 0
+    reencoded = 0
+    start = time.perf_counter()
+    with get_executor([field], workers) as executor:
+        futures = [executor.submit(_sample_chunk, fingerprint, chunk_seed, count, max_id)
+                   for chunk_seed, count in chunks]
+        for future in futures:
+            chunk_lengths, chunk_numeric, chunk_reencoded = future.result()
+            lengths.update(chunk_lengths)
+            numeric += chunk_numeric
+            reencoded += chunk_reencoded
+    sampling_seconds = time.perf_counter() - start
+
+    ids = _sample_ids(seed, min(samples, THROUGHPUT_SAMPLES), max_id)
+    codec = get_codec(*config)
+    table_codec = get_table_codec(*config)
+    sqids = [codec.encode([id]) for id in ids]
+    unpadded = get_table_codec(field.salt, 0, field.alphabet, field.blocklist)
+    return {
+        'samples': samples,
+        'max_id': max_id,
+        'sampling_seconds': sampling_seconds,
+        'encode_per_second': _throughput(lambda id: codec.encode([id]), ids),
+        'decode_per_second': _throughput(codec.decode, sqids),
+        'table_encode_per_second': _throughput(table_codec.encode, ids),
+        'table_decode_per_second': _throughput(table_codec.decode, sqids),
+        'lengths': dict(sorted(lengths.items())),
+        'max_length': len(table_codec.encode(max_id)),
+        # The min_length that makes every sqid up to max_id the same length
+        'fixed_length': max(len(unpadded.encode(max_id)), field.min_length),
+        'numeric_rate': numeric / samples if samples else 0.0,
+        'reencode_rate': reencoded / samples if samples else 0.0,
+    }
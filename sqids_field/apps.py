@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class SqidsFieldConfig(AppConfig):
+    name = 'sqids_field'
+    verbose_name = "Sqids Field"
+
+    def ready(self):
+        # Registers the sqid_encode() and sqid_decode() SQLite functions on every new connection
+        from . import functions  # noqa: F401
@@ -0,0 +1,269 @@
+"""
+Bulk transcoding of newline separated sqids and integers held in bytes, memoryviews or memory-mapped files.
+
+Decoded integers are written into an ``array('q')``, which can be preallocated and reused, and encoded sqids are
+returned as one bytes object. With NumPy installed, lines are sliced out of the buffer and decoded with the tables from
+sqids_field.vector, so no Python object is created per token. Without it, each line is decoded one at a time.
+"""
+import sys
+from array import array
+
+from .vector import as_tokens, decode_tokens, encode_tokens, resolve_codec
+
+# Number of lines handled per vectorized batch, which bounds the size of the temporary arrays
+CHUNK_LINES = 1 << 20
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _lines(np, buf):
+    """Returns the start offsets and lengths of the non-empty lines in a uint8 array, ignoring a trailing \\r."""
+    if not len(buf):
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    ends = np.flatnonzero(buf == ord("\n"))
+    if buf[-1] != ord("\n"):
+        ends = np.append(ends, len(buf))
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    lengths = ends - starts
+    carriage_returns = (lengths > 0) & (buf[np.maximum(ends - 1, 0)] == ord("\r"))
+    lengths -= carriage_returns
+    non_empty = lengths > 0
+    return starts[non_empty], lengths[non_empty]
+
+
+def _max_token_length(codec, prefix):
+    """Returns the length of the longest canonical sqid of a number up to sys.maxsize, including the prefix."""
+    digits = 1
+    while codec.base ** digits <= sys.maxsize:
+        digits += 1
+    return len(prefix) + max(codec.min_length, 1 + digits)
+
+
+def _token_matrix(np, buf, starts, lengths, max_width):
+    """
+    Copies lines into a (lines, width) uint8 matrix padded with NUL bytes. Lines longer than `max_width` are cut short,
+    so that a single long line can't blow up the size of the matrix, and callers handle them one at a time.
+    """
+    lengths = np.minimum(lengths, max_width)
+    width = int(lengths.max(initial=1))
+    columns = np.arange(width)
+    inside = columns[None, :] < lengths[:, None]
+    positions = np.minimum(starts[:, None] + columns[None, :], len(buf) - 1)
+    return np.where(inside, buf[positions], 0).astype(np.uint8)
+
+
+def _output(out, count):
+    if out is None:
+        return array('q', bytes(8 * count))
+    if len(out) < count:
+        raise ValueError("Output buffer has room for {} integers, but {} are needed".format(len(out), count))
+    return out
+
+
+def _decode_line(codec, prefix, line):
+    token = bytes(line).decode('ascii', 'replace')
+    number = codec.decode(token[len(prefix):]) if token.startswith(prefix) else None
+    if number is None or number > sys.maxsize:
+        raise ValueError("'{}' is not a valid Sqids string".format(token))
+    return number
+
+
+def decode_buffer(data, field_or_codec, out=None):
+    """
+    Decodes newline separated sqids in `data` (bytes, bytearray, memoryview, mmap or anything else supporting the
+    buffer protocol) for a Sqid*Field or TableCodec. Blank lines are skipped, and invalid sqids raise ValueError.
+
+    Returns an ``array('q')`` of the integers, or writes them to the start of the preallocated `out` array and returns
+    how many were written.
+    """
+    np = _numpy()
+    if np is None:
+        return _decode_buffer_python(data, field_or_codec, out)
+    codec, prefix = resolve_codec(field_or_codec)
+    max_length = _max_token_length(codec, prefix)
+    buf = np.frombuffer(data, dtype=np.uint8)
+    starts, lengths = _lines(np, buf)
+    result = _output(out, len(starts))
+    numbers = np.frombuffer(result, dtype=np.int64)
+    for first in range(0, len(starts), CHUNK_LINES):
+        chunk_starts = starts[first:first + CHUNK_LINES]
+        chunk_lengths = lengths[first:first + CHUNK_LINES]
+        matrix = _token_matrix(np, buf, chunk_starts, chunk_lengths, max_length)
+        tokens = matrix.view('S{}'.format(matrix.shape[1])).ravel()
+        tokens, valid = as_tokens(np, tokens, prefix)
+        decoded, decoded_valid = decode_tokens(np, codec, tokens)
+        valid &= decoded_valid
+        # Longer lines aren't the canonical sqid of any 64-bit id, but could still decode to one, as the decoder
+        # ignores what follows the separators, so they are decoded one at a time like the invalid ones
+        long_lines = chunk_lengths > max_length
+        for i in np.flatnonzero(~valid | long_lines):
+            line = buf[chunk_starts[i]:chunk_starts[i] + chunk_lengths[i]]
+            decoded[i] = _decode_line(codec, prefix, line)
+        numbers[first:first + len(decoded)] = decoded
+    return result if out is None else len(starts)
+
+
+def _decode_buffer_python(data, field_or_codec, out):
+    codec, prefix = resolve_codec(field_or_codec)
+    numbers = array('q')
+    for line in bytes(data).split(b"\n"):
+        line = line.rstrip(b"\r")
+        if not line:
+            continue
+        numbers.append(_decode_line(codec, prefix, line))
+    if out is None:
+        return numbers
+    _output(out, len(numbers))[:len(numbers)] = numbers
+    return len(numbers)
+
+
+def _is_int64_buffer(numbers):
+    """Returns whether `numbers` is a contiguous buffer of native signed 64-bit integers, read without copying."""
+    try:
+        view = memoryview(numbers)
+    except TypeError:
+        return False
+    return view.c_contiguous and view.itemsize == 8 and view.format.lstrip('@=') in ('q', 'l')
+
+
+def encode_buffer(numbers, field_or_codec):
+    """
+    Encodes integers from an ``array('q')``, a memoryview of int64s or any sequence of integers into newline
+    terminated sqids for a Sqid*Field or TableCodec, returned as bytes.
+    """
+    np = _numpy()
+    if np is None:
+        codec, prefix = resolve_codec(field_or_codec)
+        encode = codec.encode
+        return "".join([prefix + encode(number) + "\n" for number in numbers]).encode('ascii')
+    codec, prefix = resolve_codec(field_or_codec)
+    if _is_int64_buffer(numbers):
+        values = np.frombuffer(numbers, dtype=np.int64)
+    else:
+        values = np.asarray(numbers, dtype=np.int64)
+    if len(values) and values.min() < 0:
+        raise ValueError("Encoding supports numbers between 0 and {}".format(sys.maxsize))
+    prefix = prefix.encode('ascii')
+    parts = []
+    for first in range(0, len(values), CHUNK_LINES):
+        tokens = encode_tokens(np, codec, values[first:first + CHUNK_LINES])
+        width = tokens.dtype.itemsize
+        matrix = np.zeros((len(tokens), len(prefix) + width + 1), dtype=np.uint8)
+        matrix[:, :len(prefix)] = np.frombuffer(prefix, dtype=np.uint8)
+        matrix[:, len(prefix):len(prefix) + width] = tokens.view(np.uint8).reshape(len(tokens), width)
+        lengths = len(prefix) + np.count_nonzero(matrix[:, len(prefix):], axis=1)
+        matrix[np.arange(len(tokens)), lengths] = ord("\n")
+        flat = matrix.ravel()
+        parts.append(flat[flat != 0].tobytes())
+    return b"".join(parts)
+
+
+def parse_ints(data, out=None):
+    """
+    Parses newline separated decimal integers in a buffer into an ``array('q')``, or into the preallocated `out` array
+    returning how many were written. Blank lines are skipped. Like decode_buffer(), a trailing \\r is ignored, and any
+    other whitespace makes the line invalid.
+    """
+    np = _numpy()
+    if np is None:
+        numbers = array('q')
+        for line in bytes(data).split(b"\n"):
+            line = line.rstrip(b"\r")
+            if not line:
+                continue
+            if not line.isdigit() or int(line) > sys.maxsize:
+                raise ValueError("'{}' is not a positive integer".format(line.decode('ascii', 'replace')))
+            numbers.append(int(line))
+        if out is None:
+            return numbers
+        _output(out, len(numbers))[:len(numbers)] = numbers
+        return len(numbers)
+    buf = np.frombuffer(data, dtype=np.uint8)
+    starts, lengths = _lines(np, buf)
+    result = _output(out, len(starts))
+    numbers = np.frombuffer(result, dtype=np.int64)
+    for first in range(0, len(starts), CHUNK_LINES):
+        chunk_starts = starts[first:first + CHUNK_LINES]
+        chunk_lengths = lengths[first:first + CHUNK_LINES]
+        # Lines longer than 18 digits are parsed one at a time below, so only their first 19 bytes are needed
+        matrix = _token_matrix(np, buf, chunk_starts, chunk_lengths, 19)
+        inside = np.arange(matrix.shape[1])[None, :] < chunk_lengths[:, None]
+        digits = matrix.astype(np.int64) - ord("0")
+        valid = (((digits >= 0) & (digits <= 9)) | ~inside).all(axis=1) & (chunk_lengths <= 18)
+        if not valid.all():
+            # Too long to be sure it fits in an int64 without overflowing, or not a number at all
+            for i in np.flatnonzero(~valid):
+                line = bytes(buf[chunk_starts[i]:chunk_starts[i] + chunk_lengths[i]])
+                if not line.isdigit() or int(line) > sys.maxsize:
+                    raise ValueError("'{}' is not a positive integer".format(line.decode('ascii', 'replace')))
+        parsed = np.zeros(len(chunk_starts), dtype=np.int64)
+        for column in range(min(matrix.shape[1], 18)):
+            parsed = np.where(inside[:, column], parsed * 10 + digits[:, column], parsed)
+        for i in np.flatnonzero(~valid):
+            parsed[i] = int(bytes(buf[chunk_starts[i]:chunk_starts[i] + chunk_lengths[i]]))
+        numbers[first:first + len(parsed)] = parsed
+    return result if out is None else len(starts)
+
+
+def format_ints(numbers):
+    """Formats integers from an ``array('q')`` or sequence as newline terminated decimal text, returned as bytes."""
+    if not len(numbers):
+        return b""
+    return b"\n".join([str(number).encode('ascii') for number in numbers]) + b"\n"
+
+
+def iter_line_chunks(data, lines=None, window=1 << 20):
+    """
+    Yields consecutive slices of `data` (bytes, mmap or anything else that can be sliced into bytes) holding at most
+    `lines` lines each, CHUNK_LINES by default, and ending on a line boundary, so that a large memory-mapped file is
+    transcoded one bounded chunk at a time. Newlines are searched for `window` bytes at a time.
+    """
+    lines = lines or CHUNK_LINES
+    np = _numpy()
+    size = len(data)
+    start = 0
+    while start < size:
+        position = start
+        found = 0
+        end = size
+        while position < size:
+            piece = bytes(data[position:position + window])
+            count = piece.count(b"\n")
+            if found + count >= lines:
+                needed = lines - found
+                if np is not None:
+                    offset = int(np.flatnonzero(np.frombuffer(piece, dtype=np.uint8) == ord("\n"))[needed - 1])
+                else:
+                    offset = -1
+                    for _ in range(needed):
+                        offset = piece.index(b"\n", offset + 1)
+                end = position + offset + 1
+                break
+            found += count
+            position += len(piece)
+        yield data[start:end]
+        start = end
+
+
+def iter_blocks(stream, block_size=1 << 24):
+    """Reads a binary stream in blocks of about `block_size` bytes that end on a line boundary."""
+    remainder = b""
+    while True:
+        block = stream.read(block_size)
+        if not block:
+            break
+        block = remainder + block
+        end = block.rfind(b"\n") + 1
+        if end:
+            remainder = block[end:]
+            yield block[:end]
+        else:
+            remainder = block
+    if remainder:
+        yield remainder
@@ -0,0 +1,311 @@
+import functools
+import hashlib
+import sys
+import threading
+
+from sqids import Sqids
+from sqids.constants import DEFAULT_BLOCKLIST
+
+# Shared sqids.Sqids instances, keyed by their configuration. Every field, descriptor, serializer field and Sqid object
+# with the same salt, min_length, alphabet and blocklist ends up using the same codec, which is also what allows a Sqid
+# to be serialized as just a fingerprint of its codec and rebound to it when it is loaded again.
+_codecs = {}
+_table_codecs = {}
+_encode_caches = {}
+_fingerprints = {}
+_configs_by_fingerprint = {}
+_lock = threading.Lock()
+
+
+def normalize_blocklist(blocklist):
+    """
+    Normalizes a blocklist setting: None keeps the sqids default blocklist, "none" (or any empty iterable) disables it,
+    and an iterable of words is returned as a sorted tuple of unique lowercased words.
+    """
+    if blocklist is None:
+        return None
+    if isinstance(blocklist, str):
+        if blocklist.lower() != "none":
+            raise ValueError("blocklist must be None, 'none' or an iterable of words")
+        return ()
+    return tuple(sorted({word.lower() for word in blocklist}))
+
+
+def _key(salt, min_length, alphabet, blocklist):
+    if blocklist is not None and type(blocklist) is not tuple:
+        blocklist = normalize_blocklist(blocklist)
+    return salt, min_length, alphabet, blocklist
+
+
+def codec_fingerprint(salt, min_length, alphabet, blocklist=None):
+    """Returns a short, stable bytes fingerprint identifying a codec configuration."""
+    key = _key(salt, min_length, alphabet, blocklist)
+    fingerprint = _fingerprints.get(key)
+    if fingerprint is None:
+        # Configurations with the default blocklist keep the fingerprint they had before blocklists were configurable
+        digest = hashlib.blake2b(repr(key if key[3] is not None else key[:3]).encode('utf-8'), digest_size=8).digest()
+        with _lock:
+            fingerprint = _fingerprints.setdefault(key, digest)
+            _configs_by_fingerprint.setdefault(fingerprint, key)
+    return fingerprint
+
+
+@functools.lru_cache(maxsize=None)
+def salt_alphabet(alphabet, salt):
+    """
+    Returns `alphabet` shuffled with `salt`, which is how a salt is applied, as sqids itself has none. Without a salt
+    the alphabet is returned unchanged, so unsalted configurations encode exactly like plain sqids.
+    """
+    if not salt:
+        return alphabet
+    # The consistent shuffle of hashids, so that configurations only differing by their salt encode differently
+    chars = list(alphabet)
+    v = p = 0
+    for i in range(len(chars) - 1, 0, -1):
+        v %= len(salt)
+        n = ord(salt[v])
+        p += n
+        j = (n + v + p) % i
+        chars[i], chars[j] = chars[j], chars[i]
+        v += 1
+    return "".join(chars)
+
+
+def get_codec(salt, min_length, alphabet, blocklist=None):
+    """Returns the shared sqids.Sqids instance for the given configuration, creating and registering it if needed."""
+    key = _key(salt, min_length, alphabet, blocklist)
+    codec = _codecs.get(key)
+    if codec is None:
+        codec_fingerprint(*key)
+        with _lock:
+            codec = _codecs.get(key)
+            if codec is None:
+                if key[3] is None:
+                    codec = Sqids(alphabet=salt_alphabet(key[2], key[0]), min_length=key[1])
+                else:
+                    codec = Sqids(alphabet=salt_alphabet(key[2], key[0]), min_length=key[1], blocklist=list(key[3]))
+                _codecs[key] = codec
+    return codec
+
+
+def register_codec(salt, min_length, alphabet, sqids, blocklist=None):
+    """Registers an already constructed sqids.Sqids instance as the shared codec for its configuration."""
+    key = _key(salt, min_length, alphabet, blocklist)
+    codec_fingerprint(*key)
+    with _lock:
+        return _codecs.setdefault(key, sqids)
+
+
+def get_config(fingerprint):
+    """Returns the (salt, min_length, alphabet, blocklist) configuration registered for the given fingerprint."""
+    try:
+        return _configs_by_fingerprint[fingerprint]
+    except KeyError:
+        raise LookupError("No sqids codec is registered for fingerprint {}".format(fingerprint.hex())) from None
+
+
+def get_encode_cache(salt, min_length, alphabet, blocklist=None):
+    """
+    Returns the shared dict of ids to sqid strings (without prefix) that were encoded ahead of time for the given
+    configuration, e.g. by sqids_field.warmup().
+    """
+    key = _key(salt, min_length, alphabet, blocklist)
+    cache = _encode_caches.get(key)
+    if cache is None:
+        with _lock:
+            cache = _encode_caches.setdefault(key, {})
+    return cache
+
+
+def get_table_codec(salt, min_length, alphabet, blocklist=None):
+    """Returns the shared TableCodec for the given configuration."""
+    key = _key(salt, min_length, alphabet, blocklist)
+    codec = _table_codecs.get(key)
+    if codec is None:
+        codec_fingerprint(*key)
+        with _lock:
+            codec = _table_codecs.get(key)
+            if codec is None:
+                codec = TableCodec(salt_alphabet(alphabet, salt), min_length,
+                                   DEFAULT_BLOCKLIST if key[3] is None else key[3])
+                _table_codecs[key] = codec
+    return codec
+
+
+def _shuffle(alphabet):
+    # The consistent shuffle from the sqids spec
+    chars = list(alphabet)
+    i = 0
+    j = len(chars) - 1
+    while j > 0:
+        r = (i * j + ord(chars[i]) + ord(chars[j])) % len(chars)
+        chars[i], chars[r] = chars[r], chars[i]
+        i += 1
+        j -= 1
+    return "".join(chars)
+
+
+class BlocklistMatcher(object):
+    """
+    A blocklist compiled for matching against ids, split into words matched exactly, at the ends of an id and anywhere
+    the same way sqids does. Words are indexed by their first three characters (and by their last three for matches at
+    the end), so checking an id takes one dict lookup per position instead of a substring search per word.
+    """
+    def __init__(self, exact, ends, anywhere):
+        self.exact = frozenset(exact)
+        self.starts = self._index(ends, lambda word: word[:3])
+        self.ends = self._index(ends, lambda word: word[-3:])
+        self.anywhere = self._index(anywhere, lambda word: word[:3])
+        self.empty = not (exact or ends or anywhere)
+
+    @staticmethod
+    def _index(words, key):
+        index = {}
+        for word in sorted(words):
+            index.setdefault(key(word), []).append(word)
+        return index
+
+    def __bool__(self):
+        return not self.empty
+
+    def matches(self, id_):
+        """Returns whether `id_` contains a blocked word."""
+        id_ = id_.lower()
+        length = len(id_)
+        if length <= 3:
+            return id_ in self.exact
+        words = self.starts.get(id_[:3])
+        if words is not None and id_.startswith(tuple(words)):
+            return True
+        words = self.ends.get(id_[-3:])
+        if words is not None and id_.endswith(tuple(words)):
+            return True
+        anywhere = self.anywhere
+        if anywhere:
+            for i in range(length - 3):
+                words = anywhere.get(id_[i:i + 3])
+                if words is not None:
+                    for word in words:
+                        if id_.startswith(word, i):
+                            return True
+        return False
+
+
+class TableCodec(object):
+    """
+    Encodes and decodes single integers exactly like sqids.Sqids, from tables precomputed for every possible alphabet
+    offset instead of rotating and shuffling the alphabet on each call.
+
+    With a single number the sqids algorithm only depends on the offset picked from ``number % len(alphabet)``, so the
+    prefix character, the digit alphabet, the separator and the padding for each of the ``len(alphabet)`` offsets are
+    all known up front. This is also what makes vectorized and parallel encoding possible.
+    """
+    def __init__(self, alphabet, min_length=0, blocklist=DEFAULT_BLOCKLIST):
+        self.alphabet = _shuffle(alphabet)
+        self.min_length = min_length
+        self.size = len(self.alphabet)
+        self.base = self.size - 1
+        self.ords = [ord(c) for c in self.alphabet]
+
+        # Per offset: prefix character, digit alphabet, separator, separator following the first number (used to
+        # detect multiple numbers when decoding) and padding.
+        self.prefixes = []
+        self.digits = []
+        self.digit_values = []
+        self.separators = []
+        self.next_separators = []
+        self.paddings = []
+        for offset in range(self.size):
+            rotated = self.alphabet[offset:] + self.alphabet[:offset]
+            reverse = rotated[::-1]
+            self.prefixes.append(rotated[0])
+            self.digits.append(reverse[1:])
+            self.digit_values.append({c: i for i, c in enumerate(reverse[1:])})
+            self.separators.append(reverse[0])
+            shuffled = _shuffle(reverse)
+            self.next_separators.append(shuffled[0])
+            padding = [reverse[0]]
+            length = 1
+            while length < min_length:
+                padding.append(shuffled)
+                length += len(shuffled)
+                shuffled = _shuffle(shuffled)
+            self.paddings.append("".join(padding)[:max(min_length - 2, 0)])
+        self.offsets = {c: i for i, c in enumerate(self.alphabet)}
+
+        # Blocklist words that can appear in an id, split the same way sqids does
+        alphabet_lower = set(alphabet.lower())
+        self.blocklist_exact = set()
+        self.blocklist_ends = set()
+        self.blocklist_anywhere = set()
+        for word in blocklist:
+            word = word.lower()
+            if len(word) < 3 or not set(word) <= alphabet_lower:
+                continue
+            if len(word) == 3:
+                self.blocklist_exact.add(word)
+            elif set(word) & set("0123456789"):
+                self.blocklist_ends.add(word)
+            else:
+                self.blocklist_anywhere.add(word)
+        self.blocklist = BlocklistMatcher(self.blocklist_exact, self.blocklist_ends, self.blocklist_anywhere)
+
+    def offset(self, number):
+        """Returns the alphabet offset sqids starts from when encoding `number`."""
+        return (self.ords[number % self.size] + 1) % self.size
+
+    def encode_offset(self, number, offset):
+        """Encodes `number` from the given alphabet offset, without checking the blocklist."""
+        digits = self.digits[offset]
+        base = self.base
+        chars = []
+        while True:
+            number, digit = divmod(number, base)
+            chars.append(digits[digit])
+            if not number:
+                break
+        chars.append(self.prefixes[offset])
+        id_ = "".join(reversed(chars))
+        if self.min_length > len(id_):
+            id_ += self.paddings[offset][:self.min_length - len(id_)]
+        return id_
+
+    def encode(self, number):
+        if not 0 <= number <= sys.maxsize:
+            raise ValueError("Encoding supports numbers between 0 and {}".format(sys.maxsize))
+        offset = self.offset(number)
+        for increment in range(self.size + 1):
+            id_ = self.encode_offset(number, (offset + increment) % self.size)
+            if len(id_) < 3 or not self.blocklist or not self.blocklist.matches(id_):
+                return id_
+        raise ValueError("Reached max attempts to re-generate the ID")
+
+    def decode(self, id_):
+        """Returns the single integer encoded in `id_`, or None if it isn't a valid sqid for exactly one number."""
+        if not id_:
+            return None
+        offset = self.offsets.get(id_[0])
+        if offset is None:
+            return None
+        separator = self.separators[offset]
+        digits, found, rest = id_[1:].partition(separator)
+        if not digits:
+            return None
+        if rest and rest[0] != self.next_separators[offset]:
+            return None
+        offsets = self.offsets
+        for c in rest:
+            if c not in offsets:
+                return None
+        digit_values = self.digit_values[offset]
+        number = 0
+        base = self.base
+        try:
+            for c in digits:
+                number = number * base + digit_values[c]
+        except KeyError:
+            return None
+        return number
+
+    def is_blocked(self, id_):
+        return self.blocklist.matches(id_)
@@ -11,4 +11,13 @@ setattr(settings, 'SQID_FIELD_ALLOW_INT_LOOKUP', getattr(settings, 'SQID_FIELD_A
 setattr(settings, 'SQID_FIELD_LOOKUP_EXCEPTION', getattr(settings, 'SQID_FIELD_LOOKUP_EXCEPTION', False))
 setattr(settings, 'SQID_FIELD_ENABLE_SQID_OBJECT', getattr(settings, 'SQID_FIELD_ENABLE_SQID_OBJECT', True))
 setattr(settings, 'SQID_FIELD_ENABLE_DESCRIPTOR', getattr(settings, 'SQID_FIELD_ENABLE_DESCRIPTOR', True))
+setattr(settings, 'SQID_FIELD_SERIALIZE_INT', getattr(settings, 'SQID_FIELD_SERIALIZE_INT', False))
+setattr(settings, 'SQID_FIELD_BLOCKLIST', getattr(settings, 'SQID_FIELD_BLOCKLIST', None))
+setattr(settings, 'SQID_FIELD_DENSE_TABLE_DIR', getattr(settings, 'SQID_FIELD_DENSE_TABLE_DIR', None))
+setattr(settings, 'SQID_FIELD_NUMERIC_INDEX_DIR', getattr(settings, 'SQID_FIELD_NUMERIC_INDEX_DIR', None))
+setattr(settings, 'SQID_FIELD_METRICS', getattr(settings, 'SQID_FIELD_METRICS', False))
+setattr(settings, 'SQID_FIELD_METRICS_TIMINGS', getattr(settings, 'SQID_FIELD_METRICS_TIMINGS', False))
 
+if settings.SQID_FIELD_METRICS:
+    from . import metrics
+    metrics.enable(timings=settings.SQID_FIELD_METRICS_TIMINGS)
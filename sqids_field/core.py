@@ -0,0 +1,16 @@
+"""
+The parts of sqids_field that don't depend on Django: the shared codec registry, TableCodec and the Sqid class.
+
+Importing this module doesn't import Django or read its settings, so processes that only need to encode and decode
+ids can use it directly, e.g. ``from sqids_field.core import Sqid, get_codec``.
+"""
+from .codec import (
+    TableCodec, codec_fingerprint, get_codec, get_config, get_encode_cache, get_table_codec, normalize_blocklist,
+    register_codec,
+)
+from .sqid import Sqid, msgpack_default, msgpack_ext_hook
+
+__all__ = [
+    'Sqid', 'TableCodec', 'codec_fingerprint', 'get_codec', 'get_config', 'get_encode_cache', 'get_table_codec',
+    'msgpack_default', 'msgpack_ext_hook', 'normalize_blocklist', 'register_codec',
+]
@@ -0,0 +1,201 @@
+"""
+Dense, memory-mapped tables of precomputed sqids for small id ranges.
+
+A table holds the sqid (without prefix) of every id from 0 up to its size as fixed-width, NUL padded ASCII rows, so
+encoding an id is a slice of the mapped file. A hash index of row numbers, keyed by the sqid's bytes, makes decoding a
+lookup as well. Tables are written by ``manage.py sqids_dense_table`` to files named after the codec fingerprint, and
+are mapped read-only, so every process on the host shares the same pages. Ids and sqids outside of a table fall back
+to the codec.
+"""
+import mmap
+import os
+import struct
+import threading
+import warnings
+from array import array
+
+from .codec import codec_fingerprint, get_codec, get_table_codec
+
+MAGIC = b"SQIDTBL1"
+# Magic, codec fingerprint, number of ids, number of hash slots, row width
+_header = struct.Struct("<8s8sQQI4x")
+SUFFIX = ".sqidtable"
+
+_dense_tables = {}
+_lock = threading.Lock()
+
+
+def dense_table_path(directory, salt, min_length, alphabet, blocklist=None):
+    """Returns the path of the dense table for the given codec configuration in `directory`."""
+    return os.path.join(directory, codec_fingerprint(salt, min_length, alphabet, blocklist).hex() + SUFFIX)
+
+
+def _slot_count(size):
+    # A prime at least twice the number of ids keeps probe sequences short and uses every byte of the hashed sqid
+    n = 2 * size + 1
+    while any(n % d == 0 for d in range(3, int(n ** 0.5) + 1, 2)):
+        n += 2
+    return n
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+def _encode_rows(codec, size):
+    try:
+        import numpy
+    except ImportError:
+        encoded = [codec.encode(id).encode('ascii') for id in range(size)]
+        width = max(map(len, encoded), default=1)
+        return b"".join(token.ljust(width, b"\0") for token in encoded), width
+    from .vector import encode_tokens
+    tokens = encode_tokens(numpy, codec, numpy.arange(size, dtype=numpy.int64))
+    return tokens.tobytes(), max(tokens.dtype.itemsize, 1)
+
+
+def write_dense_table(path, size, salt, min_length, alphabet, blocklist=None):
+    """
+    Encodes the ids below `size` for the given codec configuration and writes them, with their hash index, to `path`.
+    The file is written next to `path` and then renamed over it, so processes that have the previous table mapped keep
+    reading a consistent copy.
+    """
+    codec = get_table_codec(salt, min_length, alphabet, blocklist)
+    rows, width = _encode_rows(codec, size)
+    slots = _slot_count(size)
+    index = array('q', [-1]) * slots
+    for id in range(size):
+        token = rows[id * width:(id + 1) * width]
+        slot = int.from_bytes(token, 'little') % slots
+        while index[slot] != -1:
+            slot = slot + 1 if slot + 1 < slots else 0
+        index[slot] = id
+
+    header = _header.pack(MAGIC, codec_fingerprint(salt, min_length, alphabet, blocklist), size, slots, width)
+    tmp_path = "{}.{}.tmp".format(path, os.getpid())
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            f.write(rows)
+            f.write(b"\0" * (_align(len(header) + len(rows)) - len(header) - len(rows)))
+            f.write(index.tobytes())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+class DenseTable(object):
+    """A read-only, memory-mapped dense table written by write_dense_table()."""
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, self.fingerprint, self.size, self.slots, self.width = _header.unpack_from(self._mmap)
+        except struct.error:
+            magic = None
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError("{} is not a sqids dense table".format(path))
+        self.path = path
+        self._rows = _header.size
+        index_start = _align(self._rows + self.size * self.width)
+        self._index = memoryview(self._mmap)[index_start:index_start + self.slots * 8].cast('q')
+
+    def __len__(self):
+        return self.size
+
+    def encode(self, id):
+        """Returns the sqid of `id`, or None if it is outside of the table."""
+        if 0 <= id < self.size:
+            start = self._rows + id * self.width
+            return self._mmap[start:start + self.width].rstrip(b"\0").decode('ascii')
+        return None
+
+    def decode(self, sqid):
+        """Returns the id that `sqid` is the sqid of, or None if it isn't in the table."""
+        width = self.width
+        if len(sqid) > width:
+            return None
+        try:
+            token = sqid.encode('ascii')
+        except UnicodeEncodeError:
+            return None
+        token = token.ljust(width, b"\0")
+        mm = self._mmap
+        index = self._index
+        rows = self._rows
+        slots = self.slots
+        slot = int.from_bytes(token, 'little') % slots
+        while True:
+            id = index[slot]
+            if id < 0:
+                return None
+            start = rows + id * width
+            if mm[start:start + width] == token:
+                return id
+            slot = slot + 1 if slot + 1 < slots else 0
+
+    def close(self):
+        self._index.release()
+        self._mmap.close()
+
+
+class DenseCodec(object):
+    """
+    Wraps a codec so that ids and sqids in a DenseTable are looked up in it, and everything else is passed through to
+    the codec. Attributes other than encode and decode are those of the wrapped codec.
+    """
+    def __init__(self, codec, table):
+        self.codec = codec
+        self.table = table
+
+    def __getattr__(self, name):
+        return getattr(self.codec, name)
+
+    def encode(self, numbers):
+        if len(numbers) == 1 and type(numbers[0]) is int:
+            sqid = self.table.encode(numbers[0])
+            if sqid is not None:
+                return sqid
+        return self.codec.encode(numbers)
+
+    def decode(self, sqid):
+        if type(sqid) is str:
+            id = self.table.decode(sqid)
+            if id is not None:
+                return [id]
+        return self.codec.decode(sqid)
+
+
+def get_dense_table(directory, salt, min_length, alphabet, blocklist=None):
+    """
+    Returns the shared DenseTable for the given codec configuration from `directory`, or None if there isn't one.
+    Tables that can't be read, or that don't match the codec, are ignored with a warning.
+    """
+    path = dense_table_path(directory, salt, min_length, alphabet, blocklist)
+    table = _dense_tables.get(path, False)
+    if table is not False:
+        return table
+    with _lock:
+        table = _dense_tables.get(path, False)
+        if table is not False:
+            return table
+        table = None
+        if os.path.exists(path):
+            try:
+                table = DenseTable(path)
+            except (OSError, ValueError) as e:
+                warnings.warn("Ignoring sqids dense table: {}".format(e))
+            else:
+                last = table.size - 1
+                codec = get_codec(salt, min_length, alphabet, blocklist)
+                if table.fingerprint != codec_fingerprint(salt, min_length, alphabet, blocklist) or (
+                        table.size and table.encode(last) != codec.encode([last])):
+                    warnings.warn("Ignoring sqids dense table {}, which doesn't match its codec".format(path))
+                    table.close()
+                    table = None
+        _dense_tables[path] = table
+    return table
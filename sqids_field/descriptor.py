@@ -1,17 +1,25 @@
-from hashids import Sqids
-
-from .hashid import Sqid
+from .codec import get_codec
+from .sqid import Sqid, _is_uint
 
 
 class SqidDescriptor(object):
-    def __init__(self, field_name, salt, min_length, alphabet, prefix="", hashids=None, enable_hashid_object=True):
+    def __init__(self, field_name, salt, min_length, alphabet, prefix="", sqids=None, enable_sqid_object=True,
+                 blocklist=None):
         self.field_name = field_name
         self.salt = salt
         self.min_length = min_length
         self.alphabet = alphabet
         self.prefix = prefix
-        self.hashids = hashids or Sqids(salt=self.salt, min_length=self.min_length, alphabet=self.alphabet)
-        self.enable_hashid_object = enable_hashid_object
+        self.blocklist = blocklist
+        self._sqids = sqids
+        self.enable_sqid_object = enable_sqid_object
+
+    @property
+    def sqids(self):
+        # Looked up on first use, so that defining models doesn't build codecs
+        if self._sqids is None:
+            self._sqids = get_codec(self.salt, self.min_length, self.alphabet, self.blocklist)
+        return self._sqids
 
     def __get__(self, instance, owner=None):
         if instance is not None and self.field_name in instance.__dict__:
@@ -20,23 +28,27 @@ class SqidDescriptor(object):
             return None
 
     def __set__(self, instance, value):
-        self._set_value(instance, self.field_name, value, enable_hashid_object=self.enable_hashid_object)
-        if not self.enable_hashid_object:
-            self._set_value(instance, self.field_name + "_hashid", value, enable_hashid_object=True)
+        self._set_value(instance, self.field_name, value, enable_sqid_object=self.enable_sqid_object)
+        if not self.enable_sqid_object:
+            self._set_value(instance, self.field_name + "_sqid", value, enable_sqid_object=True)
 
-    def _set_value(self, instance, name, value, enable_hashid_object):
+    def _set_value(self, instance, name, value, enable_sqid_object):
         if value is None:
             instance.__dict__[name] = value
         if isinstance(value, Sqid):
-            if enable_hashid_object:
+            if enable_sqid_object:
                 instance.__dict__[name] = value
             else:
                 instance.__dict__[name] = str(value)
         else:
             try:
-                h = Sqid(value, salt=self.salt, min_length=self.min_length, alphabet=self.alphabet,
-                           prefix=self.prefix, hashids=self.hashids)
-                if enable_hashid_object:
+                if _is_uint(value):
+                    h = Sqid._from_id(value, self.salt, self.min_length, self.alphabet, self.prefix, self.sqids,
+                                      blocklist=self.blocklist)
+                else:
+                    h = Sqid(value, salt=self.salt, min_length=self.min_length, alphabet=self.alphabet,
+                               prefix=self.prefix, sqids=self.sqids, blocklist=self.blocklist)
+                if enable_sqid_object:
                     instance.__dict__[name] = h
                 else:
                     instance.__dict__[name] = str(h)
@@ -0,0 +1,144 @@
+"""
+Shared pieces of the CSV/NDJSON exports: picking the columns of a model to export, encoding the sqid columns of a
+chunk of rows in one batch, and formatting the chunk.
+"""
+import csv
+import io
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import ExpressionWrapper, F
+from django.http import StreamingHttpResponse
+
+from .codec import get_table_codec
+from .field import SqidFieldMixin
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def get_sqid_field(field):
+    """Returns the Sqid*Field whose encoding the values of `field` use, following foreign keys, or None."""
+    if isinstance(field, SqidFieldMixin):
+        return field
+    if field.many_to_one or field.one_to_one:
+        return get_sqid_field(field.target_field)
+    return None
+
+
+def encode_column(field, values):
+    """Encodes a column of integers, which may contain None, into sqid strings for `field`."""
+    try:
+        import numpy
+        from .vector import encode_array
+    except ImportError:
+        encode = get_table_codec(field.salt, field.min_length, field.alphabet, field.blocklist).encode
+        prefix = field.prefix
+        return [None if value is None else prefix + encode(value) for value in values]
+    mask = [value is None for value in values]
+    numbers = numpy.ma.array([0 if value is None else value for value in values], dtype=numpy.int64, mask=mask)
+    return encode_array(numbers, field).tolist()
+
+
+class RowWriter(object):
+    """
+    Formats chunks of rows, as returned by export_queryset(), into CSV or NDJSON text, encoding the sqid columns of
+    each chunk in one batch.
+    """
+    def __init__(self, fields, format='csv'):
+        if format not in CONTENT_TYPES:
+            raise ValueError("format must be one of {}".format(", ".join(CONTENT_TYPES)))
+        self.names = [field.name for field in fields]
+        self.sqid_fields = [get_sqid_field(field) for field in fields]
+        self.format = format
+        self.encoder = DjangoJSONEncoder()
+
+    def header(self):
+        if self.format == 'csv':
+            buffer = io.StringIO()
+            csv.writer(buffer).writerow(self.names)
+            return buffer.getvalue()
+        return ""
+
+    def write(self, rows):
+        columns = list(zip(*rows))
+        for i, sqid_field in enumerate(self.sqid_fields):
+            if sqid_field is not None:
+                columns[i] = encode_column(sqid_field, columns[i])
+        buffer = io.StringIO()
+        if self.format == 'csv':
+            csv.writer(buffer).writerows(zip(*columns))
+        else:
+            names = self.names
+            encode = self.encoder.encode
+            for row in zip(*columns):
+                buffer.write(encode(dict(zip(names, row))))
+                buffer.write("\n")
+        return buffer.getvalue()
+
+
+def export_fields(model, field_names=None):
+    """Returns the named fields of `model`, or all of its concrete fields."""
+    if field_names:
+        return [model._meta.get_field(name) for name in field_names]
+    return list(model._meta.concrete_fields)
+
+
+def export_queryset(queryset, fields):
+    """
+    Returns a values_list() queryset of `fields`, ordered by primary key unless already ordered, that fetches the
+    raw integers of sqid columns instead of converting them to Sqid objects in from_db_value().
+    """
+    columns = []
+    for field in fields:
+        if get_sqid_field(field) is None:
+            columns.append(field.attname)
+        else:
+            columns.append(ExpressionWrapper(F(field.attname), output_field=models.BigIntegerField()))
+    if not queryset.ordered:
+        queryset = queryset.order_by('pk')
+    return queryset.values_list(*columns)
+
+
+async def aexport(queryset, fields=None, format='csv', chunk_size=2000, offload_rows=500):
+    """
+    Asynchronously yields the rows of `queryset` as CSV or NDJSON text, one chunk of `chunk_size` rows at a time,
+    fetched with iterator() in a sync thread. Chunks of at least `offload_rows` rows are encoded and formatted on a
+    thread, so the event loop keeps serving other requests.
+    """
+    fields = export_fields(queryset.model, fields)
+    writer = RowWriter(fields, format)
+    write_in_thread = sync_to_async(writer.write, thread_sensitive=False)
+    header = writer.header()
+    if header:
+        yield header
+    # Not aiterator(), which runs the query of a values_list() queryset in the event loop, as the iterable it uses isn't
+    # a generator. iterator() only runs the query on the first next(), which happens in the sync thread.
+    rows = export_queryset(queryset, fields).iterator(chunk_size=chunk_size)
+    next_chunk = sync_to_async(lambda: list(islice(rows, chunk_size)))
+    while True:
+        chunk = await next_chunk()
+        if chunk:
+            yield await write_in_thread(chunk) if len(chunk) >= offload_rows else writer.write(chunk)
+        if len(chunk) < chunk_size:
+            break
+
+
+def async_export_response(queryset, fields=None, format='csv', filename=None, chunk_size=2000, offload_rows=500):
+    """
+    Returns a StreamingHttpResponse that streams `queryset` as CSV or NDJSON from aexport(), for async views served
+    under ASGI. Requires Django 4.2 or later.
+    """
+    if format not in CONTENT_TYPES:
+        raise ValueError("format must be one of {}".format(", ".join(CONTENT_TYPES)))
+    response = StreamingHttpResponse(
+        aexport(queryset, fields, format, chunk_size, offload_rows),
+        content_type=CONTENT_TYPES.get(format),
+    )
+    if filename:
+        response['Content-Disposition'] = 'attachment; filename="{}"'.format(filename)
+    return response
@@ -1,4 +1,5 @@
-from django import forms
+import functools
+
 from django.core import exceptions, checks
 from django.core import validators as django_validators
 from django.db import models
@@ -6,18 +7,23 @@ from django.db.models import Field
 from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 from django.contrib.admin import widgets as admin_widgets
-from sqids import Sqids
 
+from . import metrics
 from .lookups import SqidExactLookup, SqidIterableLookup
 from .lookups import SqidGreaterThan, SqidGreaterThanOrEqual, SqidLessThan, SqidLessThanOrEqual
 from .descriptor import SqidDescriptor
-from .sqid import Sqid
+from .forms import SqidFormField
+from .codec import codec_fingerprint, get_codec, get_encode_cache, normalize_blocklist
+from .dense import DenseCodec, get_dense_table
+from .numeric import get_numeric_index
+from .sqid import Sqid, _is_uint
 from .conf import settings
 from .validators import SqidMaxValueValidator, SqidMinValueValidator
 
 
+@functools.lru_cache(maxsize=None)
 def _alphabet_unique_len(alphabet):
-    return len([x for i, x in enumerate(alphabet) if alphabet.index(x) == i])
+    return len(set(alphabet))
 
 
 class SqidFieldMixin(object):
@@ -41,24 +47,53 @@ class SqidFieldMixin(object):
                  allow_int_lookup=settings.SQID_FIELD_ALLOW_INT_LOOKUP,
                  enable_sqid_object=settings.SQID_FIELD_ENABLE_SQID_OBJECT,
                  enable_descriptor=settings.SQID_FIELD_ENABLE_DESCRIPTOR,
-                 prefix="", *args, **kwargs):
+                 prefix="", blocklist=settings.SQID_FIELD_BLOCKLIST, dense_table_size=0, *args, **kwargs):
         self.salt = salt
         self.min_length = min_length
         self.alphabet = alphabet
         if _alphabet_unique_len(self.alphabet) < 16:
             raise exceptions.ImproperlyConfigured("'alphabet' must contain a minimum of 16 unique characters")
-        self._sqids = Sqids(salt=self.salt, min_length=self.min_length, alphabet=self.alphabet)
+        try:
+            self.blocklist = normalize_blocklist(blocklist)
+        except ValueError as e:
+            raise exceptions.ImproperlyConfigured(str(e))
         self.allow_int_lookup = allow_int_lookup
         self.enable_sqid_object = enable_sqid_object
         self.enable_descriptor = enable_descriptor
         self.prefix = prefix
+        self.dense_table_size = dense_table_size
         super().__init__(*args, **kwargs)
 
+    @cached_property
+    def _sqids(self):
+        # Built on first use rather than in __init__, as projects with many Sqid*Fields, and the historical models that
+        # migrations render, instantiate many more fields than ever encode or decode anything.
+        codec = get_codec(self.salt, self.min_length, self.alphabet, self.blocklist)
+        if self.dense_table_size and settings.SQID_FIELD_DENSE_TABLE_DIR:
+            table = get_dense_table(settings.SQID_FIELD_DENSE_TABLE_DIR, self.salt, self.min_length, self.alphabet,
+                                    self.blocklist)
+            if table is not None:
+                codec = DenseCodec(codec, table)
+        return codec
+
+    @cached_property
+    def _numeric_index(self):
+        if not settings.SQID_FIELD_NUMERIC_INDEX_DIR:
+            return None
+        return get_numeric_index(settings.SQID_FIELD_NUMERIC_INDEX_DIR, self.salt, self.min_length, self.alphabet,
+                                 self.blocklist)
+
+    @cached_property
+    def _encode_cache(self):
+        return get_encode_cache(self.salt, self.min_length, self.alphabet, self.blocklist)
+
     def deconstruct(self):
         name, path, args, kwargs = super().deconstruct()
         kwargs['min_length'] = self.min_length
         kwargs['alphabet'] = self.alphabet
         kwargs['prefix'] = self.prefix
+        if self.blocklist is not None:
+            kwargs['blocklist'] = list(self.blocklist) if self.blocklist else "none"
         return name, path, args, kwargs
 
     def check(self, **kwargs):
@@ -116,15 +151,66 @@ class SqidFieldMixin(object):
         else:
             return str(sqid)
 
+    def encode_many(self, ids):
+        """Encodes integers into sqid strings, including the prefix, without creating a Sqid object for each one."""
+        encode = self._sqids.encode
+        prefix = self.prefix
+        registry = metrics.registry
+        if registry is None:
+            return [prefix + encode([id]) for id in ids]
+        # The ids that were encoded are recorded, as Sqid.encode() does, under the same label
+        ids = list(ids)
+        start = registry.start()
+        sqids = [prefix + encode([id]) for id in ids]
+        registry.record('encode', registry.field_label(self), amount=len(sqids), start=start, value=ids)
+        return sqids
+
+    def decode_many(self, sqids):
+        """Decodes sqid strings, including the prefix, into integers. Raises ValueError if any of them are invalid."""
+        decode = self._sqids.decode
+        prefix = self.prefix
+        registry = metrics.registry
+        if registry is not None:
+            sqids = list(sqids)
+        start = registry.start() if registry is not None else None
+        ids = []
+        for sqid in sqids:
+            decoded = decode(sqid[len(prefix):]) if sqid.startswith(prefix) else ()
+            if len(decoded) != 1:
+                raise ValueError(self.error_messages['invalid_sqid'] % {'value': sqid})
+            ids.extend(decoded)
+        if registry is not None:
+            # The sqids that were decoded, without the prefix like Sqid.decode() records them
+            registry.record('decode', registry.field_label(self), amount=len(ids), start=start,
+                            value=[sqid[len(prefix):] for sqid in sqids])
+        return ids
+
     def get_sqid(self, id):
+        if _is_uint(id):
+            # Integers can't be ambiguous, so skip parsing and defer encoding until the sqid string is needed
+            sqid = self._encode_cache.get(id)
+            registry = metrics.registry
+            if registry is not None and self._encode_cache:
+                registry.record('encode_cache_hit' if sqid is not None else 'encode_cache_miss', str(self), value=id)
+            return Sqid._from_id(id, self.salt, self.min_length, self.alphabet, self.prefix, self._sqids, sqid,
+                                 self.blocklist)
         return Sqid(id, salt=self.salt, min_length=self.min_length, alphabet=self.alphabet,
-                      prefix=self.prefix, sqids=self._sqids)
+                      prefix=self.prefix, sqids=self._sqids, blocklist=self.blocklist)
 
     def from_db_value(self, value, expression, connection):
         if value is None:
             return value
         return self.encode_id(value)
 
+    def value_to_string(self, obj):
+        value = self.value_from_object(obj)
+        if value is None:
+            return None
+        if settings.SQID_FIELD_SERIALIZE_INT:
+            # The integer, which to_python() loads back without having to decode anything
+            return str(self.get_prep_value(value))
+        return str(value)
+
     def get_lookup(self, lookup_name):
         if lookup_name in self.exact_lookups:
             return SqidExactLookup
@@ -136,20 +222,40 @@ class SqidFieldMixin(object):
             return super().get_lookup(lookup_name)
         return None  # Otherwise, we don't allow lookups of this type
 
-    def to_python(self, value):
-        if isinstance(value, Sqid):
-            return value
-        if value is None:
-            return value
+    def to_sqid(self, value):
         try:
-            sqid = self.encode_id(value)
+            return self.get_sqid(value)
         except ValueError:
             raise exceptions.ValidationError(
                 self.error_messages['invalid'],
                 code='invalid',
                 params={'value': value},
             )
-        return sqid
+
+    def to_python(self, value):
+        if isinstance(value, Sqid):
+            return value
+        if value is None:
+            return value
+        if settings.SQID_FIELD_SERIALIZE_INT and isinstance(value, str) and value.isascii() and value.isdigit():
+            # Written by value_to_string(), e.g. in fixtures
+            value = int(value)
+        sqid = self.to_sqid(value)
+        if self.enable_sqid_object:
+            return sqid
+        else:
+            return str(sqid)
+
+    def clean(self, value, model_instance):
+        # Decode the value only once, and validate the Sqid object so that validators can use its integer directly
+        # instead of decoding the string again.
+        if value is not None and not isinstance(value, Sqid):
+            value = self.to_sqid(value)
+        self.validate(value, model_instance)
+        self.run_validators(value)
+        if value is None or self.enable_sqid_object:
+            return value
+        return str(value)
 
     def get_prep_value(self, value):
         if value is None or value == '':
@@ -164,19 +270,24 @@ class SqidFieldMixin(object):
 
     def contribute_to_class(self, cls, name, **kwargs):
         super().contribute_to_class(cls, name, **kwargs)
+        # The codec is built lazily, but its configuration is registered right away, so that Sqids pickled by another
+        # process can be loaded before this field has encoded or decoded anything.
+        codec_fingerprint(self.salt, self.min_length, self.alphabet, self.blocklist)
         # if callable(self.prefix):
         #     self.prefix = self.prefix(field_instance=self, model_class=cls, field_name=name, **kwargs)
         if self.enable_descriptor:
             descriptor = SqidDescriptor(field_name=self.attname, salt=self.salt, min_length=self.min_length,
-                                          alphabet=self.alphabet, prefix=self.prefix, sqids=self._sqids,
+                                          alphabet=self.alphabet, prefix=self.prefix, blocklist=self.blocklist,
                                           enable_sqid_object=self.enable_sqid_object)
             setattr(cls, self.attname, descriptor)
 
 
 class SqidCharFieldMixin:
     def formfield(self, **kwargs):
-        defaults = {'form_class': forms.CharField}
+        defaults = {'form_class': SqidFormField}
         defaults.update(kwargs)
+        if issubclass(defaults['form_class'], SqidFormField):
+            defaults['sqid_field'] = self
         if defaults.get('widget') == admin_widgets.AdminIntegerFieldWidget:
             defaults['widget'] = admin_widgets.AdminTextInputWidget
         if defaults.get('widget') == admin_widgets.AdminBigIntegerFieldWidget:
@@ -0,0 +1,153 @@
+import itertools
+
+from django import forms
+from django.core import exceptions
+from django.db import models
+from django.db.models import ExpressionWrapper, F
+from django.forms.models import ModelChoiceField, ModelChoiceIterator, ModelChoiceIteratorValue
+from django.forms.models import ModelMultipleChoiceField
+from django.utils.translation import gettext_lazy as _
+
+from .lookups import get_id_for_sqid_field
+from .sqid import Sqid
+
+
+class SqidFormField(forms.CharField):
+    """
+    A form field for Sqid*Fields that decodes the submitted value once with the model field's codec, so that the
+    cleaned value is a Sqid object the model can use as-is.
+    """
+    default_error_messages = {
+        'invalid': _("'%(value)s' value must be a positive integer or a valid Sqids string."),
+    }
+
+    def __init__(self, sqid_field, **kwargs):
+        self.sqid_field = sqid_field
+        super().__init__(**kwargs)
+
+    def to_python(self, value):
+        if isinstance(value, Sqid):
+            return value
+        value = super().to_python(value)
+        if value in self.empty_values:
+            return value
+        try:
+            return self.sqid_field.get_sqid(value)
+        except ValueError:
+            raise exceptions.ValidationError(
+                self.error_messages['invalid'],
+                code='invalid',
+                params={'value': value},
+            )
+
+    def prepare_value(self, value):
+        if isinstance(value, Sqid):
+            return str(value)
+        return value
+
+
+class SqidModelChoiceIterator(ModelChoiceIterator):
+    """
+    Iterates over the choices of a Sqid*Field keyed queryset, encoding the option values of each chunk of objects in
+    one pass instead of rendering a Sqid object for every option. When the field has a `label_field`, only the raw
+    integer keys and the labels are read, without building a model instance for each choice.
+    """
+    chunk_size = 2000
+
+    def __iter__(self):
+        sqid_field = self.field.sqid_field
+        if sqid_field is None:
+            yield from super().__iter__()
+            return
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        if self.field.label_field is not None:
+            yield from self._values_choices(sqid_field)
+            return
+        queryset = self.queryset
+        # Can't use iterator() when queryset uses prefetch_related()
+        if not queryset._prefetch_related_lookups:
+            queryset = queryset.iterator(chunk_size=self.chunk_size)
+        queryset = iter(queryset)
+        while True:
+            objs = list(itertools.islice(queryset, self.chunk_size))
+            if not objs:
+                break
+            ids = [sqid_field.get_prep_value(getattr(obj, sqid_field.attname)) for obj in objs]
+            for obj, value in zip(objs, sqid_field.encode_many(ids)):
+                yield ModelChoiceIteratorValue(value, obj), self.field.label_from_instance(obj)
+
+    def _values_choices(self, sqid_field):
+        # Selected as plain integers, so that from_db_value() doesn't build a Sqid for each row either
+        key = ExpressionWrapper(F(sqid_field.attname), output_field=models.BigIntegerField())
+        rows = self.queryset.prefetch_related(None).values_list(key, self.field.label_field)
+        rows = rows.iterator(chunk_size=self.chunk_size)
+        while True:
+            chunk = list(itertools.islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            for (id, label), value in zip(chunk, sqid_field.encode_many([row[0] for row in chunk])):
+                yield ModelChoiceIteratorValue(value, None), label
+
+
+class SqidModelChoiceFieldMixin:
+    iterator = SqidModelChoiceIterator
+
+    def __init__(self, queryset, *, label_field=None, **kwargs):
+        # Name of the model field whose values are the labels of the choices, instead of label_from_instance(). Choices
+        # are then read with values_list(), and their ModelChoiceIteratorValue has no instance.
+        self.label_field = label_field
+        super().__init__(queryset, **kwargs)
+
+    @property
+    def sqid_field(self):
+        """The Sqid*Field that choices are keyed by, or None if the key isn't a Sqid*Field."""
+        from sqids_field.field import SqidFieldMixin
+
+        opts = self.queryset.model._meta
+        field = opts.get_field(self.to_field_name) if self.to_field_name else opts.pk
+        if isinstance(field, SqidFieldMixin):
+            return field
+        return None
+
+
+class SqidModelChoiceField(SqidModelChoiceFieldMixin, ModelChoiceField):
+    pass
+
+
+class SqidModelMultipleChoiceField(SqidModelChoiceFieldMixin, ModelMultipleChoiceField):
+    def _check_values(self, value):
+        # Decode all submitted values up front, then check them against a single query by integer, instead of
+        # filtering by each value and comparing encoded sqids.
+        sqid_field = self.sqid_field
+        if sqid_field is None:
+            return super()._check_values(value)
+        key = self.to_field_name or 'pk'
+        try:
+            value = frozenset(value)
+        except TypeError:
+            # list of lists isn't hashable, for example
+            raise exceptions.ValidationError(
+                self.error_messages['invalid_list'],
+                code='invalid_list',
+            )
+        ids = {}
+        for val in value:
+            try:
+                ids[val] = get_id_for_sqid_field(sqid_field, val)
+            except (ValueError, TypeError):
+                raise exceptions.ValidationError(
+                    self.error_messages['invalid_choice'],
+                    code='invalid_choice',
+                    params={'value': val},
+                )
+        qs = self.queryset.filter(**{'%s__in' % key: [sqid_field.get_sqid(id) for id in ids.values()]})
+        found = {sqid_field.get_prep_value(getattr(o, sqid_field.attname)) for o in qs}
+        for val, id in ids.items():
+            if id not in found:
+                raise exceptions.ValidationError(
+                    self.error_messages['invalid_choice'],
+                    code='invalid_choice',
+                    params={'value': val},
+                )
+        return qs
@@ -0,0 +1,132 @@
+"""
+Encoding and decoding sqids in the database, for reports, raw SQL and syncing text columns that hold sqids, without
+bringing every row back to Python.
+
+On SQLite, ``sqid_encode(config_id, id[, prefix])`` and ``sqid_decode(config_id, sqid[, prefix])`` are registered as
+deterministic functions on every new connection, backed by the shared codecs of sqids_field.codec. `config_id`
+identifies a codec configuration, see config_id(). The SqidEncode() and SqidDecode() expressions call them from the
+ORM. Other databases have no such functions, so the expressions raise NotSupportedError there.
+"""
+from django.db import NotSupportedError
+from django.db.backends.signals import connection_created
+from django.db.models import BigIntegerField, CharField, Func
+
+from .codec import codec_fingerprint, get_codec, get_config
+from .export import get_sqid_field
+from .sqid import _is_uint
+
+# Codecs by config_id, so that each call from the database is a single dict lookup
+_codecs = {}
+
+
+def config_id(field):
+    """Returns the config_id that identifies the codec configuration of `field` to sqid_encode() and sqid_decode()."""
+    return codec_fingerprint(field.salt, field.min_length, field.alphabet, field.blocklist).hex()
+
+
+def _get_codec(config):
+    codec = _codecs.get(config)
+    if codec is None:
+        fingerprint = bytes.fromhex(config)
+        try:
+            key = get_config(fingerprint)
+        except LookupError:
+            # Configurations are only registered as they're used, and raw SQL can run before a field ever encoded
+            from .prefork import get_sqid_fields
+
+            for field in get_sqid_fields():
+                config_id(field)
+            key = get_config(fingerprint)
+        codec = _codecs[config] = get_codec(*key)
+    return codec
+
+
+def sqid_encode(config, id, prefix=""):
+    """
+    Returns `id` encoded with the codec of `config`, with `prefix`, or None if either is NULL or `id` isn't a
+    non-negative integer, e.g. a REAL or TEXT value, or a negative number that sqids can't encode.
+    """
+    if config is None or not _is_uint(id):
+        return None
+    return (prefix or "") + _get_codec(config).encode([id])
+
+
+def sqid_decode(config, sqid, prefix=""):
+    """Returns the id encoded in `sqid` with the codec of `config`, or None if it's NULL or not a valid sqid."""
+    if config is None or not isinstance(sqid, str):
+        return None
+    prefix = prefix or ""
+    if not sqid.startswith(prefix):
+        return None
+    ids = _get_codec(config).decode(sqid[len(prefix):])
+    return ids[0] if len(ids) == 1 else None
+
+
+def register_functions(connection):
+    """Registers sqid_encode() and sqid_decode() on a connection. Does nothing on databases other than SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    connection.ensure_connection()
+    for num_args in (2, 3):
+        connection.connection.create_function('sqid_encode', num_args, sqid_encode, deterministic=True)
+        connection.connection.create_function('sqid_decode', num_args, sqid_decode, deterministic=True)
+    connection._sqid_functions = connection.connection
+
+
+def _connection_created(sender, connection, **kwargs):
+    register_functions(connection)
+
+
+connection_created.connect(_connection_created)
+
+
+class SqidFunc(Func):
+    """
+    Base class of SqidEncode and SqidDecode. `field` is the Sqid*Field, or its app_label.ModelName.field label, whose
+    codec and prefix to use. It defaults to the field of `expression` itself, following foreign keys.
+    """
+    def __init__(self, expression, field=None, **extra):
+        self.sqid_field = field
+        super().__init__(expression, **extra)
+
+    def resolve_expression(self, *args, **kwargs):
+        c = super().resolve_expression(*args, **kwargs)
+        if isinstance(c.sqid_field, str):
+            from .prefork import get_sqid_field_by_label
+
+            c.sqid_field = get_sqid_field_by_label(c.sqid_field)
+        elif c.sqid_field is None:
+            source = c.source_expressions[0]
+            field = getattr(source, 'target', None) or source._output_field_or_none
+            c.sqid_field = get_sqid_field(field) if field is not None else None
+            if c.sqid_field is None:
+                raise ValueError("{}() of an expression that isn't a Sqid*Field needs the field whose codec to use, "
+                                 "pass field=".format(self.__class__.__name__))
+        return c
+
+    def as_sql(self, compiler, connection, **extra_context):
+        raise NotSupportedError(
+            "{}() is only supported on SQLite, the only database sqids_field registers {}() on. Select the ids and "
+            "convert them in Python instead, e.g. with the field's encode_many() and decode_many().".format(
+                self.__class__.__name__, self.function)
+        )
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        if getattr(connection, '_sqid_functions', None) is not connection.connection:
+            # The connection was opened before this module was imported, so the functions weren't registered on it
+            register_functions(connection)
+        sql, params = compiler.compile(self.source_expressions[0])
+        field = self.sqid_field
+        return "{}(%s, {}, %s)".format(self.function, sql), [config_id(field), *params, field.prefix]
+
+
+class SqidEncode(SqidFunc):
+    """Encodes an integer expression, e.g. F('id') or an IntegerField, into sqid strings in the database."""
+    function = 'sqid_encode'
+    output_field = CharField()
+
+
+class SqidDecode(SqidFunc):
+    """Decodes a text expression holding sqids into integers in the database. Invalid sqids decode to NULL."""
+    function = 'sqid_decode'
+    output_field = BigIntegerField()
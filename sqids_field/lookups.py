@@ -1,9 +1,12 @@
 import itertools
+import time
 
 from django.db.models.lookups import Lookup, GreaterThan, GreaterThanOrEqual, LessThan, LessThanOrEqual
 from django.utils.datastructures import OrderedSet
 from django.core.exceptions import EmptyResultSet
 
+from . import metrics, tracing
+from .numeric import settle_numeric
 from .sqid import Sqid
 from .conf import settings
 
@@ -18,23 +21,42 @@ def _is_int_representation(number):
         return True
 
 
+def _rejected(field, value, reason, message='invalid_sqid'):
+    """Returns the ValueError to raise for a rejected lookup value, recording why if metrics are enabled."""
+    registry = metrics.registry
+    if registry is not None:
+        registry.record('lookup_rejected', str(field), reason, value=value)
+    return ValueError(field.error_messages[message] % {'value': value})
+
+
 def get_id_for_sqid_field(field, value):
     if isinstance(value, Sqid):
         return value.id
+    if isinstance(value, str) and not field.allow_int_lookup and field._numeric_index is not None:
+        # Settle whether an all-digit value is a sqid or an integer with the precomputed index, when it covers it
+        without_prefix = value[len(field.prefix):]
+        if value.startswith(field.prefix) and without_prefix.isascii() and without_prefix.isdigit():
+            id = settle_numeric(field._numeric_index, without_prefix)
+            if id is False:
+                raise _rejected(field, value, 'invalid_sqid')
+            if id is not None:
+                return id
     try:
         sqid = field.get_sqid(value)
     except ValueError:
-        raise ValueError(field.error_messages['invalid'] % {'value': value})
+        bad_prefix = isinstance(value, str) and not value.startswith(field.prefix)
+        raise _rejected(field, value, 'bad_prefix' if bad_prefix else 'invalid_sqid', 'invalid')
     if isinstance(value, int) and not field.allow_int_lookup:
-        raise ValueError(field.error_messages['invalid_sqid'] % {'value': value})
+        raise _rejected(field, value, 'int_lookup_not_allowed')
     if isinstance(value, str) and not field.allow_int_lookup:
         # Make sure int lookups are not allowed, even if prefixed, unless the
         # given value is actually a sqid made up entirely of numbers.
         if not value.startswith(field.prefix):
-            raise ValueError(field.error_messages['invalid_sqid'] % {'value': value})
+            raise _rejected(field, value, 'int_lookup_not_allowed')
         without_prefix = value[len(field.prefix):]
-        if _is_int_representation(without_prefix) and without_prefix != sqid.sqid:
-            raise ValueError(field.error_messages['invalid_sqid'] % {'value': value})
+        # sqids decodes some strings that aren't what it encodes the decoded id as, so compare with a fresh encoding
+        if _is_int_representation(without_prefix) and without_prefix != sqid.encode(sqid.id):
+            raise _rejected(field, value, 'int_lookup_not_allowed')
     return sqid.id
 
 
@@ -46,13 +68,39 @@ def get_id_for_sqid_field(field, value):
 class SqidFieldGetDbPrepValueMixin:
     get_db_prep_lookup_value_is_iterable = False
 
+    @property
+    def _lookup_type(self):
+        # SqidExactLookup and SqidIterableLookup stand in for several lookups, so they have no lookup_name
+        return self.lookup_name or ('in' if self.get_db_prep_lookup_value_is_iterable else 'exact')
+
     def get_db_prep_lookup(self, value, connection):
+        # For relational fields, use the 'field' attribute of the output_field
+        field = getattr(self.lhs.output_field, 'field', self.lhs.output_field)
+        pending = tracing.pending_lookups.get()
+        if pending is None:
+            return self._get_db_prep_lookup(field, value)
+        # Traced, so that the values and time taken can be attributed to the query that runs next
+        start = time.perf_counter()
+        empty = False
+        try:
+            return self._get_db_prep_lookup(field, value)
+        except EmptyResultSet:
+            empty = True
+            raise
+        finally:
+            pending.append({
+                'field': str(field),
+                'lookup': self._lookup_type,
+                'values': len(value) if self.get_db_prep_lookup_value_is_iterable else 1,
+                'seconds': time.perf_counter() - start,
+                'empty_result_set': empty,
+            })
+
+    def _get_db_prep_lookup(self, field, value):
         # There are two modes this method can be called in... a single value or an iterable of values (usually a set)
         # For a single value, just try to process it, then return the value, or else throw EmptyResultSet
         # For multiple values, process each one in turn. If any of them are invalid, throw it away. If all are invalid,
         # throw EmptyResultSet
-        # For relational fields, use the 'field' attribute of the output_field
-        field = getattr(self.lhs.output_field, 'field', self.lhs.output_field)
         if self.get_db_prep_lookup_value_is_iterable:
             lookup_ids = []
             for val in value:
@@ -66,6 +114,7 @@ class SqidFieldGetDbPrepValueMixin:
                 else:
                     lookup_ids.append(lookup_id)
             if len(lookup_ids) == 0:
+                self._empty_result_set(field)
                 raise EmptyResultSet
             return '%s', lookup_ids
         else:
@@ -74,9 +123,15 @@ class SqidFieldGetDbPrepValueMixin:
             except ValueError:
                 if settings.SQID_FIELD_LOOKUP_EXCEPTION:
                     raise
+                self._empty_result_set(field)
                 raise EmptyResultSet
             return '%s', [lookup_id]
 
+    def _empty_result_set(self, field):
+        registry = metrics.registry
+        if registry is not None:
+            registry.record('empty_result_set', str(field), self._lookup_type)
+
 
 class SqidExactLookup(SqidFieldGetDbPrepValueMixin, Lookup):
     prepare_rhs = False
@@ -0,0 +1,85 @@
+import json
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from sqids_field.advise import DEFAULT_CHUNK_SIZE, DEFAULT_SAMPLES, advise
+from sqids_field.field import SqidField
+from sqids_field.prefork import get_sqid_field_by_label
+
+
+class Command(BaseCommand):
+    help = ("Measures a candidate alphabet, min_length and blocklist over an expected id range: encode and decode "
+            "throughput, sqid lengths, how often sqids are all digits and how often the blocklist re-encodes them.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('field', nargs='?',
+                            help="Start from the configuration of this field, as app_label.ModelName.field")
+        parser.add_argument('--salt')
+        parser.add_argument('--alphabet')
+        parser.add_argument('--min-length', type=int)
+        parser.add_argument('--blocklist',
+                            help="Comma separated words, or 'none' to disable the blocklist. Defaults to the sqids "
+                                 "blocklist")
+        parser.add_argument('--max-id', type=int, default=2 ** 31 - 1,
+                            help="Largest id expected, ids are sampled uniformly up to it")
+        parser.add_argument('--samples', type=int, default=DEFAULT_SAMPLES)
+        parser.add_argument('--workers', type=int, help="Number of worker processes, defaults to the number of CPUs")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Samples per task")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--json', action='store_true', help="Print the measurements as JSON")
+
+    def handle(self, *args, **options):
+        if options['max_id'] < 0 or options['samples'] < 1:
+            raise CommandError("--max-id must not be negative and --samples must be positive")
+        field = self.get_candidate(options)
+        report = advise(field, options['max_id'], options['samples'], workers=options['workers'],
+                        chunk_size=options['chunk_size'], seed=options['seed'])
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write("alphabet={!r} min_length={} blocklist={}".format(
+            field.alphabet, field.min_length, self.describe_blocklist(field.blocklist)))
+        self.stdout.write("Sampled {samples} ids up to {max_id} in {sampling_seconds:.1f}s".format(**report))
+        self.stdout.write("Throughput (ids/s):  encode {:,.0f}  decode {:,.0f}  (table codec: encode {:,.0f}  "
+                          "decode {:,.0f})".format(report['encode_per_second'], report['decode_per_second'],
+                                                   report['table_encode_per_second'],
+                                                   report['table_decode_per_second']))
+        self.stdout.write("Sqid lengths:")
+        for length, count in report['lengths'].items():
+            self.stdout.write("  {:3d}  {:7.3%}".format(length, count / report['samples']))
+        self.stdout.write("Longest sqid: {} characters, plus {} of prefix".format(
+            report['max_length'], len(str(field.prefix))))
+        if report['fixed_length'] > field.min_length:
+            self.stdout.write("min_length={} would make every sqid up to {} the same length".format(
+                report['fixed_length'], report['max_id']))
+        self.stdout.write("All-digit sqids: {:.4%}".format(report['numeric_rate']))
+        self.stdout.write("Re-encoded because of the blocklist: {:.4%}".format(report['reencode_rate']))
+
+    def get_candidate(self, options):
+        kwargs = {}
+        if options['field']:
+            try:
+                source = get_sqid_field_by_label(options['field'])
+            except LookupError as e:
+                raise CommandError(str(e))
+            kwargs = {'salt': source.salt, 'min_length': source.min_length, 'alphabet': source.alphabet,
+                      'blocklist': source.blocklist, 'prefix': source.prefix}
+        for name in ('salt', 'alphabet', 'min_length'):
+            if options[name] is not None:
+                kwargs[name] = options[name]
+        if options['blocklist'] is not None:
+            blocklist = options['blocklist']
+            kwargs['blocklist'] = blocklist if blocklist.lower() == "none" else [w for w in blocklist.split(",") if w]
+        try:
+            return SqidField(**kwargs)
+        except ImproperlyConfigured as e:
+            raise CommandError(str(e))
+
+    def describe_blocklist(self, blocklist):
+        if blocklist is None:
+            return "default"
+        if not blocklist:
+            return "none"
+        return ",".join(blocklist)
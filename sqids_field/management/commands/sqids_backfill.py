@@ -0,0 +1,113 @@
+import json
+import os
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models, transaction
+from django.db.models import ExpressionWrapper, F, Q
+
+from sqids_field.materialized import get_sqid_string_fields
+
+
+class Command(BaseCommand):
+    help = ("Fills in the SqidStringFields of a model from their sources, a chunk of rows at a time, for rows written "
+            "before the field was added or without going through SqidStringQuerySet.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('target', help="Model, as app_label.ModelName, or one field, as app_label.ModelName.field")
+        parser.add_argument('--rebuild', action='store_true',
+                            help="Rewrite every row, e.g. after changing the salt, instead of only the empty ones")
+        parser.add_argument('--chunk-size', type=int, default=2000, help="Rows read and updated per transaction")
+        parser.add_argument('--checkpoint',
+                            help="File to record progress in after each chunk, and to resume from if it exists. It is "
+                                 "removed once the backfill completes.")
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        target = options['target']
+        try:
+            app_label, model_name, *field_name = target.split(".")
+            model = apps.get_model(app_label, model_name)
+        except (ValueError, LookupError):
+            raise CommandError("'{}' is not a model or field, use app_label.ModelName[.field]".format(target))
+        fields = [field for field in get_sqid_string_fields(model) if not field_name or [field.name] == field_name]
+        if not fields:
+            raise CommandError("{} has no SqidStringField{}".format(
+                model._meta.label, " named {}".format(field_name[0]) if field_name else "s"))
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be positive")
+
+        state = {'target': target, 'rebuild': options['rebuild'], 'last_pk': None, 'rows': 0}
+        checkpoint = options['checkpoint']
+        if checkpoint and os.path.exists(checkpoint):
+            with open(checkpoint, encoding='utf-8') as f:
+                saved = json.load(f)
+            if (saved.get('target'), saved.get('rebuild')) != (target, options['rebuild']):
+                raise CommandError("{} is the checkpoint of a different backfill, of {}{}".format(
+                    checkpoint, saved.get('target'), " with --rebuild" if saved.get('rebuild') else ""))
+            state = saved
+            if self.verbosity >= 1:
+                self.stdout.write("Resuming after {} rows".format(state['rows']))
+
+        start = time.perf_counter()
+        rows = self.backfill(model, fields, options['database'], options['chunk_size'], state, checkpoint)
+        elapsed = time.perf_counter() - start
+        if checkpoint and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        if self.verbosity >= 1:
+            self.stdout.write("Filled {} rows in {:.1f}s ({:.0f} rows/s)".format(
+                rows, elapsed, rows / elapsed if elapsed else 0))
+
+    def backfill(self, model, fields, using, chunk_size, state, checkpoint):
+        """
+        Walks the table in primary key order, reading only the primary key and the source ids of each chunk, so memory
+        use only depends on the chunk size. Each chunk is updated in its own transaction, then recorded in `state`.
+        """
+        pk = model._meta.pk
+        # Compared and selected as plain integers, as Sqid*Field lookups don't take them
+        raw = {'_pk': ExpressionWrapper(F(pk.attname), output_field=models.BigIntegerField())}
+        for i, field in enumerate(fields):
+            raw['_source{}'.format(i)] = ExpressionWrapper(F(field.source_field.attname),
+                                                           output_field=models.BigIntegerField())
+        queryset = model._base_manager.using(using).annotate(**raw)
+        if not state['rebuild']:
+            empty = Q()
+            for field in fields:
+                # Rows whose source is NULL are already in sync
+                empty |= Q(**{field.attname + '__isnull': True, field.source_field.attname + '__isnull': False})
+                empty |= Q(**{field.attname: ""})
+            queryset = queryset.filter(empty)
+        queryset = queryset.order_by('_pk').values_list(*raw)
+
+        rows = 0
+        last_progress = time.perf_counter()
+        while True:
+            chunk = queryset.filter(_pk__gt=state['last_pk']) if state['last_pk'] is not None else queryset
+            chunk = list(chunk[:chunk_size])
+            if not chunk:
+                return rows
+            objs = [model(**{pk.attname: pk.to_python(row[0])}) for row in chunk]
+            for i, field in enumerate(fields):
+                ids = [row[i + 1] for row in chunk if row[i + 1] is not None]
+                sqids = iter(field.sqid_field.encode_many(ids))
+                for obj, row in zip(objs, chunk):
+                    setattr(obj, field.attname, next(sqids) if row[i + 1] is not None else None)
+            with transaction.atomic(using=using):
+                model._base_manager.using(using).bulk_update(objs, [field.name for field in fields])
+            rows += len(chunk)
+            state['last_pk'] = chunk[-1][0]
+            state['rows'] += len(chunk)
+            if checkpoint:
+                self.write_checkpoint(checkpoint, state)
+            now = time.perf_counter()
+            if self.verbosity >= 2 or (self.verbosity >= 1 and now - last_progress >= 1):
+                last_progress = now
+                self.stdout.write("{} rows".format(state['rows']))
+
+    def write_checkpoint(self, path, state):
+        # Written next to the checkpoint and renamed over it, so an interrupted write never leaves it truncated
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(path + ".tmp", path)
@@ -0,0 +1,51 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from sqids_field.conf import settings
+from sqids_field.dense import dense_table_path, write_dense_table
+from sqids_field.prefork import get_sqid_field_by_label, get_sqid_fields
+
+
+class Command(BaseCommand):
+    help = ("Writes the dense tables of precomputed sqids for Sqid*Fields with a dense_table_size, or for the given "
+            "fields, to SQID_FIELD_DENSE_TABLE_DIR.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('fields', nargs='*', help="Fields to write tables for, as app_label.ModelName.field")
+        parser.add_argument('--size', type=int,
+                            help="Number of ids to precompute, overriding the fields' dense_table_size")
+        parser.add_argument('--output-dir', default=settings.SQID_FIELD_DENSE_TABLE_DIR,
+                            help="Directory to write to, defaults to SQID_FIELD_DENSE_TABLE_DIR")
+
+    def handle(self, *args, **options):
+        directory = options['output_dir']
+        if not directory:
+            raise CommandError("Set SQID_FIELD_DENSE_TABLE_DIR or pass --output-dir")
+        if options['fields']:
+            try:
+                fields = [get_sqid_field_by_label(label) for label in options['fields']]
+            except LookupError as e:
+                raise CommandError(str(e))
+        else:
+            fields = [field for field in get_sqid_fields() if field.dense_table_size]
+        if not fields:
+            raise CommandError("No Sqid*Fields have a dense_table_size, pass fields and --size instead")
+
+        # Fields that share a codec configuration share a table, sized for the largest of them
+        sizes = {}
+        for field in fields:
+            size = options['size'] if options['size'] is not None else field.dense_table_size
+            if not size or size < 0:
+                raise CommandError("{} has no dense_table_size, pass --size".format(field))
+            config = (field.salt, field.min_length, field.alphabet, field.blocklist)
+            sizes[config] = max(sizes.get(config, 0), size)
+
+        os.makedirs(directory, exist_ok=True)
+        for config, size in sizes.items():
+            start = time.perf_counter()
+            path = write_dense_table(dense_table_path(directory, *config), size, *config)
+            if options['verbosity'] >= 1:
+                self.stdout.write("Wrote {} ids to {} ({:.1f} MB) in {:.1f}s".format(
+                    size, path, os.path.getsize(path) / 1e6, time.perf_counter() - start))
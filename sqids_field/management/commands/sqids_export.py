@@ -0,0 +1,98 @@
+import queue
+import threading
+import time
+
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist
+from django.core.management.base import BaseCommand, CommandError
+
+from sqids_field.export import RowWriter, export_fields, export_queryset
+
+_done = object()
+
+
+class Command(BaseCommand):
+    help = ("Streams the rows of a model to CSV or NDJSON, encoding its Sqid*Fields and foreign keys to Sqid*Fields "
+            "in batches while the next rows are fetched.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', help="Model to export, as app_label.ModelName")
+        parser.add_argument('--fields', help="Comma separated field names to export, defaults to all concrete fields")
+        parser.add_argument('--format', choices=('csv', 'ndjson'), default='csv')
+        parser.add_argument('--output', '-o', help="File to write to, defaults to stdout")
+        parser.add_argument('--chunk-size', type=int, default=2000,
+                            help="Rows fetched from the database and encoded per batch")
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        try:
+            model = apps.get_model(options['model'])
+            fields = export_fields(model, options['fields'].split(',') if options['fields'] else None)
+        except (LookupError, ValueError, FieldDoesNotExist) as e:
+            raise CommandError(str(e))
+        writer = RowWriter(fields, options['format'])
+        chunk_size = options['chunk_size']
+        rows = export_queryset(model._default_manager.using(options['database']), fields).iterator(chunk_size)
+
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as out:
+                count, elapsed = self.export(rows, writer, chunk_size, out)
+        else:
+            count, elapsed = self.export(rows, writer, chunk_size, self.stdout)
+        if self.verbosity >= 1:
+            self.stderr.write("Exported {} rows in {:.1f}s ({:.0f} rows/s)".format(
+                count, elapsed, count / elapsed if elapsed else 0))
+
+    def export(self, rows, writer, chunk_size, out):
+        """
+        Fetches chunks of rows in this thread, which owns the database connection, while a writer thread encodes and
+        writes the previous chunk. The bounded queue keeps memory use constant.
+        """
+        chunks = queue.Queue(maxsize=4)
+        errors = []
+        thread = threading.Thread(target=self.write_chunks, args=(chunks, writer, out, errors))
+        thread.start()
+        start = last_progress = time.perf_counter()
+        count = 0
+        try:
+            chunk = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) == chunk_size:
+                    chunks.put(chunk)
+                    count += len(chunk)
+                    chunk = []
+                    if errors:
+                        break
+                    now = time.perf_counter()
+                    if self.verbosity >= 1 and now - last_progress >= 1:
+                        last_progress = now
+                        self.stderr.write("{} rows, {:.0f} rows/s".format(count, count / (now - start)))
+            if chunk and not errors:
+                chunks.put(chunk)
+                count += len(chunk)
+        finally:
+            chunks.put(_done)
+            thread.join()
+        if errors:
+            raise errors[0]
+        return count, time.perf_counter() - start
+
+    def write_chunks(self, chunks, writer, out, errors):
+        try:
+            header = writer.header()
+            if header:
+                out.write(header)
+        except Exception as e:
+            errors.append(e)
+        while True:
+            chunk = chunks.get()
+            if chunk is _done:
+                return
+            if errors:
+                continue
+            try:
+                out.write(writer.write(chunk))
+            except Exception as e:
+                errors.append(e)
@@ -0,0 +1,51 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models
+from django.db.models import ExpressionWrapper, F, Max
+
+from sqids_field.conf import settings
+from sqids_field.numeric import DEFAULT_CHUNK_SIZE, numeric_index_path, scan_numeric, write_numeric_index
+from sqids_field.prefork import get_sqid_field_by_label
+
+
+class Command(BaseCommand):
+    help = ("Scans the ids of a Sqid*Field in parallel for those whose sqid is all digits, and writes them as a "
+            "numeric index to SQID_FIELD_NUMERIC_INDEX_DIR.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('field', help="Field to scan, as app_label.ModelName.field")
+        parser.add_argument('--limit', type=int,
+                            help="Scan the ids below this, defaults to one more than the largest value in the database")
+        parser.add_argument('--workers', type=int, help="Number of worker processes, defaults to the number of CPUs")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Ids scanned per task")
+        parser.add_argument('--output-dir', default=settings.SQID_FIELD_NUMERIC_INDEX_DIR,
+                            help="Directory to write to, defaults to SQID_FIELD_NUMERIC_INDEX_DIR")
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        directory = options['output_dir']
+        if not directory:
+            raise CommandError("Set SQID_FIELD_NUMERIC_INDEX_DIR or pass --output-dir")
+        try:
+            field = get_sqid_field_by_label(options['field'])
+        except LookupError as e:
+            raise CommandError(str(e))
+        limit = options['limit']
+        if limit is None:
+            largest = field.model._default_manager.using(options['database']).aggregate(
+                largest=Max(ExpressionWrapper(F(field.attname), output_field=models.BigIntegerField())))['largest']
+            limit = 0 if largest is None else largest + 1
+        if limit < 0:
+            raise CommandError("--limit must not be negative")
+
+        start = time.perf_counter()
+        ids = scan_numeric(field, limit, workers=options['workers'], chunk_size=options['chunk_size'])
+        elapsed = time.perf_counter() - start
+        config = (field.salt, field.min_length, field.alphabet, field.blocklist)
+        os.makedirs(directory, exist_ok=True)
+        path = write_numeric_index(numeric_index_path(directory, *config), limit, ids, *config)
+        if options['verbosity'] >= 1:
+            self.stdout.write("Scanned {} ids in {:.1f}s ({:.0f} ids/s), found {} all-digit sqids, wrote {}".format(
+                limit, elapsed, limit / elapsed if elapsed else 0, len(ids), path))
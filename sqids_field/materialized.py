@@ -0,0 +1,205 @@
+"""
+A text column holding the sqid of another field of the same row, e.g. the public id of the primary key, for external
+tools, raw SQL and ``LIKE`` searches.
+
+SqidStringField keeps the column in sync when instances are saved. Use SqidStringQuerySet, or a manager made from it,
+to also keep it in sync with ``bulk_create()``, ``bulk_update()`` and ``update()``, which encode whole batches at once.
+Rows written any other way, or before the field was added, can be filled in with the ``sqids_backfill`` command.
+"""
+from django.core import checks
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models.signals import post_save, pre_save
+from django.utils.functional import cached_property
+
+from .export import get_sqid_field
+from .functions import SqidEncode
+from .sqid import Sqid
+
+# Key of the dict, in the instance's __dict__, of the ids that each SqidStringField's current value was encoded from
+_ENCODED_IDS = '_sqid_string_ids'
+# Key, in the instance's __dict__, of the update_fields of the save in progress
+_UPDATE_FIELDS = '_sqid_string_update_fields'
+
+
+class SqidStringField(models.CharField):
+    """
+    Stores the sqid of the `source` field of the same model, a Sqid*Field or a foreign key to one, with its prefix.
+    The column is indexed and nullable by default, and isn't editable in forms.
+
+    When `source` is assigned by the database, like an auto field, the column can only be filled in after the row is
+    inserted, so saving a new instance then takes an extra UPDATE.
+    """
+    description = "Sqid string of another field"
+
+    def __init__(self, source='id', max_length=64, null=True, blank=True, editable=False, db_index=True, **kwargs):
+        self.source = source
+        super().__init__(max_length=max_length, null=null, blank=blank, editable=editable, db_index=db_index,
+                         **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source'] = self.source
+        return name, path, args, kwargs
+
+    def contribute_to_class(self, cls, name, *args, **kwargs):
+        super().contribute_to_class(cls, name, *args, **kwargs)
+        # Like ImageField, the receivers are bound methods held weakly, so they go away with the model class, e.g. the
+        # historical models that migrations render
+        if not cls._meta.abstract:
+            pre_save.connect(self._note_update_fields, sender=cls)
+            post_save.connect(self._fill_after_insert, sender=cls)
+
+    def check(self, **kwargs):
+        errors = super().check(**kwargs)
+        errors.extend(self._check_source())
+        return errors
+
+    def _check_source(self):
+        try:
+            source = self.model._meta.get_field(self.source)
+        except FieldDoesNotExist:
+            source = None
+        if source is None or not source.concrete or get_sqid_field(source) is None:
+            return [
+                checks.Error(
+                    "'source' must be the name of a Sqid*Field, or of a foreign key to one, of the same model",
+                    obj=self,
+                    id='SqidStringField.E001',
+                )
+            ]
+        return []
+
+    @cached_property
+    def source_field(self):
+        return self.model._meta.get_field(self.source)
+
+    @cached_property
+    def sqid_field(self):
+        """The Sqid*Field whose codec and prefix the sqids are encoded with."""
+        return get_sqid_field(self.source_field)
+
+    def source_id(self, model_instance):
+        """Returns the integer value of the source field of `model_instance`, or None."""
+        value = getattr(model_instance, self.source_field.attname)
+        if value is None:
+            return None
+        return self.sqid_field.get_prep_value(value)
+
+    def pre_save(self, model_instance, add):
+        current = getattr(model_instance, self.attname)
+        update_fields = model_instance.__dict__.get(_UPDATE_FIELDS)
+        if (not add and current is not None and update_fields is not None
+                and self.source_field.name not in update_fields and self.source_field.attname not in update_fields):
+            # The source isn't being saved, so the stored value can't have gone out of sync with it
+            return current
+        id = self.source_id(model_instance)
+        encoded_ids = model_instance.__dict__.setdefault(_ENCODED_IDS, {})
+        if id is None:
+            value = None
+        elif current is not None and encoded_ids.get(self.attname) == id:
+            # Already encoded, e.g. by fill_sqid_strings() for bulk_create()
+            value = current
+        else:
+            source_value = getattr(model_instance, self.source_field.attname)
+            if isinstance(source_value, Sqid) and source_value.prefix == self.sqid_field.prefix:
+                # Sqid objects keep their string once encoded
+                value = str(source_value)
+            else:
+                value = self.sqid_field.encode_many([id])[0]
+        encoded_ids[self.attname] = id
+        setattr(model_instance, self.attname, value)
+        return value
+
+    def _note_update_fields(self, sender, instance, update_fields, **kwargs):
+        instance.__dict__[_UPDATE_FIELDS] = update_fields
+
+    def _fill_after_insert(self, sender, instance, created, raw, using, **kwargs):
+        instance.__dict__.pop(_UPDATE_FIELDS, None)
+        if raw or not created or getattr(instance, self.attname) is not None:
+            return
+        if self.pre_save(instance, False) is not None:
+            sender._base_manager.using(using).filter(pk=instance.pk).update(
+                **{self.attname: getattr(instance, self.attname)})
+
+
+def get_sqid_string_fields(model):
+    """Returns the SqidStringFields of a model."""
+    return [field for field in model._meta.concrete_fields if isinstance(field, SqidStringField)]
+
+
+def fill_sqid_strings(objs, fields):
+    """
+    Sets each SqidStringField in `fields` on every instance in `objs` to the sqid of its source, encoding each field's
+    ids in one batch. Returns the instances whose source was None, for which the field was set to None.
+    """
+    missing = []
+    for field in fields:
+        ids = []
+        encoded = []
+        for obj in objs:
+            id = field.source_id(obj)
+            if id is None:
+                setattr(obj, field.attname, None)
+                missing.append(obj)
+            else:
+                ids.append(id)
+                encoded.append(obj)
+        for obj, id, value in zip(encoded, ids, field.sqid_field.encode_many(ids)):
+            setattr(obj, field.attname, value)
+            obj.__dict__.setdefault(_ENCODED_IDS, {})[field.attname] = id
+    return missing
+
+
+class SqidStringQuerySet(models.QuerySet):
+    """A QuerySet that keeps the SqidStringFields of its model in sync in bulk_create(), bulk_update() and update()."""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        fields = get_sqid_string_fields(self.model)
+        if not fields or not objs:
+            return super().bulk_create(objs, *args, **kwargs)
+        missing = fill_sqid_strings(objs, fields)
+        objs = super().bulk_create(objs, *args, **kwargs)
+        if missing:
+            # Sources assigned by the database, when the database returns them from bulk inserts
+            inserted = [obj for obj in {id(obj): obj for obj in missing}.values() if obj.pk is not None]
+            if inserted:
+                fill_sqid_strings(inserted, fields)
+                super().bulk_update(inserted, [field.name for field in fields], batch_size=kwargs.get('batch_size'))
+        return objs
+
+    bulk_create.alters_data = True
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        fields = list(fields)
+        names = {name for field in fields for name in (field, self.model._meta.get_field(field).attname)}
+        string_fields = [field for field in get_sqid_string_fields(self.model) if field.source in names]
+        if string_fields:
+            objs = list(objs)
+            fill_sqid_strings(objs, string_fields)
+            fields += [field.name for field in string_fields if field.name not in names]
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    bulk_update.alters_data = True
+
+    def update(self, **kwargs):
+        for field in get_sqid_string_fields(self.model):
+            if field.name in kwargs or field.attname in kwargs:
+                continue
+            for name in (field.source_field.name, field.source_field.attname):
+                if name in kwargs:
+                    kwargs[field.name] = self._sqid_string(field, kwargs[name])
+                    break
+        return super().update(**kwargs)
+
+    update.alters_data = True
+
+    def _sqid_string(self, field, value):
+        if hasattr(value, 'resolve_expression'):
+            return SqidEncode(value, field=field.sqid_field)
+        if isinstance(value, models.Model):
+            value = value.pk
+        if value is None:
+            return None
+        return field.sqid_field.encode_many([field.sqid_field.get_prep_value(value)])[0]
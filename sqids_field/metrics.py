@@ -0,0 +1,219 @@
+"""
+Opt-in runtime metrics: Sqid construction, encodes and decodes, rejected lookups, lookups short-circuited to
+EmptyResultSet and encode cache hits, counted per field, with optional timing histograms.
+
+Metrics are off until enable() is called, or SQID_FIELD_METRICS is set. While they are off, `registry` is None and
+instrumented code only checks that before carrying on, so they cost close to nothing. Like sqids_field.core, this
+module doesn't import Django, except to name fields and to serve prometheus_view().
+"""
+import sys
+import threading
+import time
+from bisect import bisect_left
+
+# Upper bounds of the timing histogram buckets, in seconds
+DEFAULT_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 1e-3, 1e-2)
+
+# Descriptions of the events the package records, also used as the HELP text of the Prometheus exporter
+EVENTS = {
+    'sqid_created': "Sqid objects constructed.",
+    'encode': "Ids encoded into sqids.",
+    'decode': "Sqids decoded into ids.",
+    'lookup_rejected': "Values rejected by get_id_for_sqid_field, by reason.",
+    'empty_result_set': "Lookups short-circuited to EmptyResultSet because no value was valid, by lookup.",
+    'encode_cache_hit': "Ids found in the shared encode cache.",
+    'encode_cache_miss': "Ids not found in a non-empty shared encode cache.",
+}
+
+# The active MetricsRegistry, or None while metrics are disabled
+registry = None
+_lock = threading.Lock()
+
+
+class Histogram(object):
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # One count per bucket, plus one for anything slower than the last bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry(object):
+    """
+    Counts events per (name, field, reason), and times them per (name, field) when `timings` is set. Subclasses can
+    override record() to capture more detail, e.g. the `value` that was encoded or decoded.
+    """
+    def __init__(self, timings=False, buckets=DEFAULT_BUCKETS):
+        self.timings = timings
+        self.buckets = tuple(buckets)
+        self.counters = {}
+        self.histograms = {}
+        self._labels = {}
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Returns the time to pass to record() as `start`, or None if timings aren't being recorded."""
+        return time.perf_counter() if self.timings else None
+
+    def record(self, name, field="", reason="", amount=1, start=None, value=None):
+        """
+        Counts `amount` events of `name` on `field`. `start`, from start(), times them. `value` is the id or sqid that
+        was encoded, decoded or rejected, or a list of them, for subclasses that look at the values.
+        """
+        seconds = time.perf_counter() - start if start is not None else None
+        key = (name, field, reason)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+            if seconds is not None:
+                histogram = self.histograms.get((name, field))
+                if histogram is None:
+                    histogram = self.histograms[(name, field)] = Histogram(self.buckets)
+                histogram.observe(seconds)
+
+    def sqid_label(self, sqid):
+        """Returns the labels of the fields that `sqid` could belong to, going by its configuration and prefix."""
+        return self._label((sqid._salt, sqid._min_length, sqid._alphabet, sqid._blocklist, sqid._prefix))
+
+    def field_label(self, field):
+        """Returns the label sqid_label() gives the Sqids of `field`, so batches are counted with single conversions."""
+        return self._label((field.salt, field.min_length, field.alphabet, field.blocklist, str(field.prefix)))
+
+    def _label(self, key):
+        label = self._labels.get(key)
+        if label is None:
+            label = _resolve_label(key)
+            if label is None:
+                return ""
+            self._labels[key] = label
+        return label
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def snapshot(self):
+        """Returns the counters, histograms and cache sizes as a dict of lists that can be serialized as JSON."""
+        from .codec import _codecs, _encode_caches, _table_codecs
+
+        with self._lock:
+            counters = [
+                {'name': name, 'field': field, 'reason': reason, 'value': value}
+                for (name, field, reason), value in sorted(self.counters.items())
+            ]
+            histograms = [
+                {'name': name, 'field': field, 'buckets': list(zip(histogram.buckets, histogram.counts)),
+                 'count': histogram.count, 'sum': histogram.sum}
+                for (name, field), histogram in sorted(self.histograms.items())
+            ]
+        return {
+            'counters': counters,
+            'histograms': histograms,
+            'caches': {
+                'codecs': len(_codecs),
+                'table_codecs': len(_table_codecs),
+                'encode_cache_entries': sum(len(cache) for cache in list(_encode_caches.values())),
+            },
+        }
+
+
+def _resolve_label(config):
+    """Returns the labels of the installed Sqid*Fields with the given configuration, or None before Django is ready."""
+    if 'django.apps' not in sys.modules:
+        return None
+    from django.apps import apps
+
+    if not apps.ready:
+        return None
+    from .prefork import get_sqid_fields
+
+    return ",".join(sorted(
+        str(field) for field in get_sqid_fields()
+        if (field.salt, field.min_length, field.alphabet, field.blocklist, field.prefix) == config
+    ))
+
+
+def enable(timings=False, registry=None):
+    """
+    Starts recording metrics into `registry`, or a new MetricsRegistry, and returns it. Timing histograms are only
+    recorded with `timings`, as they read the clock twice per event. If metrics are already enabled and no registry is
+    given, the active one is kept, with `timings` updated.
+    """
+    with _lock:
+        if registry is None:
+            registry = globals()['registry'] or MetricsRegistry()
+            registry.timings = timings
+        globals()['registry'] = registry
+    return registry
+
+
+def disable():
+    """Stops recording metrics, returning the registry that was active, if any."""
+    global registry
+    with _lock:
+        current, registry = registry, None
+    return current
+
+
+def snapshot():
+    """Returns a snapshot of the active registry, see MetricsRegistry.snapshot(), or None if metrics are disabled."""
+    current = registry
+    return current.snapshot() if current is not None else None
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels):
+    labels = ",".join('{}="{}"'.format(name, _escape(value)) for name, value in labels.items() if value)
+    return "{" + labels + "}" if labels else ""
+
+
+def prometheus_text(data=None):
+    """Formats a snapshot, by default of the active registry, in the Prometheus text exposition format."""
+    if data is None:
+        data = snapshot() or {'counters': [], 'histograms': [], 'caches': {}}
+    lines = []
+    seen = set()
+    for counter in data['counters']:
+        metric = "sqids_{}_total".format(counter['name'])
+        if metric not in seen:
+            seen.add(metric)
+            lines.append("# HELP {} {}".format(metric, EVENTS.get(counter['name'], counter['name'])))
+            lines.append("# TYPE {} counter".format(metric))
+        lines.append("{}{} {}".format(metric, _labels(field=counter['field'], reason=counter['reason']),
+                                      counter['value']))
+    for histogram in data['histograms']:
+        metric = "sqids_{}_seconds".format(histogram['name'])
+        if metric not in seen:
+            seen.add(metric)
+            lines.append("# HELP {} Time taken: {}".format(metric, EVENTS.get(histogram['name'], histogram['name'])))
+            lines.append("# TYPE {} histogram".format(metric))
+        cumulative = 0
+        for bound, count in histogram['buckets']:
+            cumulative += count
+            lines.append("{}_bucket{} {}".format(metric, _labels(field=histogram['field'], le=repr(bound)),
+                                                 cumulative))
+        lines.append("{}_bucket{} {}".format(metric, _labels(field=histogram['field'], le="+Inf"),
+                                             histogram['count']))
+        lines.append("{}_sum{} {!r}".format(metric, _labels(field=histogram['field']), histogram['sum']))
+        lines.append("{}_count{} {}".format(metric, _labels(field=histogram['field']), histogram['count']))
+    for name, value in sorted(data['caches'].items()):
+        metric = "sqids_{}".format(name)
+        lines.append("# TYPE {} gauge".format(metric))
+        lines.append("{} {}".format(metric, value))
+    return "\n".join(lines) + "\n"
+
+
+def prometheus_view(request):
+    """A Django view that serves prometheus_text(), for a URL that the Prometheus server scrapes."""
+    from django.http import HttpResponse
+
+    return HttpResponse(prometheus_text(), content_type="text/plain; version=0.0.4; charset=utf-8")
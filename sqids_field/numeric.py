@@ -0,0 +1,215 @@
+"""
+Precomputed indexes of the ids whose sqid is made up entirely of digits.
+
+A value like "3557953" could either be a sqid or an integer typed in where a sqid was expected. Without an index this
+is settled by parsing the value as an integer and comparing it against a freshly encoded sqid. An index, written by
+``manage.py sqids_scan_numeric`` and memory-mapped read-only, settles it with a table-driven decode and one membership
+test: an all-digit value is a sqid only if the id it decodes to is in the index, and that id's sqid is the value.
+
+An index covers the ids from 0 up to its limit, and is stored as a bitmap or as a sorted array of ids, whichever is
+smaller.
+"""
+import bisect
+import mmap
+import os
+import struct
+import threading
+import warnings
+from array import array
+from collections import deque
+
+from .codec import codec_fingerprint, get_config, get_table_codec
+
+MAGIC = b"SQIDNUM1"
+# Magic, codec fingerprint, limit, number of ids, kind
+_header = struct.Struct("<8s8sQQB7x")
+BITMAP = 0
+SORTED = 1
+SUFFIX = ".sqidnum"
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+_numeric_indexes = {}
+_lock = threading.Lock()
+
+
+def numeric_index_path(directory, salt, min_length, alphabet, blocklist=None):
+    """Returns the path of the numeric index for the given codec configuration in `directory`."""
+    return os.path.join(directory, codec_fingerprint(salt, min_length, alphabet, blocklist).hex() + SUFFIX)
+
+
+def _scan_chunk(fingerprint, start, stop):
+    """Returns the ids in range(start, stop) whose sqid is all digits."""
+    codec = get_table_codec(*get_config(fingerprint))
+    if not any(c.isdigit() for c in codec.alphabet):
+        return []
+    try:
+        import numpy
+    except ImportError:
+        encode = codec.encode
+        return [id for id in range(start, stop) if encode(id).isdigit()]
+    from .vector import encode_tokens
+    tokens = encode_tokens(numpy, codec, numpy.arange(start, stop, dtype=numpy.int64))
+    chars = tokens.view(numpy.uint8).reshape(len(tokens), tokens.dtype.itemsize)
+    numeric = (((chars >= ord("0")) & (chars <= ord("9"))) | (chars == 0)).all(axis=1)
+    return (numpy.flatnonzero(numeric) + start).tolist()
+
+
+def scan_numeric(field, limit, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, executor=None):
+    """
+    Returns the sorted ids below `limit` whose sqid (without prefix) for the given Sqid*Field is all digits, scanning
+    chunks of the range in parallel. A pool of `workers` processes is started for the call unless an `executor` from
+    sqids_field.parallel.get_executor() is given.
+    """
+    from .parallel import _default_workers, get_executor
+
+    fingerprint = codec_fingerprint(field.salt, field.min_length, field.alphabet, field.blocklist)
+    owns_executor = executor is None
+    if owns_executor:
+        executor = get_executor([field], workers)
+    max_pending = 2 * (workers or _default_workers())
+    pending = deque()
+    ids = []
+    try:
+        for start in range(0, limit, chunk_size):
+            pending.append(executor.submit(_scan_chunk, fingerprint, start, min(start + chunk_size, limit)))
+            if len(pending) >= max_pending:
+                ids.extend(pending.popleft().result())
+        while pending:
+            ids.extend(pending.popleft().result())
+    finally:
+        for future in pending:
+            future.cancel()
+        if owns_executor:
+            executor.shutdown()
+    return ids
+
+
+def write_numeric_index(path, limit, ids, salt, min_length, alphabet, blocklist=None):
+    """
+    Writes the sorted `ids` found below `limit` as a numeric index to `path`, as a bitmap or a sorted array depending on
+    which is smaller. The file is written next to `path` and then renamed over it.
+    """
+    if len(ids) * 64 > limit:
+        kind = BITMAP
+        bitmap = bytearray((limit + 7) // 8)
+        for id in ids:
+            bitmap[id >> 3] |= 1 << (id & 7)
+        data = bytes(bitmap)
+    else:
+        kind = SORTED
+        data = array('q', ids).tobytes()
+    header = _header.pack(MAGIC, codec_fingerprint(salt, min_length, alphabet, blocklist), limit, len(ids), kind)
+    tmp_path = "{}.{}.tmp".format(path, os.getpid())
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+class NumericIndex(object):
+    """A read-only, memory-mapped numeric index written by write_numeric_index()."""
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, self.fingerprint, self.limit, self.count, self.kind = _header.unpack_from(self._mmap)
+        except struct.error:
+            magic = None
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError("{} is not a sqids numeric index".format(path))
+        self.path = path
+        # The TableCodec used by settle_numeric(), set by get_numeric_index()
+        self.codec = None
+        data = memoryview(self._mmap)[_header.size:]
+        self._data = data if self.kind == BITMAP else data[:self.count * 8].cast('q')
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, id):
+        """Returns whether the sqid of `id` is all digits. Only meaningful for ids below the index's limit."""
+        if not 0 <= id < self.limit:
+            return False
+        if self.kind == BITMAP:
+            return bool(self._data[id >> 3] & (1 << (id & 7)))
+        data = self._data
+        i = bisect.bisect_left(data, id)
+        return i < self.count and data[i] == id
+
+    def close(self):
+        self._data.release()
+        self._mmap.close()
+
+
+def get_numeric_index(directory, salt, min_length, alphabet, blocklist=None):
+    """
+    Returns the shared NumericIndex for the given codec configuration from `directory`, or None if there isn't one.
+    Indexes that can't be read, or that were written for another configuration, are ignored with a warning.
+    """
+    path = numeric_index_path(directory, salt, min_length, alphabet, blocklist)
+    index = _numeric_indexes.get(path, False)
+    if index is not False:
+        return index
+    with _lock:
+        index = _numeric_indexes.get(path, False)
+        if index is not False:
+            return index
+        index = None
+        if os.path.exists(path):
+            try:
+                index = NumericIndex(path)
+            except (OSError, ValueError) as e:
+                warnings.warn("Ignoring sqids numeric index: {}".format(e))
+            else:
+                if index.fingerprint != codec_fingerprint(salt, min_length, alphabet, blocklist):
+                    warnings.warn("Ignoring sqids numeric index {}, which doesn't match its codec".format(path))
+                    index.close()
+                    index = None
+                else:
+                    index.codec = get_table_codec(salt, min_length, alphabet, blocklist)
+        _numeric_indexes[path] = index
+    return index
+
+
+def settle_numeric(index, value):
+    """
+    Settles whether the all-digit `value` (without prefix) is a sqid, using a numeric index from get_numeric_index().
+    Returns the id it is the sqid of, False if it is an integer instead, or None if it decodes to an id beyond the
+    index's limit, which the index can't tell.
+    """
+    codec = index.codec
+    id = codec.decode(value)
+    if id is None:
+        return False
+    if id >= index.limit:
+        return None
+    if id not in index:
+        return False
+    # The sqid of `id` is all digits, so `value` is it unless it's another string that decodes to the same id. That is
+    # checked from the codec's tables. Only ids whose sqid was moved to another offset by the blocklist are encoded.
+    if _is_canonical(codec, id, value):
+        return id
+    return id if codec.encode(id) == value else False
+
+
+def _is_canonical(codec, id, value):
+    """
+    Returns whether `value`, which decodes to `id`, starts from the alphabet offset encode() first tries for `id`, has
+    no leading zero digit and is padded exactly like encode() pads it.
+    """
+    offset = codec.offset(id)
+    if value[0] != codec.prefixes[offset]:
+        return False
+    end = value.find(codec.separators[offset], 1)
+    if end == -1:
+        end = len(value)
+    if end > 2 and value[1] == codec.digits[offset][0]:
+        return False
+    return value[end:] == codec.paddings[offset][:max(codec.min_length - end, 0)]
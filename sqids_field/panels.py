@@ -0,0 +1,209 @@
+"""
+A Django Debug Toolbar panel that shows the sqid activity of each request: encodes and decodes per field, the same ids
+converted over and over, e.g. by ``str(book.author.id)`` in a template loop, encode cache hits, lookups short-circuited
+to EmptyResultSet and the slowest conversions with where they were called from.
+
+Add ``"sqids_field.panels.SqidsPanel"`` to ``DEBUG_TOOLBAR_PANELS``. It collects its data with a
+sqids_field.metrics registry for the duration of each request, and passes everything on to any registry that was
+already enabled.
+"""
+import heapq
+import itertools
+import os
+import sys
+import time
+import traceback
+from collections import Counter
+
+from debug_toolbar.panels import Panel
+from django.template import Context, Engine
+from django.utils.translation import gettext_lazy as _
+
+from . import metrics
+
+# Number of conversions kept with their stack summaries, and of frames in each summary
+NUM_SLOWEST = 10
+NUM_FRAMES = 5
+NUM_DUPLICATES = 20
+
+TEMPLATE = """
+<h4>{{ encodes }} encodes, {{ decodes }} decodes, {{ duplicate_conversions }} repeated</h4>
+<table>
+  <thead><tr><th>Field</th><th>Encodes</th><th>Decodes</th><th>Repeated</th></tr></thead>
+  <tbody>{% for field in fields %}
+    <tr><td>{{ field.field|default:"(unknown)" }}</td><td>{{ field.encodes }}</td><td>{{ field.decodes }}</td>
+      <td>{{ field.duplicates }}</td></tr>{% endfor %}
+  </tbody>
+</table>
+{% if duplicates %}
+<h4>Ids converted more than once</h4>
+<table>
+  <thead><tr><th>Field</th><th>Conversion</th><th>Value</th><th>Times</th></tr></thead>
+  <tbody>{% for duplicate in duplicates %}
+    <tr><td>{{ duplicate.field|default:"(unknown)" }}</td><td>{{ duplicate.name }}</td><td>{{ duplicate.value }}</td>
+      <td>{{ duplicate.count }}</td></tr>{% endfor %}
+  </tbody>
+</table>
+{% endif %}
+<h4>Encode cache</h4>
+<p>{{ cache_hits }} hits, {{ cache_misses }} misses{% if cache_hit_ratio is not None %},
+  {{ cache_hit_ratio|floatformat:1 }}% hit ratio{% endif %}</p>
+{% if empty_result_sets or rejected %}
+<h4>Lookups</h4>
+<table>
+  <thead><tr><th>Field</th><th>Outcome</th><th>Times</th></tr></thead>
+  <tbody>{% for lookup in empty_result_sets %}
+    <tr><td>{{ lookup.field }}</td><td>{{ lookup.lookup }} short-circuited to EmptyResultSet</td>
+      <td>{{ lookup.count }}</td></tr>{% endfor %}{% for lookup in rejected %}
+    <tr><td>{{ lookup.field }}</td><td>value rejected: {{ lookup.reason }}</td>
+      <td>{{ lookup.count }}</td></tr>{% endfor %}
+  </tbody>
+</table>
+{% endif %}
+{% if slowest %}
+<h4>Slowest conversions</h4>
+<table>
+  <thead><tr><th>Time (ms)</th><th>Field</th><th>Conversion</th><th>Values</th><th>Called from</th></tr></thead>
+  <tbody>{% for conversion in slowest %}
+    <tr><td>{{ conversion.milliseconds|floatformat:3 }}</td><td>{{ conversion.field|default:"(unknown)" }}</td>
+      <td>{{ conversion.name }}</td><td>{{ conversion.amount }}</td>
+      <td><code>{% for frame in conversion.stack %}{{ frame }}<br>{% endfor %}</code></td></tr>{% endfor %}
+  </tbody>
+</table>
+{% endif %}
+"""
+
+
+def _library_paths():
+    """Returns the directories of the packages whose frames are left out of stack summaries."""
+    paths = []
+    for name in ('sqids_field', 'sqids', 'django', 'rest_framework', 'debug_toolbar'):
+        module = sys.modules.get(name)
+        if module is not None and getattr(module, '__file__', None):
+            paths.append(os.path.dirname(module.__file__) + os.sep)
+    return tuple(paths)
+
+
+def stack_summary(limit=NUM_FRAMES):
+    """Returns the innermost `limit` frames of the current stack that are outside of sqids_field and Django."""
+    libraries = _library_paths()
+    frames = [frame for frame in traceback.extract_stack() if not frame.filename.startswith(libraries)]
+    return ["{}:{} in {}".format(frame.filename, frame.lineno, frame.name) for frame in frames[-limit:]]
+
+
+class RequestRegistry(metrics.MetricsRegistry):
+    """
+    Collects, on top of the counters, how many times each value was encoded or decoded, and the slowest conversions
+    along with where they were called from. Every event is also passed on to `previous`, if given.
+    """
+    def __init__(self, previous=None, slowest=NUM_SLOWEST):
+        super().__init__(timings=True)
+        self.previous = previous
+        self.values = Counter()
+        self.num_slowest = slowest
+        self.slowest = []
+        self._order = itertools.count()
+
+    def record(self, name, field="", reason="", amount=1, start=None, value=None):
+        seconds = time.perf_counter() - start if start is not None else None
+        super().record(name, field, reason, amount, start, value)
+        if self.previous is not None:
+            self.previous.record(name, field, reason, amount, start if self.previous.timings else None, value)
+        if name not in ('encode', 'decode'):
+            return
+        for one in (value if isinstance(value, list) else (value,)):
+            self.values[(name, field, one)] += 1
+        if seconds is not None and (len(self.slowest) < self.num_slowest or seconds > self.slowest[0][0]):
+            conversion = {'name': name, 'field': field, 'amount': amount, 'milliseconds': seconds * 1000,
+                          'stack': stack_summary()}
+            entry = (seconds, next(self._order), conversion)
+            if len(self.slowest) < self.num_slowest:
+                heapq.heappush(self.slowest, entry)
+            else:
+                heapq.heapreplace(self.slowest, entry)
+
+    def summary(self):
+        """Returns what the panel shows, as a dict of numbers, strings and lists that can be stored as JSON."""
+        with self._lock:
+            counts = dict(self.counters)
+        totals = Counter()
+        fields = {}
+        for (name, field, reason), value in counts.items():
+            if name in ('encode', 'decode'):
+                totals[name] += value
+                fields.setdefault(field, Counter())[name + 's'] += value
+        duplicates = [
+            {'name': name, 'field': field, 'value': str(value), 'count': count}
+            for (name, field, value), count in self.values.items() if count > 1
+        ]
+        for duplicate in duplicates:
+            fields[duplicate['field']]['duplicates'] += duplicate['count'] - 1
+        duplicates.sort(key=lambda duplicate: -duplicate['count'])
+        hits = sum(value for (name, field, reason), value in counts.items() if name == 'encode_cache_hit')
+        misses = sum(value for (name, field, reason), value in counts.items() if name == 'encode_cache_miss')
+        return {
+            'encodes': totals['encode'],
+            'decodes': totals['decode'],
+            'fields': [
+                {'field': field, 'encodes': field_counts['encodes'], 'decodes': field_counts['decodes'],
+                 'duplicates': field_counts['duplicates']}
+                for field, field_counts in sorted(fields.items())
+            ],
+            'duplicate_conversions': sum(duplicate['count'] - 1 for duplicate in duplicates),
+            'duplicates': duplicates[:NUM_DUPLICATES],
+            'cache_hits': hits,
+            'cache_misses': misses,
+            'cache_hit_ratio': 100 * hits / (hits + misses) if hits + misses else None,
+            'empty_result_sets': [
+                {'field': field, 'lookup': lookup, 'count': count}
+                for (name, field, lookup), count in sorted(counts.items()) if name == 'empty_result_set'
+            ],
+            'rejected': [
+                {'field': field, 'reason': reason, 'count': count}
+                for (name, field, reason), count in sorted(counts.items()) if name == 'lookup_rejected'
+            ],
+            'slowest': [conversion for _, _, conversion in sorted(self.slowest, reverse=True)],
+        }
+
+
+class SqidsPanel(Panel):
+    title = _("Sqids")
+    _template = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.registry = None
+        self._previous = None
+
+    @property
+    def nav_subtitle(self):
+        stats = self.get_stats()
+        if not stats:
+            return ""
+        subtitle = "{} encodes, {} decodes".format(stats['encodes'], stats['decodes'])
+        if stats['duplicate_conversions']:
+            subtitle += ", {} repeated".format(stats['duplicate_conversions'])
+        return subtitle
+
+    @property
+    def content(self):
+        # Rendered from a string rather than a template file, so that the panel doesn't depend on the template loaders
+        if SqidsPanel._template is None:
+            SqidsPanel._template = Engine(autoescape=True).from_string(TEMPLATE)
+        return SqidsPanel._template.render(Context(self.get_stats()))
+
+    def enable_instrumentation(self):
+        if self.registry is None:
+            self._previous = metrics.registry
+            self.registry = RequestRegistry(self._previous)
+            metrics.enable(registry=self.registry)
+
+    def disable_instrumentation(self):
+        if metrics.registry is self.registry:
+            metrics.disable()
+            if self._previous is not None:
+                metrics.enable(registry=self._previous)
+
+    def generate_stats(self, request, response):
+        if self.registry is not None:
+            self.record_stats(self.registry.summary())
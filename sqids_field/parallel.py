@@ -0,0 +1,132 @@
+"""
+Parallel encoding and decoding of very large sets of ids.
+
+Inputs are split into chunks that are handled by a pool of worker processes, or of threads on free-threaded builds of
+CPython. Workers are only sent the fingerprint of the codec configuration along with each chunk, and look the codec up
+themselves, so only integers and strings cross process boundaries. Results are returned in input order.
+"""
+import itertools
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .codec import codec_fingerprint, get_config, get_table_codec
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def _gil_disabled():
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def _default_workers():
+    cpu_count = getattr(os, 'process_cpu_count', os.cpu_count)
+    return cpu_count() or 1
+
+
+def _register_configs(configs):
+    # Runs in every worker, which may have been spawned without any of the parent's codecs registered
+    for config in configs:
+        codec_fingerprint(*config)
+
+
+def _field_config(field):
+    return field.salt, field.min_length, field.alphabet, field.blocklist
+
+
+def get_executor(fields, workers=None):
+    """
+    Returns an executor that can encode and decode for the given Sqid*Fields: a ThreadPoolExecutor on free-threaded
+    CPython, otherwise a ProcessPoolExecutor whose workers register the fields' codec configurations on startup.
+    """
+    workers = workers or _default_workers()
+    configs = [_field_config(field) for field in fields]
+    if _gil_disabled():
+        _register_configs(configs)
+        return ThreadPoolExecutor(max_workers=workers)
+    return ProcessPoolExecutor(max_workers=workers, initializer=_register_configs, initargs=(configs,))
+
+
+def _encode_chunk(fingerprint, prefix, ids):
+    encode = get_table_codec(*get_config(fingerprint)).encode
+    return [prefix + encode(id) for id in ids]
+
+
+def _decode_chunk(fingerprint, prefix, sqids):
+    decode = get_table_codec(*get_config(fingerprint)).decode
+    prefix_length = len(prefix)
+    ids = []
+    for sqid in sqids:
+        id = decode(sqid[prefix_length:]) if sqid.startswith(prefix) else None
+        if id is None:
+            raise ValueError("'{}' is not a valid Sqids string".format(sqid))
+        ids.append(id)
+    return ids
+
+
+def _chunks(values, chunk_size):
+    values = iter(values)
+    while True:
+        chunk = list(itertools.islice(values, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _map_chunks(function, values, field, workers, chunk_size, executor):
+    fingerprint = codec_fingerprint(*_field_config(field))
+    prefix = str(field.prefix)
+    if executor is None and hasattr(values, '__len__') and len(values) <= chunk_size:
+        # Not worth starting a pool for
+        yield from function(fingerprint, prefix, values)
+        return
+
+    owns_executor = executor is None
+    if owns_executor:
+        executor = get_executor([field], workers)
+    # Keep a bounded number of chunks in flight, so that huge inputs are streamed through instead of all submitted
+    max_pending = 2 * (workers or _default_workers())
+    pending = deque()
+    try:
+        for chunk in _chunks(values, chunk_size):
+            pending.append(executor.submit(function, fingerprint, prefix, chunk))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        if owns_executor:
+            executor.shutdown()
+
+
+def iter_encode_many(ids, field, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, executor=None):
+    """Like encode_many(), but yields the sqid strings as chunks complete, so inputs don't have to fit in memory."""
+    return _map_chunks(_encode_chunk, ids, field, workers, chunk_size, executor)
+
+
+def iter_decode_many(sqids, field, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, executor=None):
+    """Like decode_many(), but yields the integers as chunks complete, so inputs don't have to fit in memory."""
+    return _map_chunks(_decode_chunk, sqids, field, workers, chunk_size, executor)
+
+
+def encode_many(ids, field, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, executor=None):
+    """
+    Encodes integers into sqid strings for the given Sqid*Field, including its prefix, in parallel chunks.
+
+    A pool of `workers` (default: the number of CPUs) is started and shut down for the call, unless an `executor`
+    from get_executor() is given to reuse across calls.
+    """
+    return list(iter_encode_many(ids, field, workers, chunk_size, executor))
+
+
+def decode_many(sqids, field, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, executor=None):
+    """
+    Decodes sqid strings for the given Sqid*Field, including its prefix, into integers in parallel chunks.
+
+    Raises ValueError if any of them isn't a valid sqid for the field.
+    """
+    return list(iter_decode_many(sqids, field, workers, chunk_size, executor))
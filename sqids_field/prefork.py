@@ -0,0 +1,99 @@
+"""
+Warming up codecs and caches in a preforking server's master process, so that every worker shares them copy-on-write
+instead of building its own.
+"""
+import time
+
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections, models
+from django.db.models import ExpressionWrapper, F
+
+from .codec import get_codec, get_encode_cache, get_table_codec
+from .dense import DenseCodec
+from .field import SqidFieldMixin
+
+
+def get_sqid_fields():
+    """Returns every concrete Sqid*Field of the installed models, once each."""
+    # Only local fields, as proxy models and multi-table inheritance children share their parents' field instances
+    return [
+        field
+        for model in apps.get_models()
+        for field in model._meta.local_concrete_fields
+        if isinstance(field, SqidFieldMixin)
+    ]
+
+
+def get_sqid_field_by_label(label):
+    """Returns the Sqid*Field given as app_label.ModelName.field, raising LookupError if there is no such field."""
+    try:
+        app_label, model_name, field_name = label.split(".")
+        field = apps.get_model(app_label, model_name)._meta.get_field(field_name)
+    except (ValueError, LookupError, FieldDoesNotExist):
+        raise LookupError("'{}' is not a field, use app_label.ModelName.field".format(label)) from None
+    if not isinstance(field, SqidFieldMixin):
+        raise LookupError("{} is not a Sqid*Field".format(label))
+    return field
+
+
+def warmup(top_n=0, using=None, tables=True):
+    """
+    Builds the codec of every Sqid*Field, maps the dense tables of fields with a dense_table_size, builds the
+    TableCodec and vectorized tables of each configuration when `tables` is True, and pre-encodes the values of each
+    field in the `top_n` most recently created rows (highest primary keys).
+    Pre-encoded ids are used by the field whenever it loads them from the database.
+
+    Call it in the master process after Django is set up and before workers are forked, e.g. in gunicorn's
+    ``when_ready`` hook with ``preload_app = True``. Database connections opened to read the ids are closed again so
+    workers don't share them.
+
+    Returns a dict with the number of fields, codecs, tables, dense tables and pre-encoded ids, and the time taken in
+    seconds.
+    """
+    start = time.perf_counter()
+    fields = get_sqid_fields()
+    configs = {(field.salt, field.min_length, field.alphabet, field.blocklist) for field in fields}
+    for config in configs:
+        get_codec(*config)
+    # Mapped before forking, so that workers inherit the mapping instead of each opening the file
+    dense_tables = {field._sqids.table for field in fields if isinstance(field._sqids, DenseCodec)}
+
+    num_tables = 0
+    if tables:
+        try:
+            import numpy
+            from .vector import get_vector_tables
+        except ImportError:
+            numpy = None
+        for config in configs:
+            codec = get_table_codec(*config)
+            num_tables += 1
+            if numpy is not None:
+                get_vector_tables(numpy, codec)
+                num_tables += 1
+
+    preencoded = 0
+    if top_n:
+        try:
+            for field in fields:
+                cache = get_encode_cache(field.salt, field.min_length, field.alphabet, field.blocklist)
+                encode = get_codec(field.salt, field.min_length, field.alphabet, field.blocklist).encode
+                ids = (field.model._default_manager.using(using).order_by('-pk')
+                       .values_list(ExpressionWrapper(F(field.attname), output_field=models.BigIntegerField()),
+                                    flat=True)[:top_n])
+                for id in ids:
+                    if id is not None and id not in cache:
+                        cache[id] = encode([id])
+                        preencoded += 1
+        finally:
+            connections.close_all()
+
+    return {
+        'fields': len(fields),
+        'codecs': len(configs),
+        'tables': num_tables,
+        'dense_tables': len(dense_tables),
+        'preencoded': preencoded,
+        'seconds': time.perf_counter() - start,
+    }
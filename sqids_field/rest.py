@@ -2,10 +2,11 @@ from django.apps import apps
 from django.core import exceptions
 from django.utils.translation import gettext_lazy as _
 
-from sqids import Sqids
 from rest_framework import fields
 
+from sqids_field.codec import get_codec, normalize_blocklist
 from sqids_field.conf import settings
+from sqids_field.numeric import get_numeric_index, settle_numeric
 from sqids_field.sqid import Sqid
 from sqids_field.lookups import _is_int_representation
 
@@ -31,6 +32,7 @@ class SqidSerializerMixin(object):
         self.sqid_alphabet = kwargs.pop('alphabet', settings.SQID_FIELD_ALPHABET)
         self.allow_int_lookup = kwargs.pop('allow_int_lookup', settings.SQID_FIELD_ALLOW_INT_LOOKUP)
         self.prefix = kwargs.pop('prefix', "")
+        self.sqid_blocklist = normalize_blocklist(kwargs.pop('blocklist', settings.SQID_FIELD_BLOCKLIST))
         self._sqids = kwargs.pop('sqids', None)
 
         source_field = kwargs.pop('source_field', None)
@@ -50,17 +52,22 @@ class SqidSerializerMixin(object):
             self.sqid_alphabet = source_field.alphabet
             self.allow_int_lookup = source_field.allow_int_lookup
             self.prefix = source_field.prefix
+            self.sqid_blocklist = source_field.blocklist
             self._sqids =source_field._sqids
         if not self._sqids:
-            self._sqids = Sqids(salt=self.sqid_salt, min_length=self.sqid_min_length,
-                                    alphabet=self.sqid_alphabet)
+            self._sqids = get_codec(self.sqid_salt, self.sqid_min_length, self.sqid_alphabet, self.sqid_blocklist)
+        self._numeric_index = None
+        if settings.SQID_FIELD_NUMERIC_INDEX_DIR and not self.allow_int_lookup:
+            self._numeric_index = get_numeric_index(settings.SQID_FIELD_NUMERIC_INDEX_DIR, self.sqid_salt,
+                                                    self.sqid_min_length, self.sqid_alphabet, self.sqid_blocklist)
         super().__init__(**kwargs)
 
     def to_internal_value(self, data):
         value = super().to_internal_value(data)
         try:
             return Sqid(value, salt=self.sqid_salt, min_length=self.sqid_min_length,
-                          alphabet=self.sqid_alphabet, prefix=self.prefix, sqids=self._sqids)
+                          alphabet=self.sqid_alphabet, prefix=self.prefix, sqids=self._sqids,
+                        blocklist=self.sqid_blocklist)
         except ValueError:
             self.fail('invalid_sqid', value=data)
 
@@ -70,6 +77,16 @@ class SqidSerializerCharField(SqidSerializerMixin, fields.CharField):
         return str(value)
 
     def to_internal_value(self, data):
+        if self._numeric_index is not None and isinstance(data, str) and data.startswith(self.prefix):
+            # Settle whether an all-digit value is a sqid or an integer with the precomputed index, when it covers it
+            without_prefix = data[len(self.prefix):]
+            if without_prefix.isascii() and without_prefix.isdigit():
+                id = settle_numeric(self._numeric_index, without_prefix)
+                if id is False:
+                    self.fail('invalid_sqid', value=data)
+                if id is not None:
+                    return Sqid._from_id(id, self.sqid_salt, self.sqid_min_length, self.sqid_alphabet, self.prefix,
+                                         self._sqids, without_prefix, self.sqid_blocklist)
         sqid = super().to_internal_value(data)
         if isinstance(data, int) and not self.allow_int_lookup:
             self.fail('invalid_sqid', value=data)
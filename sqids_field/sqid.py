@@ -1,6 +1,15 @@
+import struct
+import sys
 from functools import total_ordering
 
-from sqids import Sqids
+from sqids.constants import DEFAULT_ALPHABET
+
+from . import metrics
+from .codec import codec_fingerprint, get_codec, get_config, normalize_blocklist
+
+# msgpack extension type code used by msgpack_default() and msgpack_ext_hook()
+MSGPACK_EXT_TYPE = 83
+_wire_header = struct.Struct(">8sQ")
 
 
 def _is_uint(candidate):
@@ -15,15 +24,16 @@ def _is_str(candidate):
 
 @total_ordering
 class Sqid(object):
-    def __init__(self, value, salt="", min_length=0, alphabet=Sqids.ALPHABET, prefix="", sqids=None):
+    def __init__(self, value, salt="", min_length=0, alphabet=DEFAULT_ALPHABET, prefix="", sqids=None, blocklist=None):
         self._salt = salt
         self._min_length = min_length
         self._alphabet = alphabet
         self._prefix = str(prefix)
+        self._blocklist = normalize_blocklist(blocklist)
 
         # If sqids is provided, it's for optimization only, and should be initialized with the same salt, min_length
         # and alphabet, or else we will run into problems
-        self._sqids = sqids or Sqids(salt=self._salt, min_length=self._min_length, alphabet=self._alphabet)
+        self._sqids = sqids or get_codec(self._salt, self._min_length, self._alphabet, self._blocklist)
         if not self._valid_sqids_object():
             raise Exception("Invalid sqids.Sqids object")
 
@@ -74,12 +84,18 @@ class Sqid(object):
         else:
             raise ValueError("value must be a positive integer or a valid Sqid string")
 
+        registry = metrics.registry
+        if registry is not None:
+            registry.record('sqid_created', registry.sqid_label(self))
+
     @property
     def id(self):
         return self._id
 
     @property
     def sqid(self):
+        if self._sqid is None:
+            self._sqid = self.encode(self._id)
         return self._sqid
 
     @property
@@ -91,29 +107,41 @@ class Sqid(object):
         return self._sqids
 
     def encode(self, id):
-        return self._sqids.encode(id)
+        registry = metrics.registry
+        if registry is None:
+            return self._sqids.encode([id])
+        start = registry.start()
+        sqid = self._sqids.encode([id])
+        registry.record('encode', registry.sqid_label(self), start=start, value=id)
+        return sqid
 
     def decode(self, sqid):
-        ret = self._sqids.decode(sqid)
+        registry = metrics.registry
+        if registry is None:
+            ret = self._sqids.decode(sqid)
+        else:
+            start = registry.start()
+            ret = self._sqids.decode(sqid)
+            registry.record('decode', registry.sqid_label(self), start=start, value=sqid)
         if len(ret) == 1:
             return ret[0]
         else:
             return None
 
     def _valid_sqids_object(self):
-        # The sqids.Sqids class randomizes the alphabet and pulls out separators and guards, thus not being
-        # reversible. So all we can test is that the length of the alphabet, separators and guards are equal to the
-        # original alphabet we gave it. We could also check that all of the characters we gave it are present, but that
-        # seems excessive... this test will catch most errors.
-        return self._salt == self._sqids._salt \
-            and self._min_length == self._sqids._min_length \
-            and len(self._alphabet) == len(self._sqids._alphabet + self._sqids._separators + self._sqids._guards)
+        # sqids.Sqids keeps its shuffled alphabet and min_length private, so a codec other than the shared one for this
+        # configuration (or a wrapper of it, like a DenseCodec) is checked by encoding the same numbers with both. Two
+        # numbers are enough to tell apart codecs with a different alphabet order or min_length.
+        codec = get_codec(self._salt, self._min_length, self._alphabet, self._blocklist)
+        if getattr(self._sqids, 'codec', self._sqids) is codec:
+            return True
+        return self._sqids.encode([0, 1]) == codec.encode([0, 1])
 
     def __repr__(self):
         return "Sqid({}): {}".format(self._id, str(self))
 
     def __str__(self):
-        return self._prefix + self._sqid
+        return self._prefix + self.sqid
 
     def __int__(self):
         return self._id
@@ -125,7 +153,7 @@ class Sqid(object):
         if isinstance(other, self.__class__):
             return (
                 self._id == other._id and
-                self._sqid == other._sqid and
+                self.sqid == other.sqid and
                 self._prefix == other._prefix
             )
         if isinstance(other, str):
@@ -144,14 +172,54 @@ class Sqid(object):
     def __len__(self):
         return len(str(self))
 
-    def __sqid__(self):
-        return sqid(str(self))
+    def __hash__(self):
+        return hash(str(self))
+
+    @classmethod
+    def _from_id(cls, id, salt, min_length, alphabet, prefix, sqids, sqid=None, blocklist=None):
+        # Fast path for ids that are already known to be valid, e.g. when unpickling. Skips validating the codec and
+        # parsing the value that __init__ does, and defers encoding until the sqid is actually needed, unless the
+        # already encoded `sqid` is given.
+        self = cls.__new__(cls)
+        self._salt = salt
+        self._min_length = min_length
+        self._alphabet = alphabet
+        self._prefix = prefix
+        self._blocklist = blocklist
+        self._sqids = sqids
+        self._id = id
+        self._sqid = sqid
+        registry = metrics.registry
+        if registry is not None:
+            registry.record('sqid_created', registry.sqid_label(self))
+        return self
+
+    @property
+    def fingerprint(self):
+        return codec_fingerprint(self._salt, self._min_length, self._alphabet, self._blocklist)
 
-    def __getstate__(self):
-        return self._id, self._salt, self._min_length, self._alphabet, self._prefix, self._sqid
+    def __reduce__(self):
+        # Only the fingerprint of the codec and the id are stored, and the shared codec is looked up again on load.
+        if self._prefix:
+            return _restore_sqid, (self.fingerprint, self._id, self._prefix)
+        return _restore_sqid, (self.fingerprint, self._id)
 
     def __setstate__(self, state):
+        # Sqids pickled by older versions stored the full configuration and the encoded value as their state.
         self._id, self._salt, self._min_length, self._alphabet, self._prefix, self._sqid = state
+        self._blocklist = None
+        self._sqids = get_codec(self._salt, self._min_length, self._alphabet)
+
+    def to_bytes(self):
+        """Returns a compact binary representation containing the codec fingerprint, id and prefix."""
+        return _wire_header.pack(self.fingerprint, self._id) + self._prefix.encode('utf-8')
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Loads a Sqid from the output of to_bytes(), rebinding it to the shared codec."""
+        fingerprint, id = _wire_header.unpack_from(data)
+        prefix = bytes(data[_wire_header.size:]).decode('utf-8')
+        return _restore_sqid(fingerprint, id, prefix, cls=cls)
 
     def __add__(self, other):
         return self._id + other
@@ -194,3 +262,42 @@ class Sqid(object):
 
     def __or__(self, other):
         return self._id | other
+
+
+def _get_config(fingerprint):
+    try:
+        return get_config(fingerprint)
+    except LookupError:
+        # Fields normally register their configuration as their models are defined. If it's still unknown and Django's
+        # apps are ready, register the configuration of every installed Sqid*Field and try again.
+        if 'django.apps' not in sys.modules or not sys.modules['django.apps'].apps.ready:
+            raise
+    from .prefork import get_sqid_fields
+
+    for field in get_sqid_fields():
+        codec_fingerprint(field.salt, field.min_length, field.alphabet, field.blocklist)
+    return get_config(fingerprint)
+
+
+def _restore_sqid(fingerprint, id, prefix="", cls=Sqid):
+    salt, min_length, alphabet, blocklist = _get_config(fingerprint)
+    return cls._from_id(id, salt, min_length, alphabet, prefix, get_codec(salt, min_length, alphabet, blocklist),
+                        blocklist=blocklist)
+
+
+def msgpack_default(obj):
+    """`default` hook for msgpack.packb() that packs Sqid objects as an extension type."""
+    import msgpack
+
+    if isinstance(obj, Sqid):
+        return msgpack.ExtType(MSGPACK_EXT_TYPE, obj.to_bytes())
+    raise TypeError("Object of type {} is not msgpack serializable".format(type(obj).__name__))
+
+
+def msgpack_ext_hook(code, data):
+    """`ext_hook` for msgpack.unpackb() that loads Sqid objects packed by msgpack_default()."""
+    import msgpack
+
+    if code == MSGPACK_EXT_TYPE:
+        return Sqid.from_bytes(data)
+    return msgpack.ExtType(code, data)
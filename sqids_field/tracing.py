@@ -0,0 +1,85 @@
+"""
+Attributing the work of decoding sqid lookup values to the SQL queries they end up in, to tell whether a slow query
+spent its time decoding, e.g. a 20,000 value ``__in`` list, or in the database.
+
+While tracing, Sqid*Field lookups record how many values they prepared, and how long that took, as they are compiled.
+A ``connection.execute_wrapper()`` then attaches what was recorded to the query that executes next.
+"""
+import contextvars
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+logger = logging.getLogger('sqids_field.tracing')
+
+# The lookups prepared since the last traced query ran in this context, or None while not tracing
+pending_lookups = contextvars.ContextVar('sqids_field_pending_lookups', default=None)
+
+
+class QueryTracer(object):
+    """
+    An execute wrapper that collects each query with the sqid lookups that were prepared for it, in `queries`, and
+    logs the ones that prepared any to the ``sqids_field.tracing`` logger if `log` is set.
+    """
+    def __init__(self, log=False):
+        self.log = log
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.add(sql, context['connection'].alias, time.perf_counter() - start)
+
+    def add(self, sql, alias, duration):
+        lookups = pending_lookups.get() or []
+        query = {
+            'sql': sql,
+            'alias': alias,
+            'duration': duration,
+            'sqid_values': sum(lookup['values'] for lookup in lookups),
+            'sqid_seconds': sum(lookup['seconds'] for lookup in lookups),
+            'sqid_lookups': list(lookups),
+        }
+        lookups.clear()
+        self.queries.append(query)
+        if self.log and query['sqid_lookups']:
+            logger.info("(%.3f) sqid lookups prepared %d values in %.3fs; %s", duration, query['sqid_values'],
+                        query['sqid_seconds'], sql, extra=query)
+
+
+@contextmanager
+def trace_sqid_queries(using=None, log=False):
+    """
+    Traces the queries run on the `using` database, or all of them, and yields the list that they are added to as
+    they run. Each is a dict of the `sql`, database `alias`, `duration` and the `sqid_values` its Sqid*Field lookups
+    prepared in `sqid_seconds`, with the `field`, `lookup` type, number of `values` and `seconds` of each lookup in
+    `sqid_lookups`.
+
+    Lookups that short-circuit to EmptyResultSet stop their query from running, so they are added to the next one.
+    Any left when tracing ends are added as a last entry whose `sql` is None.
+    """
+    tracer = QueryTracer(log=log)
+    token = pending_lookups.set([])
+    try:
+        with ExitStack() as stack:
+            for alias in ([using] if using else connections):
+                stack.enter_context(connections[alias].execute_wrapper(tracer))
+            yield tracer.queries
+        if pending_lookups.get():
+            tracer.add(None, using, 0.0)
+    finally:
+        pending_lookups.reset(token)
+
+
+class SqidQueryTracingMiddleware(object):
+    """Logs every query of a request that prepared Sqid*Field lookup values, see trace_sqid_queries()."""
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with trace_sqid_queries(log=True):
+            return self.get_response(request)
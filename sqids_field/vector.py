@@ -0,0 +1,325 @@
+"""
+Vectorized encoding and decoding of integer columns with NumPy, pandas and Arrow.
+
+Works on top of TableCodec: the alphabet offset, digits and padding of every value are looked up from the codec's
+tables with array operations, and only the few values that might hit the blocklist are re-encoded one at a time.
+NumPy, pandas and pyarrow are optional, and are only imported when these functions are used.
+
+encode_tokens(), decode_tokens() and as_tokens() work on fixed width bytes arrays without a prefix, and are shared with
+the other bulk modules, such as sqids_field.buffer and sqids_field.dense.
+"""
+import sys
+
+from .codec import TableCodec, get_table_codec
+
+_tables = {}
+_pandas_accessor_registered = False
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("sqids_field.vector requires NumPy to be installed") from None
+    return numpy
+
+
+def resolve_codec(field_or_codec):
+    """Returns the TableCodec and prefix for a Sqid*Field, or the TableCodec itself and an empty prefix."""
+    if isinstance(field_or_codec, TableCodec):
+        return field_or_codec, ""
+    field = field_or_codec
+    return get_table_codec(field.salt, field.min_length, field.alphabet, field.blocklist), str(field.prefix)
+
+
+def _is_arrow(values):
+    return type(values).__module__.split('.')[0] == 'pyarrow'
+
+
+class _VectorTables(object):
+    """NumPy versions of a TableCodec's tables."""
+    def __init__(self, np, codec):
+        size = codec.size
+        self.start_offsets = np.array([(o + 1) % size for o in codec.ords], dtype=np.int64)
+        self.prefixes = np.frombuffer("".join(codec.prefixes).encode('ascii'), dtype=np.uint8)
+        self.digits = np.frombuffer("".join(codec.digits).encode('ascii'), dtype=np.uint8).reshape(size, codec.base)
+        padding_length = max(codec.min_length - 2, 0)
+        self.paddings = np.frombuffer("".join(codec.paddings).encode('ascii'), dtype=np.uint8)
+        self.paddings = self.paddings.reshape(size, padding_length)
+        self.separators = np.frombuffer("".join(codec.separators).encode('ascii'), dtype=np.uint8)
+        self.next_separators = np.frombuffer("".join(codec.next_separators).encode('ascii'), dtype=np.uint8)
+
+        self.char_offsets = np.full(256, -1, dtype=np.int64)
+        for c, offset in codec.offsets.items():
+            self.char_offsets[ord(c)] = offset
+        self.digit_values = np.full((size, 256), -1, dtype=np.int64)
+        for offset, values in enumerate(codec.digit_values):
+            for c, value in values.items():
+                self.digit_values[offset, ord(c)] = value
+        # Longest number of digits that can never overflow an int64
+        self.safe_digits = 1
+        while codec.base ** (self.safe_digits + 1) <= sys.maxsize:
+            self.safe_digits += 1
+
+        # Ids that contain the first three (lowercased) characters of any blocklist word are only candidates for
+        # being blocked. They are a small fraction of all ids, and are re-encoded with the exact scalar check.
+        self.lower = np.arange(256, dtype=np.uint8)
+        self.lower[ord('A'):ord('Z') + 1] += 32
+        self.trigrams = np.zeros(1 << 21, dtype=bool)
+        for word in codec.blocklist_exact | codec.blocklist_ends | codec.blocklist_anywhere:
+            self.trigrams[(ord(word[0]) << 14) | (ord(word[1]) << 7) | ord(word[2])] = True
+
+
+def get_vector_tables(np, codec):
+    """Returns the NumPy tables of a TableCodec, which are built on first use and shared afterwards."""
+    tables = _tables.get(id(codec))
+    if tables is None or tables[0] is not codec:
+        tables = _tables[id(codec)] = (codec, _VectorTables(np, codec))
+    return tables[1]
+
+
+def encode_tokens(np, codec, numbers):
+    """Encodes a 1-d int64 array of non-negative numbers into an array of fixed width bytes."""
+    tables = get_vector_tables(np, codec)
+    count = len(numbers)
+    base = codec.base
+    offsets = tables.start_offsets[numbers % codec.size]
+
+    max_digits = 1
+    while max_digits < 19 and base ** max_digits <= int(numbers.max(initial=0)):
+        max_digits += 1
+    num_digits = np.ones(count, dtype=np.int64)
+    for power in range(1, max_digits):
+        num_digits += numbers >= base ** power
+    lengths = 1 + num_digits
+    width = max(codec.min_length, 1 + max_digits)
+
+    chars = np.zeros((count, width), dtype=np.uint8)
+    chars[:, 0] = tables.prefixes[offsets]
+    rows = np.arange(count)
+    remainder = numbers.copy()
+    for position in range(max_digits):
+        remainder, digit = np.divmod(remainder, base)
+        active = position < num_digits
+        chars[rows[active], (num_digits - position)[active]] = tables.digits[offsets[active], digit[active]]
+
+    if codec.min_length > 2:
+        columns = np.arange(width)
+        padding_index = columns[None, :] - lengths[:, None]
+        padded = (padding_index >= 0) & (columns[None, :] < codec.min_length)
+        padded_rows = np.nonzero(padded)[0]
+        chars[padded] = tables.paddings[offsets[padded_rows], padding_index[padded]]
+        lengths = np.maximum(lengths, codec.min_length)
+
+    tokens = chars.view('S{}'.format(width)).ravel()
+
+    lower = tables.lower[chars].astype(np.int64) & 0x7f
+    candidates = np.zeros(count, dtype=bool)
+    for start in range(width - 2):
+        trigram = (lower[:, start] << 14) | (lower[:, start + 1] << 7) | lower[:, start + 2]
+        candidates |= tables.trigrams[trigram] & (start + 3 <= lengths)
+    for i in np.nonzero(candidates)[0]:
+        tokens[i] = codec.encode(int(numbers[i])).encode('ascii')
+    return tokens
+
+
+def decode_tokens(np, codec, tokens):
+    """Decodes a 1-d array of fixed width bytes, returning the numbers and a mask of which tokens were valid."""
+    tables = get_vector_tables(np, codec)
+    count = len(tokens)
+    width = tokens.dtype.itemsize
+    if width == 0:
+        return np.zeros(count, dtype=np.int64), np.zeros(count, dtype=bool)
+    chars = np.ascontiguousarray(tokens).view(np.uint8).reshape(count, width)
+    columns = np.arange(width)[None, :]
+    nonzero = chars != 0
+    lengths = np.where(nonzero.any(axis=1), width - np.argmax(nonzero[:, ::-1], axis=1), 0)
+    inside = columns < lengths[:, None]
+
+    offsets = tables.char_offsets[chars[:, 0]]
+    valid = (lengths >= 2) & (offsets >= 0)
+    offsets = np.where(valid, offsets, 0)
+    valid &= ((tables.char_offsets[chars] >= 0) | ~inside).all(axis=1)
+
+    is_separator = (chars == tables.separators[offsets][:, None]) & (columns >= 1) & inside
+    separator_positions = np.where(is_separator.any(axis=1), np.argmax(is_separator, axis=1), lengths)
+    num_digits = separator_positions - 1
+    valid &= num_digits >= 1
+    rest = separator_positions + 1 < lengths
+    next_chars = chars[np.arange(count), np.minimum(separator_positions + 1, width - 1)]
+    valid &= ~rest | (next_chars == tables.next_separators[offsets])
+
+    digit_values = tables.digit_values[offsets[:, None], chars]
+    is_digit = (columns >= 1) & (columns < separator_positions[:, None])
+    valid &= ((digit_values >= 0) | ~is_digit).all(axis=1)
+    overflow = valid & (num_digits > tables.safe_digits)
+
+    numbers = np.zeros(count, dtype=np.int64)
+    for position in range(1, min(width, tables.safe_digits + 1)):
+        numbers = np.where(is_digit[:, position], numbers * codec.base + digit_values[:, position], numbers)
+    for i in np.nonzero(overflow)[0]:
+        number = codec.decode(tokens[i].decode('ascii'))
+        if number is None or number > sys.maxsize:
+            valid[i] = False
+        else:
+            numbers[i] = number
+    return np.where(valid, numbers, 0), valid
+
+
+def as_tokens(np, values, prefix):
+    """Converts sqid strings to fixed width ascii bytes without the prefix, and a mask of which ones had it."""
+    values = np.asarray(values)
+    if values.dtype.kind == 'O':
+        values = values.astype('U')
+    if values.dtype.kind == 'U':
+        has_prefix = np.char.startswith(values, prefix) if prefix else np.ones(len(values), dtype=bool)
+        try:
+            values = np.char.encode(values, 'ascii')
+        except UnicodeEncodeError:
+            ascii = np.array([v.isascii() for v in values], dtype=bool)
+            values = np.char.encode(np.where(ascii, values, ''), 'ascii')
+            has_prefix &= ascii
+    elif values.dtype.kind == 'S':
+        has_prefix = np.char.startswith(values, prefix.encode()) if prefix else np.ones(len(values), dtype=bool)
+    else:
+        raise TypeError("Can only decode arrays of strings, not {}".format(values.dtype))
+    if prefix:
+        values = np.where(has_prefix, values, b'')
+        width = values.dtype.itemsize
+        chars = np.ascontiguousarray(values).view(np.uint8).reshape(len(values), width)
+        values = np.ascontiguousarray(chars[:, len(prefix):]).view('S{}'.format(max(width - len(prefix), 1)))
+        values = values.ravel()
+    return values, has_prefix
+
+
+def encode_array(values, field_or_codec):
+    """
+    Encodes an array of integers into an array of sqid strings, including the field's prefix.
+
+    `field_or_codec` is a Sqid*Field or TableCodec. Accepts NumPy arrays (masked arrays keep their mask), anything
+    that converts to one, and pyarrow Arrays or ChunkedArrays (nulls are kept).
+    """
+    if _is_arrow(values):
+        return _encode_arrow(values, field_or_codec)
+    np = _import_numpy()
+    codec, prefix = resolve_codec(field_or_codec)
+    mask = None
+    if isinstance(values, np.ma.MaskedArray):
+        mask = np.ma.getmaskarray(values)
+        values = values.filled(0)
+    values = np.asarray(values)
+    if values.dtype.kind not in 'iu':
+        raise TypeError("Can only encode arrays of integers, not {}".format(values.dtype))
+    shape = values.shape
+    values = values.ravel()
+    if len(values) and (values.min() < 0 or int(values.max()) > sys.maxsize):
+        raise ValueError("Encoding supports numbers between 0 and {}".format(sys.maxsize))
+    result = encode_tokens(np, codec, values.astype(np.int64)).astype('U')
+    if prefix:
+        result = np.char.add(prefix, result)
+    result = result.reshape(shape)
+    if mask is not None:
+        return np.ma.array(result, mask=mask)
+    return result
+
+
+def decode_array(values, field_or_codec, errors='raise'):
+    """
+    Decodes an array of sqid strings into an int64 array.
+
+    Invalid sqids raise a ValueError, or are masked in the returned masked array when `errors` is 'mask'. Masked
+    arrays and pyarrow Arrays or ChunkedArrays with nulls are supported as with encode_array().
+    """
+    if errors not in ('raise', 'mask'):
+        raise ValueError("errors must be 'raise' or 'mask'")
+    if _is_arrow(values):
+        return _decode_arrow(values, field_or_codec, errors)
+    np = _import_numpy()
+    codec, prefix = resolve_codec(field_or_codec)
+    mask = None
+    if isinstance(values, np.ma.MaskedArray):
+        mask = np.ma.getmaskarray(values)
+        values = values.filled('')
+    values = np.asarray(values)
+    shape = values.shape
+    tokens, valid = as_tokens(np, values.ravel(), prefix)
+    numbers, decoded = decode_tokens(np, codec, tokens)
+    valid &= decoded
+    numbers = numbers.reshape(shape)
+    valid = valid.reshape(shape)
+    if mask is not None:
+        valid |= mask
+    if not valid.all():
+        if errors == 'raise':
+            invalid = values[~valid].ravel()[0]
+            raise ValueError("'{}' is not a valid Sqids string".format(invalid))
+        mask = ~valid if mask is None else mask | ~valid
+    if mask is not None:
+        return np.ma.array(numbers, mask=mask)
+    return numbers
+
+
+def _encode_arrow(values, field_or_codec):
+    import pyarrow
+
+    if isinstance(values, pyarrow.ChunkedArray):
+        return pyarrow.chunked_array([_encode_arrow(chunk, field_or_codec) for chunk in values.chunks],
+                                     type=pyarrow.string())
+    mask = values.is_null().to_numpy(zero_copy_only=False)
+    numbers = values.fill_null(0).to_numpy(zero_copy_only=False)
+    result = encode_array(numbers, field_or_codec)
+    return pyarrow.array(result, mask=mask if mask.any() else None, type=pyarrow.string())
+
+
+def _decode_arrow(values, field_or_codec, errors):
+    import pyarrow
+
+    if isinstance(values, pyarrow.ChunkedArray):
+        return pyarrow.chunked_array([_decode_arrow(chunk, field_or_codec, errors) for chunk in values.chunks],
+                                     type=pyarrow.int64())
+    np = _import_numpy()
+    mask = values.is_null().to_numpy(zero_copy_only=False)
+    strings = values.fill_null('').to_numpy(zero_copy_only=False)
+    result = decode_array(np.ma.array(strings, mask=mask), field_or_codec, errors=errors)
+    return pyarrow.array(result.filled(0), mask=np.ma.getmaskarray(result), type=pyarrow.int64())
+
+
+class SqidsSeriesAccessor(object):
+    """pandas Series accessor available as ``series.sqids`` after register_pandas_accessor()."""
+    def __init__(self, series):
+        self._series = series
+
+    def encode(self, field_or_codec):
+        import pandas
+
+        series = self._series
+        mask = series.isna().to_numpy()
+        numbers = series.to_numpy(dtype='int64', na_value=0)
+        result = encode_array(numbers, field_or_codec).astype(object)
+        result[mask] = None
+        return pandas.Series(result, index=series.index, name=series.name, dtype=object)
+
+    def decode(self, field_or_codec, errors='raise'):
+        import pandas
+
+        np = _import_numpy()
+        series = self._series
+        mask = series.isna().to_numpy()
+        strings = series.to_numpy(dtype=object, na_value='')
+        result = decode_array(np.ma.array(strings, mask=mask), field_or_codec, errors=errors)
+        values = pandas.arrays.IntegerArray(result.filled(0), np.ma.getmaskarray(result))
+        return pandas.Series(values, index=series.index, name=series.name)
+
+
+def register_pandas_accessor():
+    """Registers the ``sqids`` accessor on pandas Series, e.g. ``df.id.sqids.encode(Book._meta.pk)``."""
+    global _pandas_accessor_registered
+    if not _pandas_accessor_registered:
+        import pandas
+
+        pandas.api.extensions.register_series_accessor('sqids')(SqidsSeriesAccessor)
+        _pandas_accessor_registered = True
+
+
+if 'pandas' in sys.modules:
+    register_pandas_accessor()
@@ -1,8 +1,14 @@
 from django.contrib import admin
 
-from tests.models import Record
+from sqids_field.admin import SqidAdminMixin, SqidSearchAdminMixin
+from tests.models import Artist, Record
 
 
 @admin.register(Record)
-class RecordAdmin(admin.ModelAdmin):
+class RecordAdmin(SqidAdminMixin, admin.ModelAdmin):
     pass
+
+
+@admin.register(Artist)
+class ArtistAdmin(SqidSearchAdminMixin, admin.ModelAdmin):
+    search_fields = ('id', 'name')
@@ -1,32 +1,247 @@
 #!/usr/bin/env python
+"""
+Memory measurements with tracemalloc, each checked against a budget so that memory regressions fail the run.
+
+    tests/mem.py [--rows 1000000] [--page-size 10000] [--budget NAME=BYTES ...] [--budgets budgets.json] [-k PATTERN]
+
+Per-object measurements keep many objects alive and report the bytes each one holds on to. Peak measurements report
+the most memory allocated at once while iterating over a table or rendering a page. Budgets default to BUDGETS below
+and can be overridden one at a time with --budget, or from a JSON object of names to bytes with --budgets. Exits with
+status 1 if anything is over its budget.
+"""
+import argparse
+import fnmatch
+import gc
+import json
 import os
 import sys
+import tracemalloc
 
 import django
-from memory_profiler import profile
 
+NUM_OBJECTS = 10_000
+NUM_CODECS = 20
+# Numbers of Sqid*Fields on the models measured by model_instance_*
+FIELD_COUNTS = (1, 4, 16)
+
+BUDGETS = {
+    'sqid': 300,
+    'model_instance_1': 1_200,
+    'model_instance_4': 2_200,
+    'model_instance_16': 5_500,
+    'codec': 32_000,
+    'table_codec': 120_000,
+    'encode_cache_entry': 200,
+    # Doesn't depend on --rows
+    'iterate_rows_peak': 2_000_000,
+    # For the default --page-size
+    'serialize_page_peak': 8_000_000,
+}
+
+MEASUREMENTS = []
+_models = {}
+
+
+def measurement(name):
+    """Registers a measurement. The function takes the parsed arguments and returns the number of bytes measured."""
+    def decorator(function):
+        MEASUREMENTS.append((name, function))
+        return function
+    return decorator
+
+
+def allocated(function):
+    """Calls `function` and returns what it allocated and kept, and the most it allocated at once, in bytes."""
+    # Only traced while `function` runs, as tracing slows down setting up the data a lot
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = function()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return current, peak
+
+
+def get_model(name, num_fields):
+    """Returns a model with `num_fields` Sqid*Fields, creating it and its table the first time."""
+    if name not in _models:
+        from django.db import connection, models
+        from sqids_field import SqidAutoField, SqidField
+
+        attrs = {
+            '__module__': __name__,
+            'Meta': type('Meta', (), {'app_label': 'tests'}),
+            'id': SqidAutoField(primary_key=True, enable_descriptor=False),
+        }
+        for i in range(num_fields):
+            attrs['field_{}'.format(i)] = SqidField(enable_descriptor=False)
+        model = type(name, (models.Model,), attrs)
+        with connection.schema_editor() as editor:
+            editor.create_model(model)
+        _models[name] = model
+    return _models[name]
+
+
+def fill(model, rows, batch_size=10_000):
+    names = [field.name for field in model._meta.concrete_fields if not field.primary_key]
+    for start in range(1, rows + 1, batch_size):
+        model.objects.bulk_create(
+            model(**{name: id for name in names}) for id in range(start, min(start + batch_size, rows + 1)))
+
+
+@measurement("sqid")
+def sqid(args):
+    # Bytes per Sqid built the way fields build them, from an integer with a shared codec
+    from sqids_field import SqidField
+
+    field = SqidField()
+    get_sqid = field.get_sqid
+    kept, _ = allocated(lambda: [get_sqid(id) for id in range(NUM_OBJECTS)])
+    return kept / NUM_OBJECTS
+
+
+def _model_instance(num_fields):
+    model = get_model("MemoryFields{}".format(num_fields), num_fields)
+    fill(model, NUM_OBJECTS)
+    kept, _ = allocated(lambda: list(model.objects.all()))
+    return kept / NUM_OBJECTS
+
+
+for _num_fields in FIELD_COUNTS:
+    measurement("model_instance_{}".format(_num_fields))(
+        lambda args, num_fields=_num_fields: _model_instance(num_fields))
+
+
+@measurement("codec")
+def codec(args):
+    # Bytes per sqids codec in the shared registry, including its fingerprint
+    from sqids_field.codec import get_codec
+
+    kept, _ = allocated(lambda: [get_codec("mem codec {}".format(i), 7, "abcdefghijklmnopqrstuvwxyz")
+                                 for i in range(NUM_CODECS)])
+    return kept / NUM_CODECS
 
-@profile(precision=8)
-def no_cache():
-    from hashid_field.hashid import Hashid
-    instances = [Hashid(i, salt="asdf", min_length=7) for i in range(1, 10_000)]
-    return instances
 
+@measurement("table_codec")
+def table_codec(args):
+    from sqids_field.codec import get_table_codec
 
-@profile(precision=8)
-def with_cache():
-    from hashid_field.hashid import Hashid
-    from hashids import Hashids
-    hashids = Hashids(salt="asdf", min_length=7)
-    instances = [Hashid(i, hashids=hashids) for i in range(1, 10_000)]
-    return instances
+    kept, _ = allocated(lambda: [get_table_codec("mem table {}".format(i), 7, "abcdefghijklmnopqrstuvwxyz")
+                                 for i in range(NUM_CODECS)])
+    return kept / NUM_CODECS
+
+
+@measurement("encode_cache_entry")
+def encode_cache_entry(args):
+    # Bytes per pre-encoded id in a shared encode cache, as filled by sqids_field.warmup()
+    from sqids_field.codec import get_codec, get_encode_cache
+
+    config = ("mem cache", 7, "abcdefghijklmnopqrstuvwxyz")
+    cache = get_encode_cache(*config)
+    encode = get_codec(*config).encode
+    sqids = [encode([id]) for id in range(NUM_OBJECTS)]
+
+    # The strings are encoded before measuring and added on after, so the codec's own allocations aren't counted
+    kept, _ = allocated(lambda: cache.update(zip(range(NUM_OBJECTS), sqids)))
+    strings = sum(sys.getsizeof(sqid) for sqid in sqids)
+    return (kept + strings) / NUM_OBJECTS
+
+
+@measurement("iterate_rows_peak")
+def iterate_rows_peak(args):
+    # Iterating with .iterator() should take the same memory however many rows there are
+    model = get_model("MemoryRows", 2)
+    fill(model, args.rows)
+
+    def run():
+        for row in model.objects.iterator(chunk_size=2000):
+            str(row.id)
+            str(row.field_0)
+
+    _, peak = allocated(run)
+    return peak
+
+
+@measurement("serialize_page_peak")
+def serialize_page_peak(args):
+    from rest_framework import serializers
+    from sqids_field.rest import SqidSerializerCharField
+
+    model = get_model("MemoryPage", 4)
+    fill(model, args.page_size)
+    config = model._meta.get_field('field_0')
+    declared = {
+        name: SqidSerializerCharField(salt=config.salt, min_length=config.min_length, alphabet=config.alphabet)
+        for name in ('id', 'field_0', 'field_1', 'field_2', 'field_3')
+    }
+    declared['Meta'] = type('Meta', (), {'model': model, 'fields': '__all__'})
+    serializer_class = type('MemoryPageSerializer', (serializers.ModelSerializer,), declared)
+    page = list(model.objects.all()[:args.page_size])
+
+    _, peak = allocated(lambda: serializer_class(page, many=True).data)
+    return peak
+
+
+def parse_budget(value):
+    name, _, budget = value.partition("=")
+    try:
+        return name, float(budget)
+    except ValueError:
+        raise argparse.ArgumentTypeError("Expected NAME=BYTES, got {!r}".format(value))
+
+
+def format_bytes(value):
+    for unit in ("B", "KB", "MB"):
+        if abs(value) < 1000:
+            return "{:.1f} {}".format(value, unit)
+        value /= 1000
+    return "{:.1f} GB".format(value)
+
+
+def main(args):
+    budgets = dict(BUDGETS)
+    if args.budgets:
+        with open(args.budgets) as f:
+            budgets.update(json.load(f))
+    budgets.update(args.budget)
+
+    from django.conf import settings
+    settings.DATABASES = {'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}}
+    django.setup()
+
+    over = []
+    for name, function in MEASUREMENTS:
+        if args.k and not fnmatch.fnmatch(name, args.k):
+            continue
+        try:
+            measured = function(args)
+        except ImportError as e:
+            print("{:<24} skipped: {}".format(name, e))
+            continue
+        budget = budgets.get(name)
+        status = ""
+        if budget is not None:
+            status = "ok" if measured <= budget else "OVER BUDGET"
+            if measured > budget:
+                over.append(name)
+        print("{:<24} {:>12}  budget {:>12}  {}".format(
+            name, format_bytes(measured), format_bytes(budget) if budget is not None else "-", status))
+    return 1 if over else 0
 
 
 if __name__ == "__main__":
     print("Python:", sys.version)
     print("Django:", django.get_version(django.VERSION))
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     os.environ['DJANGO_SETTINGS_MODULE'] = 'tests.test_settings'
-    django.setup()
 
-    no_cache()
-    with_cache()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Rows to iterate over for iterate_rows_peak")
+    parser.add_argument('--page-size', type=int, default=10_000, help="Rows to render for serialize_page_peak")
+    parser.add_argument('--budget', type=parse_budget, action='append', default=[],
+                        help="Override a budget, e.g. --budget sqid=500")
+    parser.add_argument('--budgets', help="JSON file of budgets to override the defaults with")
+    parser.add_argument('-k', help="Only run measurements whose name matches this glob pattern")
+    sys.exit(main(parser.parse_args()))
@@ -2,6 +2,7 @@ from django.db import models
 from django.core import validators
 
 from hashid_field import HashidField, BigHashidField, HashidAutoField, BigHashidAutoField
+from sqids_field import SqidStringField, SqidStringQuerySet
 
 
 class Artist(models.Model):
@@ -12,6 +13,11 @@ class Artist(models.Model):
         return "{} ({})".format(self.name, self.id)
 
 
+class ArtistProxy(Artist):
+    class Meta:
+        proxy = True
+
+
 class Record(models.Model):
     id = BigHashidAutoField(primary_key=True)
     name = models.CharField(max_length=40)
@@ -38,3 +44,16 @@ class RecordLabel(models.Model):
         return model_class._meta.verbose_name.replace(' ', '_') + '/'
 
     id = HashidAutoField(primary_key=True, allow_int_lookup=True, prefix=name_prefix)
+
+
+class Song(models.Model):
+    id = HashidAutoField(primary_key=True, prefix="song_")
+    name = models.CharField(max_length=40)
+    record = models.ForeignKey(Record, on_delete=models.CASCADE, null=True, blank=True, related_name="songs")
+    id_str = SqidStringField(source='id')
+    record_str = SqidStringField(source='record', max_length=32)
+
+    objects = SqidStringQuerySet.as_manager()
+
+    def __str__(self):
+        return "{} ({})".format(self.name, self.id_str)
@@ -1,8 +1,11 @@
+from django.contrib import admin
 from django.contrib.admin import AdminSite
 from django.test import TestCase
 
-from tests.admin import RecordAdmin
-from tests.models import Record
+from sqids_field.admin import SqidSearchAdminMixin
+from sqids_field.forms import SqidModelChoiceField
+from tests.admin import ArtistAdmin, RecordAdmin
+from tests.models import Artist, Record
 
 
 class MockRequest:
@@ -26,3 +29,63 @@ class HashidAdminTests(TestCase):
         form = form_class()
         widget = form.fields['reference_id'].widget
         self.assertEqual(widget.input_type, 'text')
+
+    def test_admin_foreign_key_uses_sqid_choice_field(self):
+        admin = RecordAdmin(Record, site)
+        form_class = admin.get_form(request)
+        form = form_class()
+        self.assertIsInstance(form.fields['artist'], SqidModelChoiceField)
+
+
+class SqidSearchAdminTests(TestCase):
+    def setUp(self):
+        self.admin = ArtistAdmin(Artist, site)
+        self.john = Artist.objects.create(name="John Doe")
+        self.jane = Artist.objects.create(name="Jane Doe")
+
+    def test_search_by_sqid_skips_text_search(self):
+        queryset, may_have_duplicates = self.admin.get_search_results(request, Artist.objects.all(), str(self.john.id))
+        self.assertEqual(list(queryset), [self.john])
+        self.assertNotIn("LIKE", str(queryset.query))
+        self.assertFalse(may_have_duplicates)
+
+    def test_search_by_text_skips_sqid_search(self):
+        queryset, may_have_duplicates = self.admin.get_search_results(request, Artist.objects.all(), "jane")
+        self.assertEqual(list(queryset), [self.jane])
+
+    def test_search_by_quoted_phrase(self):
+        queryset, may_have_duplicates = self.admin.get_search_results(request, Artist.objects.all(), '"jane doe"')
+        self.assertEqual(list(queryset), [self.jane])
+
+    def test_search_by_sqid_and_text(self):
+        term = "{} john".format(self.john.id)
+        queryset, may_have_duplicates = self.admin.get_search_results(request, Artist.objects.all(), term)
+        self.assertEqual(list(queryset), [self.john])
+
+
+class RecordSearchAdmin(SqidSearchAdminMixin, admin.ModelAdmin):
+    search_fields = ('reference_id', 'name')
+
+
+class SqidSearchDefaultAlphabetTests(TestCase):
+    def setUp(self):
+        self.admin = RecordSearchAdmin(Record, site)
+        field = Record._meta.get_field('reference_id')
+        # A plain word that sqids decodes with the default alphabet of reference_id, but never encodes to
+        self.word = next(word for word in ("smith", "jones", "brown", "taylor")
+                         if len(field._sqids.decode(word)) == 1)
+        self.id = field._sqids.decode(self.word)[0]
+        self.assertNotEqual(str(field.get_sqid(self.id)), self.word)
+        self.named = Record.objects.create(name="Ms {}".format(self.word.title()), reference_id=1)
+        self.decoded = Record.objects.create(name="Other", reference_id=self.id)
+        Record.objects.create(name="Unrelated", reference_id=2)
+
+    def test_word_is_also_searched_as_text(self):
+        queryset, may_have_duplicates = self.admin.get_search_results(request, Record.objects.all(), self.word)
+        self.assertEqual(set(queryset), {self.named, self.decoded})
+
+    def test_sqid_skips_text_search(self):
+        sqid = str(Record._meta.get_field('reference_id').get_sqid(self.id))
+        queryset, may_have_duplicates = self.admin.get_search_results(request, Record.objects.all(), sqid)
+        self.assertEqual(list(queryset), [self.decoded])
+        self.assertNotIn("LIKE", str(queryset.query))
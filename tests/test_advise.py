@@ -0,0 +1,46 @@
+import io
+import json
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from sqids_field import SqidField
+from sqids_field.advise import advise
+
+
+class AdviseTests(TestCase):
+    def test_measurements(self):
+        field = SqidField(salt="advise", min_length=0, alphabet="1234567890abcdef")
+        report = advise(field, 10 ** 6, samples=5000, workers=1, chunk_size=2000)
+        self.assertEqual(sum(report['lengths'].values()), 5000)
+        self.assertEqual(report['max_length'], len(field._sqids.encode([10 ** 6])))
+        self.assertEqual(report['fixed_length'], report['max_length'])
+        self.assertGreater(report['numeric_rate'], 0)
+        self.assertGreater(report['encode_per_second'], 0)
+        # The same seed samples the same ids
+        self.assertEqual(advise(field, 10 ** 6, samples=5000, workers=1, chunk_size=2000)['lengths'],
+                         report['lengths'])
+
+    def test_no_blocklist_never_reencodes(self):
+        field = SqidField(salt="advise", blocklist="none")
+        self.assertEqual(advise(field, 10 ** 9, samples=2000, workers=1)['reencode_rate'], 0)
+
+
+class SqidsAdviseCommandTests(TestCase):
+    def test_json(self):
+        out = io.StringIO()
+        call_command('sqids_advise', 'tests.Artist.id', '--min-length', '3', '--samples', '1000', '--workers', '1',
+                     '--json', stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['samples'], 1000)
+
+    def test_report(self):
+        out = io.StringIO()
+        call_command('sqids_advise', '--blocklist', 'none', '--samples', '1000', '--workers', '1', stdout=out)
+        self.assertIn("blocklist=none", out.getvalue())
+        self.assertIn("All-digit sqids", out.getvalue())
+
+    def test_invalid_alphabet(self):
+        with self.assertRaises(CommandError):
+            call_command('sqids_advise', '--alphabet', 'abc', '--samples', '10', stdout=io.StringIO())
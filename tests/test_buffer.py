@@ -0,0 +1,129 @@
+import io
+import os
+import tempfile
+from array import array
+from unittest import mock, skipUnless
+
+from django.test import TestCase
+
+from sqids_field.__main__ import main
+from sqids_field.buffer import (
+    decode_buffer, encode_buffer, format_ints, iter_blocks, iter_line_chunks, parse_ints,
+)
+from tests.models import Record
+
+try:
+    import numpy as np
+
+    have_numpy = True
+except ImportError:
+    have_numpy = False
+
+
+class BufferTests(TestCase):
+    def setUp(self):
+        self.field = Record._meta.get_field('reference_id')
+        self.ids = array('q', [0, 1, 123, 2 ** 40] + list(range(1000, 3000, 7)))
+        self.data = "".join(sqid + "\n" for sqid in self.field.encode_many(self.ids)).encode()
+
+    def test_encode_buffer(self):
+        self.assertEqual(encode_buffer(self.ids, self.field), self.data)
+        self.assertEqual(encode_buffer(memoryview(self.ids), self.field), self.data)
+
+    def test_encode_buffer_narrower_integers(self):
+        ids = array('i', [1, 2, 3, 4])
+        data = "".join(sqid + "\n" for sqid in self.field.encode_many(ids)).encode()
+        self.assertEqual(encode_buffer(ids, self.field), data)
+        self.assertEqual(encode_buffer(memoryview(ids), self.field), data)
+
+    @skipUnless(have_numpy, "NumPy is not installed")
+    def test_encode_buffer_narrower_ndarray(self):
+        ids = np.array([1, 2, 3, 4], dtype=np.int32)
+        data = "".join(sqid + "\n" for sqid in self.field.encode_many(ids.tolist())).encode()
+        self.assertEqual(encode_buffer(ids, self.field), data)
+        self.assertEqual(encode_buffer(ids.astype(np.int64), self.field), data)
+
+    def test_decode_buffer(self):
+        self.assertEqual(decode_buffer(self.data, self.field), self.ids)
+        self.assertEqual(decode_buffer(memoryview(self.data.replace(b"\n", b"\r\n")), self.field), self.ids)
+
+    def test_decode_buffer_into_preallocated_array(self):
+        out = array('q', bytes(8 * (len(self.ids) + 5)))
+        self.assertEqual(decode_buffer(self.data, self.field, out), len(self.ids))
+        self.assertEqual(out[:len(self.ids)], self.ids)
+        with self.assertRaises(ValueError):
+            decode_buffer(self.data, self.field, array('q'))
+
+    def test_decode_buffer_invalid(self):
+        with self.assertRaisesRegex(ValueError, "invalid!"):
+            decode_buffer(self.data + b"invalid!\n", self.field)
+
+    def test_decode_buffer_long_lines(self):
+        # Whatever follows the separators of a padded sqid is ignored, so the line still decodes, as it does one at a
+        # time without NumPy
+        long_line = str(self.field.get_sqid(5)) + self.field.alphabet[0] * 10000
+        data = self.data + long_line.encode() + b"\n"
+        self.assertEqual(decode_buffer(data, self.field), self.ids + array('q', [5]))
+        with mock.patch('sqids_field.buffer._numpy', return_value=None):
+            self.assertEqual(decode_buffer(data, self.field), self.ids + array('q', [5]))
+        with self.assertRaises(ValueError):
+            decode_buffer(self.data + b"-" * 10000 + b"\n", self.field)
+
+    def test_parse_and_format_ints(self):
+        text = format_ints(self.ids)
+        self.assertEqual(text, "".join("{}\n".format(i) for i in self.ids).encode())
+        self.assertEqual(parse_ints(text + b"\n"), self.ids)
+        with self.assertRaises(ValueError):
+            parse_ints(b"1\n-2\n")
+
+    def test_parse_ints_whitespace(self):
+        # The same with and without NumPy: a trailing \r is ignored, other whitespace is invalid
+        def check():
+            self.assertEqual(parse_ints(b"1\r\n\n2\r\n"), array('q', [1, 2]))
+            for data in (b" 1\n", b"1 \n", b"1\t\n", b"1\n \n"):
+                with self.assertRaises(ValueError):
+                    parse_ints(data)
+
+        check()
+        with mock.patch('sqids_field.buffer._numpy', return_value=None):
+            check()
+
+    def test_iter_blocks(self):
+        blocks = list(iter_blocks(io.BytesIO(self.data), block_size=100))
+        self.assertEqual(b"".join(blocks), self.data)
+        self.assertTrue(all(block.endswith(b"\n") for block in blocks))
+
+    def test_iter_line_chunks(self):
+        def check():
+            chunks = list(iter_line_chunks(self.data, lines=100, window=64))
+            self.assertEqual(b"".join(chunks), self.data)
+            self.assertEqual([chunk.count(b"\n") for chunk in chunks], [100, 100, len(self.ids) - 200])
+
+        check()
+        with mock.patch('sqids_field.buffer._numpy', return_value=None):
+            check()
+        self.assertEqual(list(iter_line_chunks(b"a\nb", lines=1)), [b"a\n", b"b"])
+        self.assertEqual(list(iter_line_chunks(b"")), [])
+
+    def run_main(self, *argv, stdin=b""):
+        stdout = io.TextIOWrapper(io.BytesIO())
+        with mock.patch('sys.stdin', io.TextIOWrapper(io.BytesIO(stdin))), mock.patch('sys.stdout', stdout):
+            status = main(list(argv))
+        stdout.flush()
+        return status, stdout.buffer.getvalue()
+
+    def test_cli_encode(self):
+        status, output = self.run_main("encode", "--field", "tests.Record.reference_id", "--block-size", "64",
+                                       stdin=format_ints(self.ids))
+        self.assertEqual(status, 0)
+        self.assertEqual(output, self.data)
+
+    def test_cli_decode_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sqids.txt")
+            with open(path, 'wb') as f:
+                f.write(self.data)
+            with mock.patch('sqids_field.buffer.CHUNK_LINES', 100):
+                status, output = self.run_main("decode", "--field", "tests.Record.reference_id", "--input", path)
+        self.assertEqual(status, 0)
+        self.assertEqual(output, format_ints(self.ids))
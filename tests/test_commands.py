@@ -0,0 +1,103 @@
+import csv
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from tests.models import Artist, Record, Song
+
+
+class SqidsExportTests(TestCase):
+    def setUp(self):
+        self.artist = Artist.objects.create(name="John Doe")
+        for i in range(1, 11):
+            Record.objects.create(name="Record {}".format(i), reference_id=i, artist=self.artist if i % 2 else None)
+        self.records = list(Record.objects.order_by('pk'))
+
+    def export(self, *args):
+        out = io.StringIO()
+        call_command('sqids_export', 'tests.Record', *args, chunk_size=3, stdout=out, stderr=io.StringIO())
+        return out.getvalue()
+
+    def test_csv(self):
+        rows = list(csv.DictReader(io.StringIO(self.export('--fields', 'id,name,artist,reference_id'))))
+        self.assertEqual(len(rows), len(self.records))
+        for row, record in zip(rows, self.records):
+            self.assertEqual(row['id'], str(record.id))
+            self.assertEqual(row['name'], record.name)
+            self.assertEqual(row['reference_id'], str(record.reference_id))
+            self.assertEqual(row['artist'], str(self.artist.id) if record.artist_id else "")
+
+    def test_ndjson(self):
+        lines = self.export('--format', 'ndjson').splitlines()
+        self.assertEqual(len(lines), len(self.records))
+        for line, record in zip(lines, self.records):
+            row = json.loads(line)
+            self.assertEqual(row['id'], str(record.id))
+            self.assertEqual(row['reference_id'], str(record.reference_id))
+            self.assertEqual(row['artist'], str(self.artist.id) if record.artist_id else None)
+
+    def test_output_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "records.csv")
+            call_command('sqids_export', 'tests.Artist', output=path, stderr=io.StringIO())
+            with open(path, newline='') as f:
+                rows = list(csv.reader(f))
+        self.assertEqual(rows, [["id", "name"], [str(self.artist.id), "John Doe"]])
+
+    def test_empty_csv_has_header(self):
+        out = io.StringIO()
+        call_command('sqids_export', 'tests.Track', fields='id', stdout=out, stderr=io.StringIO())
+        self.assertEqual(out.getvalue(), "id\r\n")
+
+
+class SqidsBackfillTests(TestCase):
+    def setUp(self):
+        self.record = Record.objects.create(name="Record", reference_id=1)
+        Song.objects.bulk_create([Song(name="Song {}".format(i), record=self.record if i % 2 else None)
+                                  for i in range(10)])
+        # Rows written without going through SqidStringQuerySet
+        Song._base_manager.update(id_str=None, record_str=None)
+
+    def backfill(self, *args, **kwargs):
+        out = io.StringIO()
+        call_command('sqids_backfill', *args, chunk_size=3, stdout=out, **kwargs)
+        return out.getvalue()
+
+    def assertFilled(self):
+        for song in Song.objects.all():
+            self.assertEqual(song.id_str, str(song.id))
+            self.assertEqual(song.record_str, str(self.record.id) if song.record_id else None)
+
+    def test_backfill(self):
+        self.assertIn("Filled 10 rows", self.backfill('tests.Song'))
+        self.assertFilled()
+        self.assertIn("Filled 0 rows", self.backfill('tests.Song'))
+        self.assertIn("Filled 10 rows", self.backfill('tests.Song', '--rebuild'))
+        self.assertFilled()
+
+    def test_field(self):
+        self.backfill('tests.Song.id_str')
+        self.assertEqual(Song.objects.filter(id_str__isnull=True).count(), 0)
+        self.assertEqual(Song.objects.filter(record_str__isnull=False).count(), 0)
+
+    def test_checkpoint(self):
+        songs = list(Song.objects.order_by('pk'))
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint = os.path.join(directory, "checkpoint.json")
+            with open(checkpoint, 'w') as f:
+                json.dump({'target': 'tests.Song', 'rebuild': False, 'last_pk': songs[5].id.id, 'rows': 6}, f)
+            out = self.backfill('tests.Song', checkpoint=checkpoint)
+            self.assertIn("Resuming after 6 rows", out)
+            self.assertIn("Filled 4 rows", out)
+            self.assertFalse(os.path.exists(checkpoint))
+        self.assertEqual(Song.objects.filter(id_str__isnull=True).count(), 6)
+
+    def test_errors(self):
+        with self.assertRaises(CommandError):
+            self.backfill('tests.Record')
+        with self.assertRaises(CommandError):
+            self.backfill('tests.Song.name')
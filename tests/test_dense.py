@@ -0,0 +1,110 @@
+import io
+import os
+import tempfile
+import warnings
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from sqids_field import SqidField
+from sqids_field.codec import get_codec
+from sqids_field.dense import DenseCodec, DenseTable, dense_table_path, get_dense_table, write_dense_table
+from tests.models import Record
+
+ALPHABET = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ1234567890"
+
+
+class DenseTableTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, size, salt="dense", min_length=5):
+        path = dense_table_path(self.directory.name, salt, min_length, ALPHABET)
+        write_dense_table(path, size, salt, min_length, ALPHABET)
+        table = DenseTable(path)
+        self.addCleanup(table.close)
+        return table
+
+    def test_encode_and_decode(self):
+        table = self.write(1000)
+        codec = get_codec("dense", 5, ALPHABET)
+        self.assertEqual(len(table), 1000)
+        for id in range(1000):
+            sqid = codec.encode([id])
+            self.assertEqual(table.encode(id), sqid)
+            self.assertEqual(table.decode(sqid), id)
+
+    def test_outside_of_table(self):
+        table = self.write(10)
+        codec = get_codec("dense", 5, ALPHABET)
+        self.assertIsNone(table.encode(10))
+        self.assertIsNone(table.decode(codec.encode([10])))
+        self.assertIsNone(table.decode("!"))
+        self.assertIsNone(table.decode("ü" * 3))
+        self.assertIsNone(table.decode("x" * 100))
+
+    def test_dense_codec_falls_back(self):
+        table = self.write(10)
+        codec = get_codec("dense", 5, ALPHABET)
+        dense = DenseCodec(codec, table)
+        self.assertEqual(dense.encode([5]), codec.encode([5]))
+        self.assertEqual(dense.encode([500]), codec.encode([500]))
+        self.assertEqual(dense.decode(codec.encode([5])), [5])
+        self.assertEqual(dense.decode(codec.encode([500])), [500])
+        self.assertEqual(list(dense.decode("!!!")), [])
+
+    def test_not_a_table(self):
+        path = os.path.join(self.directory.name, "bad" + ".sqidtable")
+        with open(path, "wb") as f:
+            f.write(b"not a table" * 10)
+        with self.assertRaises(ValueError):
+            DenseTable(path)
+
+    def test_mismatched_table_is_ignored(self):
+        # A table written for one configuration, copied to the file name of another
+        source = dense_table_path(self.directory.name, "one", 5, ALPHABET)
+        write_dense_table(source, 100, "one", 5, ALPHABET)
+        os.replace(source, dense_table_path(self.directory.name, "two", 5, ALPHABET))
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            self.assertIsNone(get_dense_table(self.directory.name, "two", 5, ALPHABET))
+        self.assertEqual(len(caught), 1)
+
+    def test_field_uses_table(self):
+        with override_settings(SQID_FIELD_DENSE_TABLE_DIR=self.directory.name):
+            field = SqidField(salt="dense field", min_length=5, dense_table_size=100)
+            path = dense_table_path(self.directory.name, field.salt, field.min_length, field.alphabet)
+            write_dense_table(path, 100, field.salt, field.min_length, field.alphabet)
+            self.assertIsInstance(field._sqids, DenseCodec)
+            codec = get_codec(field.salt, field.min_length, field.alphabet)
+            for id in (0, 99, 100, 12345):
+                sqid = field.get_sqid(id)
+                self.assertEqual(sqid.sqid, codec.encode([id]))
+                self.assertEqual(field.get_sqid(sqid.sqid).id, id)
+            self.assertNotIsInstance(SqidField(salt="dense field", min_length=5)._sqids, DenseCodec)
+
+
+class SqidsDenseTableCommandTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_writes_table(self):
+        out = io.StringIO()
+        call_command('sqids_dense_table', 'tests.Record.reference_id', size=50, output_dir=self.directory.name,
+                     stdout=out)
+        field = Record._meta.get_field('reference_id')
+        path = dense_table_path(self.directory.name, field.salt, field.min_length, field.alphabet)
+        self.assertIn(path, out.getvalue())
+        table = DenseTable(path)
+        self.addCleanup(table.close)
+        self.assertEqual(len(table), 50)
+        self.assertEqual(table.encode(49), field._sqids.encode([49]))
+
+    def test_requires_size(self):
+        with self.assertRaises(CommandError):
+            call_command('sqids_dense_table', 'tests.Record.reference_id', output_dir=self.directory.name)
+        with self.assertRaises(CommandError):
+            call_command('sqids_dense_table', 'tests.Record.name', size=10, output_dir=self.directory.name)
@@ -0,0 +1,54 @@
+import csv
+import io
+import json
+from unittest import skipUnless
+
+import django
+from django.test import TestCase
+
+from sqids_field.export import RowWriter, async_export_response, export_fields, export_queryset
+from tests.models import Artist, Record
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.artist = Artist.objects.create(name="John Doe")
+        for i in range(1, 8):
+            Record.objects.create(name="Record {}".format(i), reference_id=i, artist=self.artist if i % 2 else None)
+        self.records = list(Record.objects.order_by('pk'))
+        self.fields = export_fields(Record, ['id', 'artist', 'reference_id'])
+
+    def expected_rows(self):
+        return [[str(r.id), str(self.artist.id) if r.artist_id else "", str(r.reference_id)] for r in self.records]
+
+    def test_row_writer(self):
+        writer = RowWriter(self.fields)
+        text = writer.header() + writer.write(list(export_queryset(Record.objects.all(), self.fields)))
+        rows = list(csv.reader(io.StringIO(text)))
+        self.assertEqual(rows[0], ['id', 'artist', 'reference_id'])
+        self.assertEqual(rows[1:], self.expected_rows())
+
+    def test_invalid_format(self):
+        with self.assertRaises(ValueError):
+            RowWriter(self.fields, 'xml')
+        with self.assertRaises(ValueError):
+            async_export_response(Record.objects.all(), format='xml')
+
+    @skipUnless(django.VERSION >= (4, 2), "Async iterators in StreamingHttpResponse require Django 4.2")
+    async def test_async_export_response(self):
+        response = async_export_response(Record.objects.all(), ['id', 'artist', 'reference_id'], chunk_size=3,
+                                         offload_rows=2, filename="records.csv")
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('records.csv', response['Content-Disposition'])
+        parts = [part async for part in response.streaming_content]
+        self.assertEqual(len(parts), 4)
+        rows = list(csv.reader(io.StringIO(b"".join(parts).decode())))
+        self.assertEqual(rows[1:], self.expected_rows())
+
+    @skipUnless(django.VERSION >= (4, 2), "Async iterators in StreamingHttpResponse require Django 4.2")
+    async def test_async_export_ndjson(self):
+        response = async_export_response(Record.objects.filter(artist__isnull=False), ['id', 'artist'],
+                                         format='ndjson')
+        lines = b"".join([part async for part in response.streaming_content]).decode().splitlines()
+        self.assertEqual([json.loads(line) for line in lines],
+                         [{'id': row[0], 'artist': row[1]} for row in self.expected_rows() if row[1]])
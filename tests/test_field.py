@@ -0,0 +1,88 @@
+import tempfile
+from io import StringIO
+
+from django.core import exceptions
+from django.core.management import call_command
+from django.db import models
+from django.test import TestCase, override_settings
+from django.test.utils import isolate_apps
+
+from sqids_field import Sqid, SqidField
+from sqids_field import codec
+from tests.models import Artist
+
+
+class SqidFieldCodecTests(TestCase):
+    def test_codec_built_on_first_use(self):
+        field = SqidField(salt="built on first use")
+        key = (field.salt, field.min_length, field.alphabet, None)
+        self.assertNotIn(key, codec._codecs)
+        self.assertEqual(field.get_sqid(123).id, 123)
+        self.assertIs(field._sqids, codec._codecs[key])
+
+    @isolate_apps('tests')
+    def test_config_registered_with_model(self):
+        class Model(models.Model):
+            reference_id = SqidField(salt="registered with model", min_length=9)
+
+        field = Model._meta.get_field('reference_id')
+        key = (field.salt, field.min_length, field.alphabet, None)
+        self.assertNotIn(key, codec._codecs)
+        self.assertIn(key, codec._fingerprints)
+        self.assertEqual(codec.get_config(codec._fingerprints[key]), key)
+
+    def test_blocklist(self):
+        field = SqidField(salt="blocklist", blocklist=["Word", "word", "other"])
+        self.assertEqual(field.blocklist, ("other", "word"))
+        self.assertEqual(field.deconstruct()[3]['blocklist'], ["other", "word"])
+        self.assertNotIn('blocklist', SqidField().deconstruct()[3])
+        self.assertEqual(SqidField(blocklist="none").deconstruct()[3]['blocklist'], "none")
+        with self.assertRaises(exceptions.ImproperlyConfigured):
+            SqidField(blocklist="word")
+
+
+class SqidFieldSerializationTests(TestCase):
+    def setUp(self):
+        self.artist = Artist.objects.create(name="John Doe")
+        self.field = Artist._meta.get_field('id')
+
+    def test_value_to_string(self):
+        self.assertEqual(self.field.value_to_string(self.artist), str(self.artist.id))
+        with override_settings(SQID_FIELD_SERIALIZE_INT=True):
+            self.assertEqual(self.field.value_to_string(self.artist), str(int(self.artist.id)))
+
+    @override_settings(SQID_FIELD_SERIALIZE_INT=True)
+    def test_dumpdata_serialize_int(self):
+        out = StringIO()
+        call_command("dumpdata", "tests.Artist", stdout=out)
+        self.assertJSONEqual(out.getvalue(), '[{"pk": "%d", "fields": {"name": "John Doe"}, "model": "tests.artist"}]'
+                             % int(self.artist.id))
+        Artist.objects.all().delete()
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as fixture:
+            fixture.write(out.getvalue())
+            fixture.flush()
+            call_command("loaddata", fixture.name, stdout=StringIO())
+        self.assertEqual(Artist.objects.get(pk=self.artist.id).name, "John Doe")
+
+    @override_settings(SQID_FIELD_SERIALIZE_INT=True)
+    def test_dumpdata_serialize_int_xml(self):
+        out = StringIO()
+        call_command("dumpdata", "tests.Artist", format="xml", stdout=out)
+        self.assertIn('pk="{}"'.format(int(self.artist.id)), out.getvalue())
+
+
+class SqidDescriptorTests(TestCase):
+    @isolate_apps('tests')
+    def test_descriptor_options(self):
+        class Model(models.Model):
+            obj_id = SqidField(salt="descriptor", min_length=7, enable_descriptor=True)
+            str_id = SqidField(salt="descriptor", min_length=7, enable_sqid_object=False, enable_descriptor=True)
+
+        sqid = Model._meta.get_field('obj_id').get_sqid(123)
+        instance = Model(obj_id=sqid.sqid, str_id=sqid.sqid)
+        self.assertIsInstance(instance.obj_id, Sqid)
+        self.assertEqual(instance.obj_id, sqid)
+        self.assertEqual(instance.str_id, sqid.sqid)
+        self.assertIsInstance(instance.str_id_sqid, Sqid)
+        instance.str_id = 123
+        self.assertEqual(instance.str_id, sqid.sqid)
@@ -0,0 +1,83 @@
+from unittest import mock
+
+from django.core import exceptions
+from django.test import TestCase
+
+from sqids_field import Sqid
+from sqids_field.forms import SqidFormField, SqidModelChoiceField, SqidModelMultipleChoiceField
+from tests.forms import RecordForm
+from tests.models import Artist, Record
+
+
+class SqidFormFieldTests(TestCase):
+    def setUp(self):
+        self.record = Record.objects.create(name="Test Record", reference_id=123, plain_id=567)
+        self.ref_field = Record._meta.get_field('reference_id')
+
+    def test_record_form_decodes_once(self):
+        form = RecordForm({'name': "A new name", 'reference_id': str(self.ref_field.encode_id(987))})
+        self.assertIsInstance(form.fields['reference_id'], SqidFormField)
+        self.assertTrue(form.is_valid())
+        self.assertIsInstance(form.cleaned_data['reference_id'], Sqid)
+        self.assertEqual(form.cleaned_data['reference_id'].id, 987)
+        with mock.patch.object(Sqid, 'decode') as decode:
+            instance = form.save(commit=False)
+            instance.full_clean()
+        decode.assert_not_called()
+        self.assertEqual(instance.reference_id.id, 987)
+
+    def test_clean_validators_reuse_decoded_value(self):
+        plain_id = Record._meta.get_field('plain_id')
+        value = str(plain_id.encode_id(42))
+        with mock.patch.object(Sqid, 'decode', autospec=True, side_effect=Sqid.decode) as decode:
+            self.assertEqual(plain_id.clean(value, self.record), value)
+        self.assertEqual(decode.call_count, 1)
+
+
+class SqidChoiceFieldTests(TestCase):
+    def setUp(self):
+        self.a = Artist.objects.create(name="John Doe")
+        self.b = Artist.objects.create(name="Jane Doe")
+
+    def test_multiple_choice_clean(self):
+        field = SqidModelMultipleChoiceField(queryset=Artist.objects.all())
+        with self.assertNumQueries(1):
+            qs = field.clean([str(self.a.id), str(self.b.id)])
+            self.assertEqual(sorted(artist.name for artist in qs), ["Jane Doe", "John Doe"])
+
+    def test_multiple_choice_invalid_sqid(self):
+        field = SqidModelMultipleChoiceField(queryset=Artist.objects.all())
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            field.clean([str(self.a.id), "invalid"])
+        self.assertEqual(cm.exception.code, 'invalid_choice')
+
+    def test_multiple_choice_int_lookup_not_allowed(self):
+        field = SqidModelMultipleChoiceField(queryset=Artist.objects.all())
+        with self.assertRaises(exceptions.ValidationError):
+            field.clean([self.a.id.id])
+
+    def test_multiple_choice_missing_object(self):
+        field = SqidModelMultipleChoiceField(queryset=Artist.objects.exclude(pk=self.b.pk))
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            field.clean([str(self.a.id), str(self.b.id)])
+        self.assertEqual(cm.exception.code, 'invalid_choice')
+
+    def test_choices_are_encoded(self):
+        field = SqidModelChoiceField(queryset=Artist.objects.order_by('pk'))
+        choices = [(str(value), label) for value, label in field.choices]
+        self.assertEqual(choices, [("", field.empty_label), (str(self.a.id), str(self.a)),
+                                   (str(self.b.id), str(self.b))])
+
+    def test_choices_with_label_field(self):
+        field = SqidModelChoiceField(queryset=Artist.objects.order_by('pk'), label_field='name')
+        sqid_field = Artist._meta.get_field('id')
+        with mock.patch.object(sqid_field, 'from_db_value') as from_db_value, self.assertNumQueries(1):
+            choices = [(str(value), label) for value, label in field.choices]
+        from_db_value.assert_not_called()
+        self.assertEqual(choices, [("", field.empty_label), (str(self.a.id), "John Doe"), (str(self.b.id), "Jane Doe")])
+        self.assertIsNone(list(field.choices)[1][0].instance)
+
+    def test_rendered_selection(self):
+        field = SqidModelMultipleChoiceField(queryset=Artist.objects.order_by('pk'))
+        html = field.widget.render('artists', [self.a.id])
+        self.assertInHTML('<option value="{}" selected>{}</option>'.format(self.a.id, self.a), html)
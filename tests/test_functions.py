@@ -0,0 +1,65 @@
+from unittest import skipUnless
+
+from django.db import NotSupportedError, connection
+from django.db.models import F
+from django.test import TestCase
+
+from sqids_field.functions import SqidDecode, SqidEncode, config_id, sqid_decode, sqid_encode
+from tests.models import Artist, Record
+
+
+@skipUnless(connection.vendor == 'sqlite', "The sqid database functions are only registered on SQLite")
+class FunctionsTests(TestCase):
+    def setUp(self):
+        self.field = Artist._meta.get_field('id')
+        self.artists = [Artist.objects.create(name="Artist {}".format(i)) for i in range(3)]
+
+    def test_python_functions(self):
+        config = config_id(self.field)
+        sqid = str(self.field.get_sqid(5))
+        self.assertEqual(sqid_encode(config, 5), sqid)
+        self.assertEqual(sqid_encode(config, 5, "p_"), "p_" + sqid)
+        self.assertEqual(sqid_decode(config, sqid), 5)
+        self.assertEqual(sqid_decode(config, "p_" + sqid, "p_"), 5)
+        self.assertIsNone(sqid_decode(config, sqid, "p_"))
+        self.assertIsNone(sqid_decode(config, "zzz"))
+        self.assertIsNone(sqid_encode(config, None))
+        self.assertIsNone(sqid_encode(config, -1))
+        self.assertIsNone(sqid_encode(config, 1.5))
+        self.assertIsNone(sqid_encode(config, "5"))
+        self.assertIsNone(sqid_decode(None, sqid))
+
+    def test_raw_sql(self):
+        field = Record._meta.get_field('reference_id')
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT sqid_encode(%s, %s), sqid_decode(%s, %s)",
+                           [config_id(field), 1234, config_id(field), str(field.get_sqid(4321))])
+            self.assertEqual(cursor.fetchone(), (str(field.get_sqid(1234)), 4321))
+
+    def test_encode(self):
+        values = Artist.objects.annotate(sqid=SqidEncode('id')).values_list('id', 'sqid')
+        for id, sqid in values:
+            self.assertEqual(str(id), sqid)
+        self.assertEqual(Artist.objects.filter(name=SqidEncode('id')).count(), 0)
+
+    def test_encode_foreign_key(self):
+        record = Record.objects.create(name="Record", artist=self.artists[1], reference_id=5)
+        self.assertEqual(Record.objects.values_list(SqidEncode('artist'), flat=True).get(), str(record.artist_id))
+        self.assertEqual(Record.objects.values_list(SqidEncode('artist__id'), flat=True).get(), str(record.artist_id))
+
+    def test_decode(self):
+        artist = self.artists[2]
+        Artist.objects.filter(pk=artist.pk).update(name=SqidEncode('id'))
+        self.assertEqual(Artist.objects.get(id=SqidDecode('name', field=self.field)), artist)
+        self.assertEqual(Artist.objects.get(id=SqidDecode('name', field="tests.Artist.id")), artist)
+        decoded = Artist.objects.order_by('id').values_list(SqidDecode('name', field=self.field), flat=True)
+        self.assertEqual(list(decoded), [None, None, artist.id.id])
+
+    def test_decode_needs_field(self):
+        with self.assertRaises(ValueError):
+            list(Artist.objects.annotate(id_from_name=SqidDecode('name')))
+
+    def test_other_databases(self):
+        compiler = Artist.objects.annotate(sqid=SqidEncode(F('id'))).query.get_compiler(connection=connection)
+        with self.assertRaises(NotSupportedError):
+            SqidEncode('id').resolve_expression(compiler.query).as_sql(compiler, connection)
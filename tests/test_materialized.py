@@ -0,0 +1,108 @@
+import gc
+import weakref
+from unittest import mock
+
+from django.apps.registry import Apps
+from django.core import checks
+from django.db import models
+from django.db.models import F
+from django.test import TestCase
+from django.test.utils import isolate_apps
+
+from sqids_field import SqidStringField
+from tests.models import Record, Song
+
+
+class SqidStringFieldTests(TestCase):
+    def setUp(self):
+        self.records = [Record.objects.create(name="Record {}".format(i), reference_id=i) for i in range(3)]
+
+    def assertInSync(self):
+        for song in Song.objects.all():
+            self.assertEqual(song.id_str, str(song.id))
+            self.assertEqual(song.record_str, str(song.record_id) if song.record_id is not None else None)
+
+    def test_save(self):
+        song = Song.objects.create(name="Song", record=self.records[0])
+        self.assertEqual(song.id_str, str(song.id))
+        self.assertEqual(song.record_str, str(self.records[0].id))
+        song.record = self.records[1]
+        song.save()
+        song.record = None
+        song.save(update_fields=['record', 'record_str'])
+        self.assertEqual(Song.objects.get(id_str=str(song.id)), song)
+        self.assertIsNone(Song.objects.get().record_str)
+
+    def test_save_queries(self):
+        with self.assertNumQueries(2):
+            song = Song.objects.create(name="Song")
+        with self.assertNumQueries(1):
+            song.save()
+        self.assertInSync()
+
+    def test_save_without_source_keeps_value(self):
+        song = Song.objects.create(name="Song", record=self.records[0])
+        song = Song.objects.get(pk=song.pk)
+        song.name = "Renamed"
+        with mock.patch.object(SqidStringField, 'source_id') as source_id:
+            song.save(update_fields=['name', 'id_str', 'record_str'])
+        source_id.assert_not_called()
+        self.assertInSync()
+        song.record = self.records[1]
+        song.save(update_fields=['record', 'record_str'])
+        self.assertInSync()
+
+    def test_bulk_create(self):
+        songs = Song.objects.bulk_create([Song(name="Song {}".format(i), record=self.records[i % 3]) for i in range(10)]
+                                         + [Song(name="No record")])
+        self.assertEqual(Song.objects.filter(id_str__isnull=True).count(), 0)
+        self.assertEqual([song.id_str for song in songs], [str(song.id) for song in songs])
+        self.assertInSync()
+
+    def test_bulk_update(self):
+        songs = Song.objects.bulk_create([Song(name="Song {}".format(i)) for i in range(5)])
+        for song in songs:
+            song.record = self.records[2]
+        Song.objects.bulk_update(songs, ['record'])
+        self.assertEqual(Song.objects.filter(record_str=str(self.records[2].id)).count(), 5)
+        self.assertInSync()
+
+    def test_update(self):
+        Song.objects.bulk_create([Song(name="Song {}".format(i)) for i in range(3)])
+        Song.objects.update(record=self.records[1])
+        self.assertEqual(Song.objects.filter(record_str=str(self.records[1].id)).count(), 3)
+        Song.objects.update(record_id=self.records[0].id)
+        self.assertInSync()
+        Song.objects.update(record=None)
+        self.assertInSync()
+        Song.objects.filter(name="Song 1").update(record_id=F('record_id'))
+        self.assertInSync()
+
+    def test_like(self):
+        song = Song.objects.create(name="Song")
+        self.assertEqual(Song.objects.get(id_str__startswith="song_"), song)
+
+    @isolate_apps('tests')
+    def test_check_source(self):
+        class Model(models.Model):
+            name = models.CharField(max_length=40)
+            name_str = SqidStringField(source='name')
+
+        errors = Model._meta.get_field('name_str').check()
+        self.assertEqual([error.id for error in errors], ['SqidStringField.E001'])
+        self.assertIsInstance(errors[0], checks.Error)
+
+    def test_receivers_dont_keep_model_alive(self):
+        # e.g. the historical models that migrations render
+        class Model(models.Model):
+            record = models.ForeignKey(Record, on_delete=models.CASCADE)
+            record_str = SqidStringField(source='record')
+
+            class Meta:
+                app_label = 'tests'
+                apps = Apps()
+
+        model = weakref.ref(Model)
+        del Model
+        gc.collect()
+        self.assertIsNone(model())
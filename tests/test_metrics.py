@@ -0,0 +1,102 @@
+from django.test import TestCase
+
+from sqids_field import SqidField, metrics
+from sqids_field.codec import get_encode_cache
+from sqids_field.lookups import get_id_for_sqid_field
+from sqids_field.metrics import MetricsRegistry
+from tests.models import Artist
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        self.registry = metrics.enable(registry=MetricsRegistry())
+        self.addCleanup(metrics.disable)
+        self.field = Artist._meta.get_field('id')
+
+    def counter(self, name, field, reason=""):
+        return self.registry.counters.get((name, field, reason), 0)
+
+    def test_disabled(self):
+        metrics.disable()
+        self.assertIsNone(metrics.registry)
+        self.assertIsNone(metrics.snapshot())
+        str(self.field.get_sqid(5))
+        self.assertEqual(self.registry.counters, {})
+
+    def test_sqids(self):
+        sqid = self.field.get_sqid(5)
+        str(sqid)
+        self.field.get_sqid(str(sqid))
+        self.assertEqual(self.counter('sqid_created', "tests.Artist.id"), 2)
+        self.assertEqual(self.counter('encode', "tests.Artist.id"), 1)
+        self.assertEqual(self.counter('decode', "tests.Artist.id"), 1)
+
+        sqids = self.field.encode_many(range(10))
+        self.field.decode_many(sqids)
+        self.assertEqual(self.counter('encode', "tests.Artist.id"), 11)
+        self.assertEqual(self.counter('decode', "tests.Artist.id"), 11)
+
+    def test_rejected_lookups(self):
+        field = SqidField(prefix="p_")
+        for value in ("abc", "p_!!!", 5, 10):
+            with self.assertRaises(ValueError):
+                get_id_for_sqid_field(field, value)
+        label = str(field)
+        self.assertEqual(self.counter('lookup_rejected', label, 'bad_prefix'), 1)
+        self.assertEqual(self.counter('lookup_rejected', label, 'invalid_sqid'), 1)
+        self.assertEqual(self.counter('lookup_rejected', label, 'int_lookup_not_allowed'), 2)
+
+    def test_empty_result_set(self):
+        self.assertFalse(Artist.objects.filter(id="zzz").exists())
+        self.assertFalse(Artist.objects.filter(id__in=["zzz", "yyy"]).exists())
+        self.assertEqual(self.counter('empty_result_set', "tests.Artist.id", 'exact'), 1)
+        self.assertEqual(self.counter('empty_result_set', "tests.Artist.id", 'in'), 1)
+
+    def test_encode_cache(self):
+        cache = get_encode_cache(self.field.salt, self.field.min_length, self.field.alphabet)
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.field.get_sqid(5)
+        self.assertEqual(self.counter('encode_cache_miss', "tests.Artist.id"), 0)
+        cache[5] = self.field._sqids.encode([5])
+        self.field.get_sqid(5)
+        self.field.get_sqid(6)
+        self.assertEqual(self.counter('encode_cache_hit', "tests.Artist.id"), 1)
+        self.assertEqual(self.counter('encode_cache_miss', "tests.Artist.id"), 1)
+        self.assertGreaterEqual(metrics.snapshot()['caches']['encode_cache_entries'], 1)
+
+    def test_timings(self):
+        str(self.field.get_sqid(5))
+        self.assertEqual(self.registry.histograms, {})
+        metrics.enable(timings=True)
+        str(self.field.get_sqid(6))
+        histograms = metrics.snapshot()['histograms']
+        self.assertEqual([(h['name'], h['field'], h['count']) for h in histograms], [('encode', "tests.Artist.id", 1)])
+
+    def test_prometheus_text(self):
+        metrics.enable(timings=True)
+        str(self.field.get_sqid(5))
+        with self.assertRaises(ValueError):
+            get_id_for_sqid_field(self.field, "!")
+        text = metrics.prometheus_text()
+        self.assertIn('# TYPE sqids_encode_total counter\n', text)
+        self.assertIn('sqids_encode_total{field="tests.Artist.id"} 1\n', text)
+        self.assertIn('sqids_lookup_rejected_total{field="tests.Artist.id",reason="invalid_sqid"} 1\n', text)
+        self.assertIn('# TYPE sqids_encode_seconds histogram\n', text)
+        self.assertIn('sqids_encode_seconds_bucket{field="tests.Artist.id",le="+Inf"} 1\n', text)
+        self.assertIn('sqids_encode_seconds_count{field="tests.Artist.id"} 1\n', text)
+        self.assertIn('# TYPE sqids_codecs gauge\n', text)
+
+    def test_custom_registry(self):
+        class ValueRegistry(MetricsRegistry):
+            def __init__(self):
+                super().__init__()
+                self.values = []
+
+            def record(self, name, field="", reason="", amount=1, start=None, value=None):
+                super().record(name, field, reason, amount, start, value)
+                self.values.append((name, value))
+
+        registry = metrics.enable(registry=ValueRegistry())
+        str(self.field.get_sqid(5))
+        self.assertIn(('encode', 5), registry.values)
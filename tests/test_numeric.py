@@ -0,0 +1,98 @@
+import io
+import tempfile
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from sqids_field import SqidField
+from sqids_field.lookups import get_id_for_sqid_field
+from sqids_field.numeric import (
+    BITMAP, SORTED, NumericIndex, get_numeric_index, numeric_index_path, scan_numeric, settle_numeric,
+    write_numeric_index,
+)
+from tests.models import Artist
+
+ALPHABET = "1234567890abcdef"
+
+
+class NumericIndexTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.field = SqidField(salt="numeric", min_length=7, alphabet=ALPHABET)
+        self.numeric = [id for id in range(20000) if self.field._sqids.encode([id]).isdigit()]
+
+    def write(self, limit, ids):
+        path = numeric_index_path(self.directory.name, self.field.salt, self.field.min_length, self.field.alphabet)
+        write_numeric_index(path, limit, ids, self.field.salt, self.field.min_length, self.field.alphabet)
+        index = NumericIndex(path)
+        self.addCleanup(index.close)
+        return index
+
+    def test_scan(self):
+        self.assertTrue(self.numeric)
+        self.assertEqual(scan_numeric(self.field, 20000, workers=2, chunk_size=3000), self.numeric)
+
+    def test_bitmap_and_sorted(self):
+        bitmap = self.write(20000, self.numeric)
+        self.assertEqual(bitmap.kind, BITMAP)
+        sparse = self.write(20000, self.numeric[:3])
+        self.assertEqual(sparse.kind, SORTED)
+        for id in range(20000):
+            self.assertEqual(id in bitmap, id in self.numeric)
+            self.assertEqual(id in sparse, id in self.numeric[:3])
+        self.assertNotIn(20000, bitmap)
+        self.assertEqual(len(bitmap), len(self.numeric))
+
+    def test_settle(self):
+        self.write(20000, self.numeric)
+        index = get_numeric_index(self.directory.name, self.field.salt, self.field.min_length, self.field.alphabet)
+        codec = self.field._sqids
+        sqid = codec.encode([self.numeric[0]])
+        self.assertEqual(settle_numeric(index, sqid), self.numeric[0])
+        self.assertIs(settle_numeric(index, "5"), False)
+        beyond = next(id for id in range(20000, 200000) if codec.encode([id]).isdigit())
+        self.assertIsNone(settle_numeric(index, codec.encode([beyond])))
+
+    def test_settle_indexed_ids_without_encoding(self):
+        self.write(20000, self.numeric)
+        index = get_numeric_index(self.directory.name, self.field.salt, self.field.min_length, self.field.alphabet)
+        sqids = [self.field._sqids.encode([id]) for id in self.numeric]
+        with mock.patch.object(index.codec, 'encode', wraps=index.codec.encode) as encode:
+            self.assertEqual([settle_numeric(index, sqid) for sqid in sqids], self.numeric)
+            encode.assert_not_called()
+            # Other strings that decode to an indexed id aren't its sqid
+            table = index.codec
+            offset = table.offsets[sqids[0][0]]
+            self.assertIs(settle_numeric(index, sqids[0][0] + table.digits[offset][0] + sqids[0][1:]), False)
+            self.assertIs(settle_numeric(index, sqids[0] + table.alphabet[0]), False)
+
+    def test_lookup_uses_index(self):
+        with override_settings(SQID_FIELD_NUMERIC_INDEX_DIR=self.directory.name):
+            self.write(20000, self.numeric)
+            field = SqidField(salt="numeric", min_length=7, alphabet=ALPHABET)
+            self.assertIsNotNone(field._numeric_index)
+            for id in self.numeric[:20]:
+                self.assertEqual(get_id_for_sqid_field(field, field._sqids.encode([id])), id)
+            # Integers typed in where a sqid was expected
+            for value in ("5", "1234567"):
+                with self.assertRaises(ValueError):
+                    get_id_for_sqid_field(field, value)
+            self.assertEqual(get_id_for_sqid_field(field, field._sqids.encode([123])), 123)
+
+
+class SqidsScanNumericCommandTests(TestCase):
+    def test_writes_index(self):
+        with tempfile.TemporaryDirectory() as directory:
+            out = io.StringIO()
+            call_command('sqids_scan_numeric', 'tests.Artist.id', limit=5000, workers=1, output_dir=directory,
+                         stdout=out)
+            field = Artist._meta.get_field('id')
+            path = numeric_index_path(directory, field.salt, field.min_length, field.alphabet)
+            self.assertIn(path, out.getvalue())
+            index = NumericIndex(path)
+            self.assertEqual(index.limit, 5000)
+            self.assertEqual([id for id in range(5000) if id in index],
+                             [id for id in range(5000) if field._sqids.encode([id]).isdigit()])
+            index.close()
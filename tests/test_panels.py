@@ -0,0 +1,85 @@
+from unittest import skipUnless
+
+from django.test import TestCase
+
+from sqids_field import metrics
+from sqids_field.codec import get_encode_cache
+from sqids_field.metrics import MetricsRegistry
+from tests.models import Artist
+
+try:
+    from sqids_field.panels import RequestRegistry, SqidsPanel
+
+    have_debug_toolbar = True
+except ImportError:
+    have_debug_toolbar = False
+
+
+@skipUnless(have_debug_toolbar, "Requires Django Debug Toolbar to be installed")
+class SqidsPanelTests(TestCase):
+    def setUp(self):
+        self.addCleanup(metrics.disable)
+        self.field = Artist._meta.get_field('id')
+
+    def test_summary(self):
+        registry = metrics.enable(registry=RequestRegistry())
+        cache = get_encode_cache(self.field.salt, self.field.min_length, self.field.alphabet)
+        cache.clear()
+        self.addCleanup(cache.clear)
+        cache[1] = self.field._sqids.encode([1])
+        for _ in range(3):
+            # A new Sqid each time, like str(book.author.id) for every book of an author
+            str(self.field.get_sqid(5))
+        str(self.field.get_sqid(1))
+        self.field.get_sqid(str(self.field.get_sqid(7)))
+        self.assertFalse(Artist.objects.filter(id="zzz").exists())
+
+        summary = registry.summary()
+        self.assertEqual(summary['encodes'], 4)
+        self.assertEqual(summary['decodes'], 2)
+        self.assertEqual(summary['fields'], [{'field': "tests.Artist.id", 'encodes': 4, 'decodes': 2, 'duplicates': 2}])
+        self.assertEqual(summary['duplicate_conversions'], 2)
+        self.assertEqual(summary['duplicates'],
+                         [{'name': 'encode', 'field': "tests.Artist.id", 'value': "5", 'count': 3}])
+        self.assertEqual((summary['cache_hits'], summary['cache_misses']), (1, 4))
+        self.assertEqual(summary['cache_hit_ratio'], 20.0)
+        self.assertEqual(summary['empty_result_sets'], [{'field': "tests.Artist.id", 'lookup': 'exact', 'count': 1}])
+        self.assertEqual(summary['rejected'], [{'field': "tests.Artist.id", 'reason': 'invalid_sqid', 'count': 1}])
+        self.assertEqual(len(summary['slowest']), 6)
+        self.assertTrue(any(__file__.rstrip("c") in frame for frame in summary['slowest'][0]['stack']))
+
+    def test_batch_and_single_conversions_are_duplicates(self):
+        registry = metrics.enable(registry=RequestRegistry())
+        str(self.field.get_sqid(5))
+        sqids = self.field.encode_many([5, 6])
+        self.field.get_sqid(sqids[1])
+        self.field.decode_many(sqids)
+
+        summary = registry.summary()
+        self.assertEqual(summary['fields'], [{'field': "tests.Artist.id", 'encodes': 3, 'decodes': 3, 'duplicates': 2}])
+        self.assertEqual(sorted((duplicate['name'], duplicate['value']) for duplicate in summary['duplicates']),
+                         [('decode', sqids[1][len(self.field.prefix):]), ('encode', "5")])
+
+    def test_instrumentation(self):
+        previous = metrics.enable(registry=MetricsRegistry())
+        panel = SqidsPanel(None, None)
+        panel.enable_instrumentation()
+        self.assertIsInstance(metrics.registry, RequestRegistry)
+        str(self.field.get_sqid(5))
+        panel.disable_instrumentation()
+        self.assertIs(metrics.registry, previous)
+        self.assertEqual(previous.counters[('encode', "tests.Artist.id", "")], 1)
+        self.assertEqual(panel.registry.summary()['encodes'], 1)
+
+    def test_content(self):
+        panel = SqidsPanel(None, None)
+        panel.enable_instrumentation()
+        str(self.field.get_sqid(5))
+        str(self.field.get_sqid(5))
+        panel.disable_instrumentation()
+        self.assertIsNone(metrics.registry)
+        panel.get_stats = panel.registry.summary
+        self.assertEqual(panel.nav_subtitle, "2 encodes, 0 decodes, 1 repeated")
+        content = panel.content
+        self.assertIn("tests.Artist.id", content)
+        self.assertIn("Slowest conversions", content)
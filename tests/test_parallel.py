@@ -0,0 +1,41 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import TestCase
+
+from sqids_field import parallel
+from tests.models import Artist, Record
+
+
+class ParallelTests(TestCase):
+    def setUp(self):
+        self.field = Record._meta.get_field('reference_id')
+
+    def test_encode_many_keeps_order(self):
+        ids = list(range(1000, 0, -1))
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            result = parallel.encode_many(ids, self.field, chunk_size=64, executor=executor)
+        self.assertEqual(result, self.field.encode_many(ids))
+
+    def test_decode_many_keeps_order(self):
+        ids = list(range(1000, 0, -1))
+        sqids = self.field.encode_many(ids)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            self.assertEqual(parallel.decode_many(sqids, self.field, chunk_size=64, executor=executor), ids)
+        self.assertEqual(self.field.decode_many(sqids), ids)
+
+    def test_decode_many_invalid(self):
+        sqids = self.field.encode_many([1, 2]) + ["invalid!"]
+        with self.assertRaises(ValueError):
+            parallel.decode_many(sqids, self.field)
+        with self.assertRaises(ValueError):
+            self.field.decode_many(sqids)
+
+    def test_process_pool(self):
+        artist_field = Artist._meta.get_field('id')
+        ids = list(range(5000))
+        with parallel.get_executor([self.field, artist_field], workers=2) as executor:
+            self.assertEqual(parallel.encode_many(ids, self.field, chunk_size=1000, executor=executor),
+                             self.field.encode_many(ids))
+            sqids = artist_field.encode_many(ids)
+            self.assertEqual(parallel.decode_many(iter(sqids), artist_field, chunk_size=1000, executor=executor),
+                             ids)
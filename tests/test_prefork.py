@@ -0,0 +1,41 @@
+from django.test import TestCase
+
+from sqids_field import warmup
+from sqids_field.codec import get_encode_cache
+from sqids_field.prefork import get_sqid_fields
+from tests.models import Artist, Record
+
+
+def clear_encode_caches():
+    for field in get_sqid_fields():
+        get_encode_cache(field.salt, field.min_length, field.alphabet, field.blocklist).clear()
+
+
+class WarmupTests(TestCase):
+    def test_builds_codecs(self):
+        stats = warmup()
+        fields = get_sqid_fields()
+        self.assertIn(Record._meta.get_field('reference_id'), fields)
+        # Not again for ArtistProxy
+        self.assertEqual(fields.count(Artist._meta.get_field('id')), 1)
+        self.assertEqual(stats['fields'], len(fields))
+        self.assertEqual(stats['codecs'], len({(f.salt, f.min_length, f.alphabet) for f in fields}))
+        self.assertGreaterEqual(stats['tables'], stats['codecs'])
+        self.assertEqual(stats['preencoded'], 0)
+
+    def test_preencodes_top_ids(self):
+        artists = [Artist.objects.create(name="Artist {}".format(i)) for i in range(5)]
+        field = Artist._meta.get_field('id')
+        cache = get_encode_cache(field.salt, field.min_length, field.alphabet)
+        cache.clear()
+        # The caches are shared by every field with the same configuration, so don't leave the ids in them
+        self.addCleanup(clear_encode_caches)
+        stats = warmup(top_n=3)
+        self.assertGreaterEqual(stats['preencoded'], 3)
+        newest = [int(artist.id) for artist in artists[-3:]]
+        for id in newest:
+            self.assertEqual(cache[id], field._sqids.encode([id]))
+        self.assertNotIn(int(artists[0].id), cache)
+
+        sqid = Artist.objects.get(name="Artist 2").id
+        self.assertEqual(sqid._sqid, cache[newest[0]])
@@ -11,6 +11,7 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.sessions",
     "django.contrib.admin",
+    "sqids_field",
     "tests",
 ]
 DATABASES = {
@@ -0,0 +1,151 @@
+import os
+import pickle
+import subprocess
+import sys
+from unittest import skipUnless
+
+from django.test import TestCase
+
+from sqids import Sqids
+from sqids_field import Sqid
+from sqids_field import codec
+from sqids_field.codec import codec_fingerprint, get_codec, salt_alphabet
+from sqids_field.sqid import msgpack_default, msgpack_ext_hook, MSGPACK_EXT_TYPE
+from tests.models import Record
+
+try:
+    import msgpack
+
+    have_msgpack = True
+except ImportError:
+    have_msgpack = False
+
+
+class SqidSerializationTests(TestCase):
+    def test_pickle_is_compact(self):
+        a = Sqid(123, salt="compact", min_length=7)
+        self.assertNotIn(a._alphabet.encode(), pickle.dumps(a))
+
+    def test_pickle_rebinds_codec(self):
+        a = Sqid(123, salt="rebind", min_length=7)
+        b = pickle.loads(pickle.dumps(a))
+        self.assertEqual(a, b)
+        self.assertIs(b.sqids, get_codec("rebind", 7, a._alphabet))
+        self.assertEqual(b.decode(b.sqid), 123)
+
+    def test_pickle_with_prefix(self):
+        a = Sqid(321, prefix="wire_")
+        b = pickle.loads(pickle.dumps(a))
+        self.assertEqual(a, b)
+        self.assertEqual(b.prefix, "wire_")
+
+    def test_pickle_with_blocklist(self):
+        a = Sqid(123, salt="blocklist", blocklist=["Word"])
+        b = pickle.loads(pickle.dumps(a))
+        self.assertEqual(a, b)
+        self.assertEqual(b._blocklist, ("word",))
+        self.assertIs(b.sqids, get_codec("blocklist", 0, a._alphabet, ("word",)))
+        self.assertNotEqual(a.fingerprint, Sqid(123, salt="blocklist").fingerprint)
+
+    def test_unpickle_state_tuple_rebinds_codec(self):
+        a = Sqid(123, salt="legacy")
+        b = Sqid.__new__(Sqid)
+        b.__setstate__((a.id, "legacy", 0, a._alphabet, "", a.sqid))
+        self.assertEqual(a, b)
+        self.assertEqual(b.encode(123), a.sqid)
+
+    def test_unpickle_registers_field_configs(self):
+        field = Record._meta.get_field('prefixed_id')
+        data = pickle.dumps(field.get_sqid(123))
+        # As if the field's configuration had never been registered in this process
+        fingerprint = codec._fingerprints.pop((field.salt, field.min_length, field.alphabet, field.blocklist))
+        del codec._configs_by_fingerprint[fingerprint]
+        self.assertEqual(pickle.loads(data), field.get_sqid(123))
+
+    def test_unpickle_in_new_process(self):
+        a = Record._meta.get_field('prefixed_id').get_sqid(123)
+        code = ("import django, pickle; django.setup(); "
+                "b = pickle.loads({!r}); print(b.id, b.prefix, b.sqid)".format(pickle.dumps(a)))
+        output = run_python(code, settings=os.environ['DJANGO_SETTINGS_MODULE'])
+        self.assertEqual(output.split(), [str(a.id), a.prefix, a.sqid])
+
+    def test_unknown_fingerprint(self):
+        with self.assertRaises(LookupError):
+            Sqid.from_bytes(b"\x00" * 16)
+
+    def test_to_bytes(self):
+        a = Sqid(5, salt="bytes", prefix="b_")
+        data = a.to_bytes()
+        self.assertEqual(data[:8], codec_fingerprint("bytes", 0, a._alphabet))
+        self.assertEqual(Sqid.from_bytes(data), a)
+        self.assertEqual(Sqid.from_bytes(memoryview(data)), a)
+
+    @skipUnless(have_msgpack, "Requires msgpack to be installed")
+    def test_msgpack_hooks(self):
+        a = Sqid(42, prefix="m_")
+        ext = msgpack_default(a)
+        self.assertEqual(ext.code, MSGPACK_EXT_TYPE)
+        self.assertEqual(msgpack_ext_hook(ext.code, ext.data), a)
+        with self.assertRaises(TypeError):
+            msgpack_default(object())
+
+    @skipUnless(have_msgpack, "Requires msgpack to be installed")
+    def test_msgpack_roundtrip(self):
+        data = [Sqid(1, prefix="m_"), Sqid(2, prefix="m_")]
+        packed = msgpack.packb(data, default=msgpack_default)
+        self.assertEqual(msgpack.unpackb(packed, ext_hook=msgpack_ext_hook), data)
+
+
+class SqidCodecTests(TestCase):
+    def test_unsalted_matches_sqids(self):
+        self.assertEqual(Sqid(123).sqid, Sqids().encode([123]))
+        self.assertEqual(Sqid(123, min_length=8, alphabet="abcdef123").sqid,
+                         Sqids(alphabet="abcdef123", min_length=8).encode([123]))
+
+    def test_salt_shuffles_alphabet(self):
+        alphabet = "abcdefghijklmnopqrstuvwxyz"
+        salted = salt_alphabet(alphabet, "pepper")
+        self.assertNotEqual(salted, alphabet)
+        self.assertEqual(sorted(salted), sorted(alphabet))
+        self.assertEqual(salt_alphabet(alphabet, ""), alphabet)
+        self.assertNotEqual(Sqid(123, salt="pepper").sqid, Sqid(123).sqid)
+        self.assertNotEqual(Sqid(123, salt="pepper").sqid, Sqid(123, salt="salt").sqid)
+        self.assertEqual(Sqid(Sqid(123, salt="pepper").sqid, salt="pepper").id, 123)
+
+    def test_invalid_sqids_object(self):
+        with self.assertRaises(Exception):
+            Sqid(123, salt="pepper", sqids=Sqids())
+        self.assertEqual(Sqid(123, sqids=Sqids()).sqid, Sqid(123).sqid)
+
+
+def run_python(code, settings=None):
+    """
+    Runs `code` in a new interpreter that only has this checkout and the installed packages on its path, and that has
+    no Django settings unless `settings` is given.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root)
+    env.pop('DJANGO_SETTINGS_MODULE', None)
+    if settings is not None:
+        env['DJANGO_SETTINGS_MODULE'] = settings
+    return subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True, env=env,
+                          cwd=root).stdout
+
+
+class CoreImportTests(TestCase):
+    def test_core_does_not_import_django(self):
+        code = "import sys, sqids_field.core; print(sorted(m for m in sys.modules if m.split('.')[0] == 'django'))"
+        self.assertEqual(run_python(code).strip(), "[]")
+
+    def test_core_imports_with_installed_sqids(self):
+        code = "import sqids, sqids_field.core, sqids_field.sqid; print(sqids.__file__)"
+        self.assertIn("site-packages", run_python(code))
+
+    def test_lazy_package_attributes(self):
+        import sqids_field
+        from sqids_field.field import SqidField
+
+        self.assertIs(sqids_field.SqidField, SqidField)
+        self.assertIs(sqids_field.Sqid, Sqid)
+        with self.assertRaises(AttributeError):
+            sqids_field.DoesNotExist
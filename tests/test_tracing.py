@@ -0,0 +1,58 @@
+from django.test import TestCase
+
+from sqids_field.tracing import SqidQueryTracingMiddleware, pending_lookups, trace_sqid_queries
+from tests.models import Artist, Record
+
+
+class TracingTests(TestCase):
+    def setUp(self):
+        self.field = Artist._meta.get_field('id')
+        self.artists = [Artist.objects.create(name="Artist {}".format(i)) for i in range(3)]
+
+    def test_in_lookup(self):
+        sqids = [str(artist.id) for artist in self.artists] + self.field.encode_many(range(1000, 1100))
+        with trace_sqid_queries() as queries:
+            self.assertEqual(len(Artist.objects.filter(id__in=sqids)), 3)
+        self.assertEqual(len(queries), 1)
+        query = queries[0]
+        self.assertIn("IN", query['sql'])
+        self.assertEqual(query['alias'], 'default')
+        self.assertEqual(query['sqid_values'], 103)
+        self.assertEqual([(lookup['field'], lookup['lookup'], lookup['values'])
+                          for lookup in query['sqid_lookups']], [("tests.Artist.id", 'in', 103)])
+        self.assertGreater(query['sqid_seconds'], 0)
+        self.assertIsNone(pending_lookups.get())
+
+    def test_queries_without_sqid_lookups(self):
+        with trace_sqid_queries() as queries:
+            Artist.objects.filter(name="Artist 1").count()
+            Record.objects.filter(reference_id=str(Record._meta.get_field('reference_id').get_sqid(5))).count()
+        self.assertEqual([query['sqid_values'] for query in queries], [0, 1])
+        self.assertEqual([(lookup['field'], lookup['lookup']) for lookup in queries[1]['sqid_lookups']],
+                         [("tests.Record.reference_id", 'exact')])
+
+    def test_empty_result_set(self):
+        with trace_sqid_queries() as queries:
+            self.assertFalse(Artist.objects.filter(id="zzz").exists())
+        self.assertEqual(len(queries), 1)
+        self.assertIsNone(queries[0]['sql'])
+        self.assertTrue(queries[0]['sqid_lookups'][0]['empty_result_set'])
+
+    def test_logging(self):
+        with self.assertLogs('sqids_field.tracing', 'INFO') as logs:
+            with trace_sqid_queries(log=True):
+                Artist.objects.filter(name="Artist 1").count()
+                Artist.objects.filter(id=self.artists[0].id).count()
+        self.assertEqual(len(logs.records), 1)
+        record = logs.records[0]
+        self.assertEqual(record.sqid_values, 1)
+        self.assertEqual(record.sqid_lookups[0]['field'], "tests.Artist.id")
+        self.assertEqual(record.alias, 'default')
+
+    def test_middleware(self):
+        def view(request):
+            return list(Artist.objects.filter(id__in=[str(artist.id) for artist in self.artists]))
+
+        with self.assertLogs('sqids_field.tracing', 'INFO') as logs:
+            self.assertEqual(len(SqidQueryTracingMiddleware(view)(None)), 3)
+        self.assertEqual(logs.records[0].sqid_values, 3)
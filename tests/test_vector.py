@@ -0,0 +1,127 @@
+import sys
+from unittest import skipUnless
+
+from django.test import TestCase
+
+from sqids_field.codec import BlocklistMatcher, TableCodec, get_codec, get_table_codec, normalize_blocklist
+from tests.models import Record
+
+try:
+    import numpy as np
+
+    from sqids_field.vector import encode_array, decode_array
+
+    have_numpy = True
+except ImportError:
+    have_numpy = False
+
+try:
+    import pandas as pd
+
+    from sqids_field.vector import register_pandas_accessor
+
+    have_pandas = True
+except ImportError:
+    have_pandas = False
+
+try:
+    import pyarrow as pa
+
+    have_pyarrow = True
+except ImportError:
+    have_pyarrow = False
+
+
+class TableCodecTests(TestCase):
+    def test_matches_sqids(self):
+        for min_length in (0, 5, 20):
+            codec = TableCodec("abcdefghijklmnopqrstuvwxyz1234567890", min_length)
+            sqids = get_codec("", min_length, "abcdefghijklmnopqrstuvwxyz1234567890")
+            for number in list(range(2000)) + [sys.maxsize]:
+                self.assertEqual(codec.encode(number), sqids.encode([number]))
+                self.assertEqual(codec.decode(codec.encode(number)), number)
+
+    def test_salted_matches_sqids(self):
+        for salt in ("pepper", "salt"):
+            codec = get_table_codec(salt, 5, "abcdefghijklmnopqrstuvwxyz1234567890")
+            sqids = get_codec(salt, 5, "abcdefghijklmnopqrstuvwxyz1234567890")
+            for number in range(2000):
+                self.assertEqual(codec.encode(number), sqids.encode([number]))
+
+    def test_decode_invalid(self):
+        codec = TableCodec("abcdefghijklmnopqrstuvwxyz1234567890")
+        self.assertIsNone(codec.decode(""))
+        self.assertIsNone(codec.decode("!!!"))
+
+    def test_custom_blocklists_match_sqids(self):
+        alphabet = "abcdefghijklmnopqrstuvwxyz1234567890"
+        unblocked = get_codec("", 0, alphabet, ())
+        # Words taken from actual encodings, so that some of the numbers have to be re-encoded
+        words = [unblocked.encode([n])[:3] for n in (7, 70)] + [unblocked.encode([n])[1:5] for n in (700, 7000)]
+        for blocklist in ((), normalize_blocklist(words)):
+            codec = TableCodec(alphabet, 0, blocklist)
+            sqids = get_codec("", 0, alphabet, blocklist)
+            for number in range(10000):
+                self.assertEqual(codec.encode(number), sqids.encode([number]))
+
+    def test_blocklist_matcher(self):
+        matcher = BlocklistMatcher(exact={"abc"}, ends={"x1yz"}, anywhere={"word"})
+        self.assertTrue(matcher.matches("ABC"))
+        self.assertFalse(matcher.matches("abcd"))
+        self.assertTrue(matcher.matches("x1yzz"))
+        self.assertTrue(matcher.matches("zzx1yz"))
+        self.assertFalse(matcher.matches("zx1yzz"))
+        self.assertTrue(matcher.matches("zzwordzz"))
+        self.assertFalse(matcher.matches("zzworzz"))
+        self.assertFalse(BlocklistMatcher((), (), ()))
+
+
+@skipUnless(have_numpy, "NumPy is not installed")
+class VectorTests(TestCase):
+    def setUp(self):
+        self.field = Record._meta.get_field('reference_id')
+
+    def test_encode_array(self):
+        numbers = np.arange(10000, dtype=np.int64) * 7919
+        result = encode_array(numbers, self.field)
+        self.assertEqual(result.tolist(), self.field.encode_many(numbers.tolist()))
+
+    def test_decode_array(self):
+        numbers = np.array([0, 1, 123, 2 ** 40, sys.maxsize], dtype=np.int64)
+        result = decode_array(encode_array(numbers, self.field), self.field)
+        self.assertEqual(result.tolist(), numbers.tolist())
+
+    def test_decode_invalid(self):
+        with self.assertRaises(ValueError):
+            decode_array(["invalid!"], self.field)
+        result = decode_array([str(self.field.get_sqid(5)), "invalid!"], self.field, errors='mask')
+        self.assertEqual(result.tolist(), [5, None])
+
+    def test_encode_out_of_range(self):
+        with self.assertRaises(ValueError):
+            encode_array(np.array([-1]), self.field)
+        with self.assertRaises(TypeError):
+            encode_array(np.array([1.5]), self.field)
+
+    def test_masked_array(self):
+        result = encode_array(np.ma.array([1, 2], mask=[False, True]), self.field)
+        self.assertEqual(result.tolist(), [str(self.field.get_sqid(1)), None])
+        self.assertEqual(decode_array(result, self.field).tolist(), [1, None])
+
+    @skipUnless(have_pandas, "pandas is not installed")
+    def test_pandas_accessor(self):
+        register_pandas_accessor()
+        series = pd.Series([1, None, 3], dtype="Int64")
+        encoded = series.sqids.encode(self.field)
+        self.assertEqual(encoded.tolist(), [str(self.field.get_sqid(1)), None, str(self.field.get_sqid(3))])
+        decoded = encoded.sqids.decode(self.field)
+        self.assertEqual(str(decoded.dtype), "Int64")
+        self.assertTrue(decoded.equals(series))
+
+    @skipUnless(have_pyarrow, "pyarrow is not installed")
+    def test_arrow(self):
+        array = pa.array([1, None, 3])
+        encoded = encode_array(array, self.field)
+        self.assertEqual(encoded.type, pa.string())
+        self.assertEqual(encoded.null_count, 1)
+        self.assertEqual(decode_array(pa.chunked_array([encoded]), self.field).to_pylist(), [1, None, 3])